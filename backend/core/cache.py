@@ -0,0 +1,405 @@
+import hashlib
+import json
+import os
+import tempfile
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from fastapi import Request
+
+from core.db import async_session
+from core.etag import ETAG_ACTIVO, calcular_etag, coincide, no_modificado
+from models.version import TABLAS_VERSIONADAS
+
+
+# Segundos que vive una respuesta cacheada. 0 desactiva el cache.
+CACHE_TTL = float(os.getenv("CACHE_TTL", "30"))
+
+# Cantidad máxima de respuestas guardadas; al pasarla se descartan las menos usadas
+CACHE_MAXIMO = int(os.getenv("CACHE_MAXIMO", "512"))
+
+# "memoria": un cache por worker. "archivos": uno en `CACHE_DIR` compartido por todos.
+# Con cualquiera de los dos, una escritura de otro worker o de un script también
+# invalida: cada acierto compara el ETag guardado con los contadores de la base.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memoria")
+CACHE_DIR = os.getenv("CACHE_DIR", os.path.join(tempfile.gettempdir(), "adm_taxis_cache"))
+
+CACHE_ACTIVO = CACHE_TTL > 0
+
+HEADER_CACHE = "X-Cache"
+
+# Atributo con el que `cacheada` marca los endpoints
+_ATRIBUTO_GRUPO = "_grupo_cache"
+
+
+@dataclass
+class Entrada:
+    """
+    Respuesta cacheada: estado, headers y cuerpo tal como los envió la app.
+    """
+    grupo: str
+    ruta: str
+    estado: int
+    headers: List[Tuple[bytes, bytes]]
+    cuerpo: bytes
+    expira: float
+    # Tablas que lee el endpoint: la entrada vale mientras no cambien (ver `_vigente`)
+    tablas: Tuple[str, ...] = ()
+
+    @property
+    def etag(self) -> Optional[str]:
+        return next((valor.decode("latin-1") for nombre, valor in self.headers if nombre == b"etag"), None)
+
+
+class BackendCache(ABC):
+    """
+    Almacenamiento de las respuestas cacheadas. Para usar otro (ej: uno de red
+    compartido por los workers) se hereda de esta clase y se pasa a `configurar_backend`.
+
+    `version` cambia con cada invalidación. `guardar` recibe la versión leída
+    antes de armar la respuesta y no guarda si cambió mientras tanto, así una
+    consulta que leyó datos previos a una escritura no queda cacheada.
+    `invalidar` solo alcanza a este backend; las escrituras de otros procesos
+    las detecta el middleware con los contadores de la base.
+    """
+
+    @abstractmethod
+    async def leer(self, clave: str) -> Optional[Entrada]:
+        ...
+
+    @abstractmethod
+    async def guardar(self, clave: str, entrada: Entrada, version: int) -> None:
+        ...
+
+    @abstractmethod
+    async def invalidar(self, grupo: str) -> None:
+        ...
+
+    @abstractmethod
+    async def version(self) -> int:
+        ...
+
+
+class BackendMemoria(BackendCache):
+    """
+    LRU en memoria del proceso con vencimiento por TTL.
+    """
+
+    def __init__(self, maximo: int = CACHE_MAXIMO):
+        self.maximo = maximo
+        self.entradas: "OrderedDict[str, Entrada]" = OrderedDict()
+        self._version = 0
+
+    async def leer(self, clave: str) -> Optional[Entrada]:
+        entrada = self.entradas.get(clave)
+        if entrada is None:
+            return None
+
+        if entrada.expira <= time.monotonic():
+            del self.entradas[clave]
+            return None
+
+        self.entradas.move_to_end(clave)
+        return entrada
+
+    async def guardar(self, clave: str, entrada: Entrada, version: int) -> None:
+        if version != self._version:
+            return
+
+        self.entradas[clave] = entrada
+        self.entradas.move_to_end(clave)
+        while len(self.entradas) > self.maximo:
+            self.entradas.popitem(last=False)
+
+    async def invalidar(self, grupo: str) -> None:
+        self._version += 1
+        for clave in [clave for clave, entrada in self.entradas.items() if entrada.grupo == grupo]:
+            del self.entradas[clave]
+
+    async def version(self) -> int:
+        return self._version
+
+
+class BackendArchivos(BackendCache):
+    """
+    Cache compartido por los workers en `directorio`: un archivo por respuesta
+    (`<hash de la clave>.resp`) con una línea JSON de metadatos y el cuerpo.
+    El orden de uso para el LRU es la fecha de modificación, que se actualiza en cada lectura.
+    Como el reloj monotónico no se comparte entre procesos, vence por hora del sistema.
+    """
+
+    EXTENSION = ".resp"
+
+    def __init__(self, directorio: str = CACHE_DIR, maximo: int = CACHE_MAXIMO):
+        self.directorio = directorio
+        self.maximo = maximo
+        os.makedirs(directorio, exist_ok=True)
+
+    def _ruta(self, clave: str) -> str:
+        return os.path.join(self.directorio, hashlib.sha1(clave.encode()).hexdigest() + self.EXTENSION)
+
+    def _archivos(self) -> List[str]:
+        return [
+            os.path.join(self.directorio, nombre)
+            for nombre in os.listdir(self.directorio)
+            if nombre.endswith(self.EXTENSION)
+        ]
+
+    def _leer_archivo(self, ruta: str) -> Tuple[dict, bytes] | None:
+        try:
+            with open(ruta, "rb") as archivo:
+                return json.loads(archivo.readline()), archivo.read()
+        except (OSError, ValueError):
+            return None
+
+    async def leer(self, clave: str) -> Optional[Entrada]:
+        ruta = self._ruta(clave)
+        leido = self._leer_archivo(ruta)
+        if leido is None:
+            return None
+
+        meta, cuerpo = leido
+        if meta["expira"] <= time.time():
+            self._borrar(ruta)
+            return None
+
+        try:
+            os.utime(ruta)
+        except OSError:
+            pass
+
+        headers = [(nombre.encode("latin-1"), valor.encode("latin-1")) for nombre, valor in meta["headers"]]
+        return Entrada(
+            meta["grupo"], meta["ruta"], meta["estado"], headers, cuerpo,
+            # De vuelta a reloj monotónico, como las entradas de memoria
+            time.monotonic() + meta["expira"] - time.time(),
+            tuple(meta.get("tablas", ())),
+        )
+
+    async def guardar(self, clave: str, entrada: Entrada, version: int) -> None:
+        if version != await self.version():
+            return
+
+        meta = {
+            "grupo": entrada.grupo,
+            "ruta": entrada.ruta,
+            "estado": entrada.estado,
+            "headers": [(nombre.decode("latin-1"), valor.decode("latin-1")) for nombre, valor in entrada.headers],
+            "expira": time.time() + entrada.expira - time.monotonic(),
+            "tablas": list(entrada.tablas),
+        }
+
+        destino = self._ruta(clave)
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        with open(temporal, "wb") as archivo:
+            archivo.write(json.dumps(meta).encode() + b"\n")
+            archivo.write(entrada.cuerpo)
+        os.replace(temporal, destino)
+
+        archivos = self._archivos()
+        if len(archivos) > self.maximo:
+            usos = {}
+            for ruta in archivos:
+                try:
+                    usos[ruta] = os.stat(ruta).st_mtime
+                except OSError:
+                    continue
+            for ruta in sorted(usos, key=usos.__getitem__)[:len(usos) - self.maximo]:
+                self._borrar(ruta)
+
+    async def invalidar(self, grupo: str) -> None:
+        # Primero la versión: una respuesta armada antes de la escritura ya no se guarda
+        destino = os.path.join(self.directorio, "version")
+        temporal = f"{destino}.{os.getpid()}.tmp"
+        with open(temporal, "w") as archivo:
+            archivo.write(str(await self.version() + 1))
+        os.replace(temporal, destino)
+
+        # Las invalidaciones son mucho menos que las lecturas: acá sí se recorre la carpeta
+        for ruta in self._archivos():
+            leido = self._leer_archivo(ruta)
+            if leido is not None and leido[0]["grupo"] == grupo:
+                self._borrar(ruta)
+
+    async def version(self) -> int:
+        try:
+            with open(os.path.join(self.directorio, "version")) as archivo:
+                return int(archivo.read() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def _borrar(self, ruta: str) -> None:
+        try:
+            os.remove(ruta)
+        except OSError:
+            pass
+
+
+BACKENDS = {
+    "memoria": BackendMemoria,
+    "archivos": BackendArchivos,
+}
+
+backend: BackendCache = BACKENDS[CACHE_BACKEND]()
+
+
+def configurar_backend(nuevo: BackendCache) -> None:
+    global backend
+    backend = nuevo
+
+
+def cacheada(grupo: str, *tablas: str):
+    """
+    Marca un endpoint GET para que `CacheRespuestasMiddleware` guarde sus respuestas 200.
+    El grupo es lo que invalidan las escrituras. ej: "choferes"
+
+    `tablas` son las que pasa el endpoint a `verificar_etag`. Si se omiten y el grupo
+    es una tabla versionada, es esa. Sin tablas (ej: los enums) la respuesta solo vence por TTL.
+
+    Va debajo del decorador de la ruta:
+
+        @router.get("/")
+        @cacheada("choferes")
+        async def leer_choferes(...):
+    """
+    if not tablas and grupo in TABLAS_VERSIONADAS:
+        tablas = (grupo,)
+
+    def decorador(endpoint):
+        setattr(endpoint, _ATRIBUTO_GRUPO, (grupo, tablas))
+        return endpoint
+    return decorador
+
+
+async def invalidar(*grupos: str) -> None:
+    """
+    Descarta las respuestas cacheadas de los grupos. Se llama después del commit
+    de cada escritura que cambia lo que devuelven.
+    """
+    if not CACHE_ACTIVO:
+        return
+    for grupo in grupos:
+        await backend.invalidar(grupo)
+
+
+def _con_header(send, header: Tuple[bytes, bytes]):
+    async def enviar(mensaje):
+        if mensaje["type"] == "http.response.start":
+            mensaje["headers"] = [*mensaje.get("headers", []), header]
+        await send(mensaje)
+    return enviar
+
+
+def _clave(scope) -> str:
+    return f"{scope['path']}?{scope['query_string'].decode('latin-1')}"
+
+
+async def _vigente(scope, entrada: Entrada) -> bool:
+    """
+    Si las tablas de la entrada no cambiaron desde que se guardó: el ETag que
+    tendría hoy la respuesta es el mismo que el guardado. Una consulta por clave
+    primaria a `versiones_tablas`, en vez de la del endpoint.
+    """
+    etag = entrada.etag
+    if not ETAG_ACTIVO or not entrada.tablas or etag is None:
+        return True
+
+    async with async_session() as session:
+        return await calcular_etag(session, Request(scope), *entrada.tablas) == etag
+
+
+class CacheRespuestasMiddleware:
+    """
+    Middleware ASGI que sirve desde el cache los GET a endpoints marcados con `cacheada`,
+    sin pasar por el endpoint ni sus consultas. La clave es la ruta más el query string.
+
+    Va por dentro de CORS, instrumentación y métricas: las respuestas cacheadas
+    igual llevan sus headers y se cuentan. Agrega `X-Cache: HIT` a las que sirve.
+
+    Cada acierto con tablas (ver `cacheada`) abre una sesión y hace una consulta:
+    `_vigente` lee de `versiones_tablas` el ETag que tendría hoy la respuesta y lo
+    compara con el guardado. Es una lectura por clave primaria, mucho más barata que
+    el listado, y evita que una escritura en otro worker o en un script deje datos
+    viejos (o un 304 con el ETag viejo). Si no coincide, responde el endpoint.
+    Las entradas sin tablas (ej: los enums) o con `ETAG_ACTIVO` apagado no consultan
+    la base y solo vencen por TTL.
+    """
+
+    def __init__(self, app):
+        self.app = app
+        self._rutas: Dict[str, object] = {}
+
+
+    def _ruta(self, scope, plantilla: str):
+        # Las métricas agrupan por la ruta que resolvió FastAPI; en un acierto no se resuelve
+        if plantilla not in self._rutas:
+            for route in scope["app"].router.routes:
+                self._rutas.setdefault(getattr(route, "path_format", ""), route)
+        return self._rutas.get(plantilla)
+
+
+    async def __call__(self, scope, receive, send):
+        if not CACHE_ACTIVO or scope["type"] != "http" or scope["method"] != "GET":
+            await self.app(scope, receive, send)
+            return
+
+        clave = _clave(scope)
+        entrada = await backend.leer(clave)
+
+        if entrada is not None and not await _vigente(scope, entrada):
+            entrada = None
+
+        if entrada is not None:
+            route = self._ruta(scope, entrada.ruta)
+            if route is not None:
+                scope["route"] = route
+
+            marca = (HEADER_CACHE.lower().encode(), b"HIT")
+
+            # Si el cliente ya tiene esta versión (ver `core.etag`) alcanza con un 304
+            etag = entrada.etag
+            if etag and coincide(Request(scope), etag):
+                await no_modificado(etag)(scope, receive, _con_header(send, marca))
+                return
+
+            await send({
+                "type": "http.response.start",
+                "status": entrada.estado,
+                "headers": [*entrada.headers, marca],
+            })
+            await send({"type": "http.response.body", "body": entrada.cuerpo})
+            return
+
+        version = await backend.version()
+        respuesta: dict = {}
+        partes: List[bytes] = []
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                # La ruta ya está resuelta; solo se copia el cuerpo de las cacheables
+                route = scope.get("route")
+                marca = getattr(getattr(route, "endpoint", None), _ATRIBUTO_GRUPO, None)
+                if marca and mensaje["status"] == 200:
+                    grupo, tablas = marca
+                    respuesta.update(
+                        grupo=grupo,
+                        tablas=tablas,
+                        ruta=route.path_format,
+                        estado=mensaje["status"],
+                        headers=list(mensaje.get("headers", [])),
+                    )
+            elif mensaje["type"] == "http.response.body" and respuesta:
+                partes.append(mensaje.get("body", b""))
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
+
+        if respuesta:
+            await backend.guardar(
+                clave,
+                Entrada(**respuesta, cuerpo=b"".join(partes), expira=time.monotonic() + CACHE_TTL),
+                version,
+            )
@@ -0,0 +1,90 @@
+from typing import Dict, List, Optional, TypeVar
+
+from fastapi import HTTPException, status
+from sqlmodel import SQLModel, select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+
+# Claves por pedido como máximo en las búsquedas por lote
+MAX_CLAVES = 500
+
+# Cache por proceso: "tabla.campo" -> {valor de la clave: id}
+_ids: Dict[str, Dict[str, int]] = {}
+
+Modelo = TypeVar("Modelo", bound=SQLModel)
+
+
+def invalidar(tabla: str) -> None:
+    """
+    Olvida las claves de `tabla`. Llamar después de cada escritura que pueda
+    cambiar la clave de un registro (ej: un cambio de móvil o de cédula).
+    """
+    for nombre in [nombre for nombre in _ids if nombre.startswith(f"{tabla}.")]:
+        del _ids[nombre]
+
+
+def separar(valores: str) -> List[str]:
+    """
+    Claves separadas por coma de una búsqueda por lote, sin repetir.
+
+    Raises:
+        HTTPException (400): Si no hay ninguna o son más de `MAX_CLAVES`.
+    """
+    claves = list(dict.fromkeys(valor.strip() for valor in valores.split(",") if valor.strip()))
+
+    if not claves or len(claves) > MAX_CLAVES:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Se deben enviar entre 1 y {MAX_CLAVES} valores separados por coma."
+        )
+    return claves
+
+
+async def buscar_por_clave(
+    session: AsyncSession,
+    modelo: type[Modelo],
+    campo: str,
+    valores: List[str],
+) -> Dict[str, Optional[Modelo]]:
+    """
+    Registros de `modelo` cuyo `campo` (una columna única, ej: `movil`) vale cada
+    uno de `valores`. Los que no existen quedan en `None`.
+
+    Las claves ya vistas se traducen a `id` en memoria y se leen por clave primaria;
+    las nuevas se buscan por el índice único de `campo`. Si otro worker cambió una
+    clave, el registro leído no coincide y se vuelve a buscar por el índice.
+    """
+    nombre = f"{modelo.__tablename__}.{campo}" # type: ignore
+    ids = _ids.setdefault(nombre, {})
+    columna_id = col(getattr(modelo, "id"))
+    columna = col(getattr(modelo, campo))
+
+    encontrados: Dict[str, Modelo] = {}
+
+    conocidos = {ids[valor]: valor for valor in valores if valor in ids}
+    if conocidos:
+        resultado = await session.exec(select(modelo).where(columna_id.in_(conocidos)))
+        for registro in resultado.all():
+            valor = conocidos[getattr(registro, "id")]
+            if getattr(registro, campo) == valor:
+                encontrados[valor] = registro
+
+    faltantes = [valor for valor in valores if valor not in encontrados]
+    for valor in faltantes:
+        ids.pop(valor, None)
+
+    if faltantes:
+        resultado = await session.exec(select(modelo).where(columna.in_(faltantes)))
+        for registro in resultado.all():
+            valor = getattr(registro, campo)
+            encontrados[valor] = registro
+            ids[valor] = getattr(registro, "id")
+
+    return {valor: encontrados.get(valor) for valor in valores}
+
+
+async def buscar_uno(session: AsyncSession, modelo: type[Modelo], campo: str, valor: str) -> Optional[Modelo]:
+    """
+    Como `buscar_por_clave`, para una sola clave.
+    """
+    return (await buscar_por_clave(session, modelo, campo, [valor]))[valor]
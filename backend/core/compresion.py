@@ -0,0 +1,164 @@
+import os
+import zlib
+from typing import Callable, List, Optional, Tuple
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+COMPRESION_ACTIVA = os.getenv("COMPRESION_ACTIVA", "true").lower() in ("1", "true", "yes")
+
+# Las respuestas más chicas se mandan sin comprimir (ej: enums): no vale el CPU
+COMPRESION_MINIMO = int(os.getenv("COMPRESION_MINIMO", "1024"))
+
+# gzip: 1 (rápido) a 9 (más chico). brotli: 0 a 11; arriba de 5 es lento para respuestas dinámicas.
+COMPRESION_NIVEL_GZIP = int(os.getenv("COMPRESION_NIVEL_GZIP", "6"))
+COMPRESION_NIVEL_BROTLI = int(os.getenv("COMPRESION_NIVEL_BROTLI", "4"))
+
+# brotli solo si está instalado el paquete; gzip siempre
+CODIFICACIONES = ("br", "gzip") if brotli is not None else ("gzip",)
+
+_TIPOS_COMPRIMIBLES = ("text/", "application/json", "application/x-ndjson", "application/xml")
+
+
+def elegir_codificacion(accept_encoding: str) -> Optional[str]:
+    """
+    Codificación a usar según `Accept-Encoding`, prefiriendo brotli. `None` si no acepta ninguna.
+    """
+    aceptadas = {}
+    for parte in accept_encoding.split(","):
+        nombre, _, parametros = parte.strip().partition(";")
+        calidad = 1.0
+        if parametros.strip().startswith("q="):
+            try:
+                calidad = float(parametros.strip()[2:])
+            except ValueError:
+                calidad = 0.0
+        aceptadas[nombre.strip().lower()] = calidad
+
+    for codificacion in CODIFICACIONES:
+        if aceptadas.get(codificacion, aceptadas.get("*", 0)) > 0:
+            return codificacion
+    return None
+
+
+def _compresor(codificacion: str) -> Tuple[Callable[[bytes], bytes], Callable[[], bytes]]:
+    """
+    Funciones (comprimir bloque, terminar) de un compresor incremental.
+    """
+    if codificacion == "br":
+        compresor = brotli.Compressor(quality=COMPRESION_NIVEL_BROTLI) # type: ignore
+        return compresor.process, compresor.finish
+
+    # wbits 31: formato gzip (encabezado y CRC), no deflate crudo
+    compresor = zlib.compressobj(COMPRESION_NIVEL_GZIP, zlib.DEFLATED, 31)
+    return compresor.compress, compresor.flush
+
+
+def _comprimible(headers: List[Tuple[bytes, bytes]]) -> bool:
+    tipo = b""
+    for nombre, valor in headers:
+        if nombre == b"content-encoding":
+            return False
+        if nombre == b"content-type":
+            tipo = valor
+    return tipo.decode("latin-1").startswith(_TIPOS_COMPRIMIBLES)
+
+
+class CompresionMiddleware:
+    """
+    Middleware ASGI que comprime con brotli o gzip las respuestas de texto/JSON
+    de al menos `COMPRESION_MINIMO` bytes.
+
+    Una respuesta de un solo bloque se comprime entera. Las que llegan en varios
+    bloques (exportaciones con `StreamingResponse`) se comprimen a medida que
+    pasan, sin juntarlas en memoria, y se mandan sin `content-length`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+
+    async def __call__(self, scope, receive, send):
+        if not COMPRESION_ACTIVA or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        accept_encoding = ""
+        for nombre, valor in scope["headers"]:
+            if nombre == b"accept-encoding":
+                accept_encoding = valor.decode("latin-1")
+        codificacion = elegir_codificacion(accept_encoding)
+
+        inicio: dict = {}
+        modo = None
+        comprimir = terminar = None
+
+        async def enviar(mensaje):
+            nonlocal modo, comprimir, terminar
+
+            if mensaje["type"] == "http.response.start":
+                # Se retiene hasta ver el primer bloque del cuerpo
+                inicio.update(mensaje)
+                return
+
+            if mensaje["type"] != "http.response.body":
+                await send(mensaje)
+                return
+
+            cuerpo = mensaje.get("body", b"")
+            mas = mensaje.get("more_body", False)
+
+            if modo is None:
+                headers = [
+                    (nombre, valor) for nombre, valor in inicio.get("headers", [])
+                    if nombre != b"vary" or valor.lower() != b"accept-encoding"
+                ]
+
+                if not _comprimible(headers):
+                    modo = "directo"
+                    await send(inicio)
+                    await send(mensaje)
+                    return
+
+                # La respuesta varía según lo que acepta el cliente, aunque esta vez no se comprima
+                headers.append((b"vary", b"Accept-Encoding"))
+
+                if codificacion is None or (not mas and len(cuerpo) < COMPRESION_MINIMO):
+                    modo = "directo"
+                    await send({**inicio, "headers": headers})
+                    await send(mensaje)
+                    return
+
+                comprimir, terminar = _compresor(codificacion)
+                headers = [(nombre, valor) for nombre, valor in headers if nombre != b"content-length"]
+                headers.append((b"content-encoding", codificacion.encode()))
+
+                if not mas:
+                    comprimido = comprimir(cuerpo) + terminar()
+                    headers.append((b"content-length", str(len(comprimido)).encode()))
+                    modo = "directo"
+                    await send({**inicio, "headers": headers})
+                    await send({"type": "http.response.body", "body": comprimido})
+                    return
+
+                modo = "streaming"
+                await send({**inicio, "headers": headers})
+
+            elif modo == "directo":
+                await send(mensaje)
+                return
+
+            # Streaming: cada bloque sale comprimido; el compresor puede retener
+            # datos hasta juntar suficiente, así que se omiten los bloques vacíos
+            comprimido = comprimir(cuerpo) + (b"" if mas else terminar()) # type: ignore
+            if comprimido or not mas:
+                await send({"type": "http.response.body", "body": comprimido, "more_body": mas})
+
+        await self.app(scope, receive, enviar)
+
+        # Respuesta sin cuerpo (ej: 304): se manda el inicio retenido tal cual
+        if inicio and modo is None:
+            await send(inicio)
@@ -0,0 +1,73 @@
+import os
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+from sqlalchemy import func
+from sqlmodel import SQLModel, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.db import ES_SQLITE
+from models.version import VersionTabla
+
+
+# Cantidad máxima de totales con filtros guardados; al pasarla se descartan los menos usados
+CONTEO_MAXIMO = int(os.getenv("CONTEO_MAXIMO", "256"))
+
+HEADER_TOTAL = "X-Total-Count"
+
+# (tabla, filtros) -> (total, versión de la tabla con la que se contó)
+_totales: "OrderedDict[Tuple[str, tuple], Tuple[int, int]]" = OrderedDict()
+
+
+def _clave(tabla: str, filtros: Dict[str, Any]) -> Tuple[str, tuple]:
+    return tabla, tuple(sorted((nombre, str(valor)) for nombre, valor in filtros.items()))
+
+
+async def contar(
+    session: AsyncSession,
+    modelo: type[SQLModel],
+    filtros: Optional[Dict[str, Any]] = None,
+    condiciones: Sequence = (),
+) -> int:
+    """
+    Total de registros de `modelo` que cumplen `condiciones`, sin paginar.
+
+    En SQLite el total sin filtros es la cantidad de filas que llevan los triggers
+    de `versiones_tablas`: no recorre la tabla. Los totales con filtros se guardan
+    por `filtros` (los valores que generan `condiciones`) junto con la versión de
+    la tabla, y valen mientras nadie la modifique, sea este worker, otro o un script.
+
+        total = await conteo.contar(session, Recaudacion, filtros.model_dump(exclude_none=True), filtros.condiciones())
+    """
+    if not ES_SQLITE:
+        resultado = await session.exec(select(func.count()).select_from(modelo).where(*condiciones))
+        return resultado.one()
+
+    tabla: str = modelo.__tablename__ # type: ignore
+    # Columnas sueltas y no el objeto: la sesión podría devolver uno leído antes
+    resultado = await session.exec(
+        select(VersionTabla.version, VersionTabla.filas).where(VersionTabla.tabla == tabla)
+    )
+    version = resultado.first()
+
+    if not filtros and version is not None and version.filas is not None:
+        return version.filas
+
+    clave = _clave(tabla, filtros or {})
+    guardado = _totales.get(clave)
+    if guardado and version is not None and guardado[1] == version.version:
+        _totales.move_to_end(clave)
+        return guardado[0]
+
+    resultado = await session.exec(select(func.count()).select_from(modelo).where(*condiciones))
+    total = resultado.one()
+
+    # La versión se leyó antes de contar: si una escritura entra en el medio,
+    # el total queda guardado con la versión vieja y se vuelve a contar
+    if version is not None:
+        _totales[clave] = (total, version.version)
+        _totales.move_to_end(clave)
+        while len(_totales) > CONTEO_MAXIMO:
+            _totales.popitem(last=False)
+
+    return total
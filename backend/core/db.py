@@ -1,11 +1,19 @@
 import os
-from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+from core.instrumentacion import instrumentar_engine
 
 from models.chofer import *
 from models.coche import *
 from models.recaudacion import *
+from models.resumen import *
+from models.tasa import *
+from models.version import *
+from models.busqueda import *
 
 
 # Lee la URL de la base de datos desde una variable de entorno.
@@ -19,15 +27,87 @@ if DATABASE_URL.startswith("sqlite"):
     if db_dir:
         os.makedirs(db_dir, exist_ok=True)
 
+ES_SQLITE = DATABASE_URL.startswith("sqlite")
+
+# Muestra el SQL generado. Solo para desarrollo: en producción llena el log y frena cada consulta.
+DB_ECHO = os.getenv("DB_ECHO", "false").lower() in ("1", "true", "yes")
+
+# Pool de conexiones por worker
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+
+# Ajustes de SQLite que se aplican a cada conexión nueva.
+# Con WAL los lectores no bloquean al escritor, y `busy_timeout` hace que un
+# worker espere el lock en lugar de fallar con "database is locked".
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
 # El argumento `connect_args` es necesario solo para SQLite para evitar
 # errores de concurrencia en un entorno asíncrono.
-connect_args = {"check_same_thread": False} if DATABASE_URL.startswith("sqlite") else {}
+connect_args = (
+    {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+    if ES_SQLITE else {}
+)
+
+# Una base SQLite en memoria usa una única conexión compartida, sin pool configurable
+opciones_pool = {} if ES_SQLITE and ":memory:" in DATABASE_URL else {
+    "pool_size": DB_POOL_SIZE,
+    "max_overflow": DB_MAX_OVERFLOW,
+    "pool_timeout": DB_POOL_TIMEOUT,
+    "pool_recycle": DB_POOL_RECYCLE,
+    "pool_pre_ping": not ES_SQLITE,
+}
+
+engine = create_async_engine(
+    DATABASE_URL,
+    echo=DB_ECHO,
+    future=True,
+    connect_args=connect_args,
+    **opciones_pool,
+)
+
+# Cantidad y duración de las consultas de cada request (ver `core.instrumentacion`)
+instrumentar_engine(engine.sync_engine)
+
+
+if ES_SQLITE:
+    @event.listens_for(engine.sync_engine, "connect")
+    def configurar_sqlite(dbapi_connection, connection_record) -> None:
+        """
+        PRAGMAs por conexión. `journal_mode` queda guardado en el archivo,
+        el resto vale solo para la conexión que se abre.
+        """
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        # Negativo: tamaño en KiB en lugar de páginas
+        cursor.execute(f"PRAGMA cache_size=-{SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+# Fábrica de sesiones compartida por requests, tareas en segundo plano y scripts
+async_session = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+
+
+def crear_indices(connection: Connection) -> None:
+    """
+    Crea los índices declarados en los modelos que falten en la base de datos.
+
+    `create_all` solo crea índices junto con tablas nuevas, por lo que en una
+    base ya existente los índices agregados después no se crean solos.
+    """
+    for tabla in SQLModel.metadata.sorted_tables:
+        for indice in tabla.indexes:
+            indice.create(connection, checkfirst=True)
 
-engine = create_async_engine(DATABASE_URL, echo=True, future=True, connect_args=connect_args)
 
 async def get_session() -> AsyncSession:
-    async_session = sessionmaker(
-        engine, class_=AsyncSession, expire_on_commit=False
-    )
     async with async_session() as session:
         yield session
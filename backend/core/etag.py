@@ -0,0 +1,81 @@
+import hashlib
+import os
+from fastapi import Request, Response, status
+from sqlmodel import select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.db import ES_SQLITE
+from models.version import VersionTabla
+
+
+# Los contadores los mantienen triggers de SQLite; con otra base no hay ETag.
+ETAG_ACTIVO = ES_SQLITE and os.getenv("ETAG_ACTIVO", "true").lower() in ("1", "true", "yes")
+
+# Sube con cambios en el formato de las respuestas, para que los ETag anteriores no coincidan
+FORMATO = "1"
+
+
+async def calcular_etag(session: AsyncSession, request: Request, *tablas: str) -> str:
+    """
+    ETag débil a partir de los contadores de cambios de las tablas que lee el endpoint
+    y de la URL pedida. No depende del contenido: se calcula sin correr la consulta.
+
+    Se lee antes que los datos. Si una escritura entra en el medio, la respuesta
+    puede ser más nueva que su ETag y el próximo request recibe un 200 de más,
+    nunca un 304 con datos viejos.
+    """
+    resultado = await session.exec(
+        select(VersionTabla).where(col(VersionTabla.tabla).in_(tablas)).order_by(col(VersionTabla.tabla))
+    )
+    versiones = ",".join(f"{v.tabla}={v.version}" for v in resultado.all())
+
+    crudo = f"{FORMATO}|{versiones}|{request.url.path}?{request.url.query}"
+    return f'W/"{hashlib.sha1(crudo.encode()).hexdigest()[:20]}"'
+
+
+def coincide(request: Request, etag: str) -> bool:
+    """
+    Compara con `If-None-Match` (comparación débil: se ignora el `W/`).
+    """
+    pedido = request.headers.get("if-none-match")
+    if not pedido:
+        return False
+    if pedido.strip() == "*":
+        return True
+
+    valor = etag.removeprefix("W/")
+    return any(candidato.strip().removeprefix("W/") == valor for candidato in pedido.split(","))
+
+
+def no_modificado(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers_etag(etag))
+
+
+def headers_etag(etag: str) -> dict:
+    # `no-cache`: el navegador guarda la respuesta pero siempre la revalida con el ETag
+    return {"ETag": etag, "Cache-Control": "no-cache"}
+
+
+async def verificar_etag(
+    request: Request,
+    response: Response,
+    session: AsyncSession,
+    *tablas: str
+) -> Response | None:
+    """
+    Calcula el ETag del request. Si el cliente ya tiene esa versión devuelve
+    la respuesta `304 Not Modified` para que el endpoint la retorne sin consultar
+    ni serializar. Si no, agrega el ETag a `response` y devuelve `None`.
+
+        if no_modificada := await verificar_etag(request, response, session, "choferes"):
+            return no_modificada
+    """
+    if not ETAG_ACTIVO:
+        return None
+
+    etag = await calcular_etag(session, request, *tablas)
+    if coincide(request, etag):
+        return no_modificado(etag)
+
+    response.headers.update(headers_etag(etag))
+    return None
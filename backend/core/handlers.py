@@ -1,3 +1,4 @@
+from typing import Any, Sequence
 from fastapi import FastAPI, Request, status
 from fastapi.encoders import jsonable_encoder
 from fastapi.exceptions import RequestValidationError
@@ -13,18 +14,27 @@ ERROR_MESSAGES = {
     "bool_parsing": "El valor debe ser un booleano (true/false).",
     "greater_than": "El número es demasiado pequeño.",
     "less_than": "El número es demasiado grande.",
+    "extra_forbidden": "Este campo no se puede modificar.",
 }
 
-async def validation_exception_handler(request: Request, exc: RequestValidationError):
+def detalle_error(tipo: str, loc: Sequence, msg: str, valor: Any) -> dict:
     """
-    Handler personalizado para errores de validación (422).
-    Traduce los mensajes técnicos a español para no perder detalles del error.
+    Un error con la forma de los de Pydantic: tipo, ubicación, mensaje y valor recibido.
+    Lo usan `traducir_errores` y las validaciones propias (ej: las de la importación
+    de recaudaciones), así el cliente lee todos los errores igual.
+    """
+    return {"type": tipo, "loc": loc, "msg": msg, "input": valor}
+
 
+def traducir_errores(errores: list) -> list:
+    """
+    Traduce los mensajes técnicos de Pydantic a español para no perder detalles del error.
+    Recibe el resultado de `exc.errors()` de un `RequestValidationError` o `ValidationError`.
     """
 
     errores_procesados: list = []
 
-    for error in exc.errors():
+    for error in errores:
         # error es un diccionario (dentro de una lista de diccionarios por cada error):
         # {
         #   'type': 'missing', 'loc': ('body', 'codigo_chofer'), 'msg': 'Field required', 'input': { 'nombre': '123123123', 'fecha_ingreso': '2026-02-03' } 
@@ -46,26 +56,21 @@ async def validation_exception_handler(request: Request, exc: RequestValidationE
                 # Si no está queda el mensaje por defecto
                 mensaje_final = mensaje_original
 
-        # print(error["input"])
+        errores_procesados.append(
+            detalle_error(tipo_error, error["loc"], mensaje_final, error["input"])
+        )
 
-        # loc_error = error["loc"][-1]
-        # campos_ingresados: dict = error["input"]
+    return errores_procesados
 
-        # if loc_error in campos_ingresados.keys():
-        #     input_final = campos_ingresados.get(error["input"])
-        # else:
-        #     input_final = ""
-            
-        # print(input_final)
 
-        errores_procesados.append(
-            {
-                "type": tipo_error,
-                "loc": error["loc"],
-                "msg": mensaje_final,
-                "input": error["input"]
-            }
-        )
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """
+    Handler personalizado para errores de validación (422).
+    Traduce los mensajes técnicos a español para no perder detalles del error.
+
+    """
+
+    errores_procesados = traducir_errores(exc.errors())
 
     return JSONResponse(
         status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
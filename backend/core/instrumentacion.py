@@ -0,0 +1,157 @@
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Optional
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# Mide las consultas de cada request y las informa en el header `Server-Timing`
+SQL_INSTRUMENTACION = os.getenv("SQL_INSTRUMENTACION", "true").lower() in ("1", "true", "yes")
+
+# Consultas que tardan más que esto (en milisegundos) se registran en el log `sql.lento`
+SQL_LENTO_MS = float(os.getenv("SQL_LENTO_MS", "200"))
+
+# Solo para desarrollo: avisa cuando un request repite la misma consulta más de
+# esta cantidad de veces (típico N+1 por relaciones cargadas de a una). 0 lo desactiva.
+SQL_N_MAS_1_UMBRAL = int(os.getenv("SQL_N_MAS_1_UMBRAL", "0"))
+
+# Largo máximo del SQL que se escribe en los logs
+LARGO_SQL_LOG = 500
+
+logger_lento = logging.getLogger("sql.lento")
+logger_n_mas_1 = logging.getLogger("sql.n_mas_1")
+
+# Listas de parámetros expandidas (`IN (?, ?, ?)`) cuentan como una sola forma de consulta
+_PARAMETROS_REPETIDOS = re.compile(r"\(\s*(\?|%\(\w+\)s|\$\d+)(\s*,\s*(\?|%\(\w+\)s|\$\d+))*\s*\)")
+_ESPACIOS = re.compile(r"\s+")
+
+
+@dataclass
+class EstadisticasSQL:
+    """
+    Consultas ejecutadas durante un request.
+    """
+    cantidad: int = 0
+    duracion: float = 0.0
+    mas_lenta: float = 0.0
+    formas: Counter = field(default_factory=Counter)
+    # Se cierra al terminar de enviar la respuesta: lo que corre después
+    # (tareas en segundo plano) no se cuenta como parte del request.
+    cerrado: bool = False
+    scope: dict = field(default_factory=dict)
+
+
+_estadisticas: ContextVar[Optional[EstadisticasSQL]] = ContextVar("estadisticas_sql", default=None)
+
+
+def forma_consulta(sql: str) -> str:
+    return _PARAMETROS_REPETIDOS.sub("(?)", _ESPACIOS.sub(" ", sql).strip())
+
+
+def _ruta(scope: dict) -> str:
+    """
+    Plantilla de la ruta (ej: `/api/recaudaciones/{id}`) para agrupar requests.
+    """
+    route = scope.get("route")
+    return getattr(route, "path_format", None) or scope.get("path", "")
+
+
+def instrumentar_engine(engine: Engine) -> None:
+    """
+    Registra los eventos que miden cada consulta del engine (el `sync_engine`
+    si es asíncrono) y las suman a las estadísticas del request en curso.
+    """
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def antes(conn, cursor, statement, parameters, context, executemany):
+        context._inicio_instrumentacion = time.perf_counter()
+
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def despues(conn, cursor, statement, parameters, context, executemany):
+        duracion = time.perf_counter() - context._inicio_instrumentacion
+
+        estadisticas = _estadisticas.get()
+        if estadisticas is not None and not estadisticas.cerrado:
+            estadisticas.cantidad += 1
+            estadisticas.duracion += duracion
+            estadisticas.mas_lenta = max(estadisticas.mas_lenta, duracion)
+            if SQL_N_MAS_1_UMBRAL:
+                estadisticas.formas[forma_consulta(statement)] += 1
+
+        if duracion * 1000 >= SQL_LENTO_MS:
+            scope = estadisticas.scope if estadisticas is not None else {}
+            logger_lento.warning(json.dumps({
+                "evento": "consulta_lenta",
+                "metodo": scope.get("method"),
+                "ruta": _ruta(scope) or None,
+                "duracion_ms": round(duracion * 1000, 2),
+                "executemany": executemany,
+                "sql": forma_consulta(statement)[:LARGO_SQL_LOG],
+            }, ensure_ascii=False))
+
+
+class InstrumentacionSQLMiddleware:
+    """
+    Middleware ASGI que abre las estadísticas de cada request y agrega
+    el header `Server-Timing` con la cantidad de consultas, el tiempo total
+    en la base y la consulta más lenta.
+
+    Es ASGI puro (sin `BaseHTTPMiddleware`) para que el endpoint corra en la
+    misma tarea y vea las estadísticas del request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not SQL_INSTRUMENTACION:
+            await self.app(scope, receive, send)
+            return
+
+        estadisticas = EstadisticasSQL(scope=scope)
+        token = _estadisticas.set(estadisticas)
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                mensaje.setdefault("headers", [])
+                mensaje["headers"] = [*mensaje["headers"], (b"server-timing", self._server_timing(estadisticas))]
+            elif mensaje["type"] == "http.response.body" and not mensaje.get("more_body", False):
+                estadisticas.cerrado = True
+            await send(mensaje)
+
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            estadisticas.cerrado = True
+            _estadisticas.reset(token)
+            if SQL_N_MAS_1_UMBRAL:
+                self._detectar_n_mas_1(scope, estadisticas)
+
+
+    @staticmethod
+    def _server_timing(estadisticas: EstadisticasSQL) -> bytes:
+        return (
+            f'db;dur={estadisticas.duracion * 1000:.2f};desc="{estadisticas.cantidad} consultas", '
+            f'db-max;dur={estadisticas.mas_lenta * 1000:.2f}'
+        ).encode("latin-1")
+
+
+    @staticmethod
+    def _detectar_n_mas_1(scope: dict, estadisticas: EstadisticasSQL) -> None:
+        for forma, repeticiones in estadisticas.formas.items():
+            if repeticiones > SQL_N_MAS_1_UMBRAL:
+                logger_n_mas_1.warning(json.dumps({
+                    "evento": "posible_n_mas_1",
+                    "metodo": scope.get("method"),
+                    "ruta": _ruta(scope),
+                    "repeticiones": repeticiones,
+                    "sql": forma[:LARGO_SQL_LOG],
+                }, ensure_ascii=False))
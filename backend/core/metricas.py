@@ -0,0 +1,262 @@
+import asyncio
+import json
+import os
+import tempfile
+import time
+from bisect import bisect_left
+from typing import Dict, List, Tuple
+
+
+# Carpeta compartida por los workers de uvicorn. Cada proceso vuelca ahí sus
+# métricas en `<pid>.json` y `/metrics` suma los archivos de todos.
+METRICAS_DIR = os.getenv("METRICAS_DIR", os.path.join(tempfile.gettempdir(), "adm_taxis_metricas"))
+
+# Cada cuántos segundos un worker vuelca sus métricas a disco
+METRICAS_INTERVALO = float(os.getenv("METRICAS_INTERVALO", "5"))
+
+# Límites (en segundos) de los buckets del histograma de latencia
+BUCKETS_LATENCIA = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Metrica:
+    """
+    Métrica en memoria del proceso, con un valor por combinación de etiquetas.
+    """
+    tipo = ""
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = ()):
+        self.nombre = nombre
+        self.ayuda = ayuda
+        self.etiquetas = etiquetas
+        self.valores: Dict[Tuple[str, ...], float] = {}
+        _registro.append(self)
+
+
+class Contador(Metrica):
+    tipo = "counter"
+
+    def inc(self, *etiquetas: str, cantidad: float = 1) -> None:
+        self.valores[etiquetas] = self.valores.get(etiquetas, 0) + cantidad
+
+
+class Gauge(Metrica):
+    """
+    Valor actual por proceso. Al sumar los workers solo cuentan los procesos vivos.
+    """
+    tipo = "gauge"
+
+    def set(self, valor: float, *etiquetas: str) -> None:
+        self.valores[etiquetas] = valor
+
+    def inc(self, *etiquetas: str, cantidad: float = 1) -> None:
+        self.valores[etiquetas] = self.valores.get(etiquetas, 0) + cantidad
+
+
+class Histograma(Metrica):
+    """
+    Guarda por etiquetas la cantidad de observaciones de cada bucket
+    (no acumulada), más la suma de los valores observados.
+    """
+    tipo = "histogram"
+
+    def __init__(self, nombre: str, ayuda: str, etiquetas: Tuple[str, ...] = (), buckets=BUCKETS_LATENCIA):
+        super().__init__(nombre, ayuda, etiquetas)
+        self.buckets = buckets
+        self.valores: Dict[Tuple[str, ...], List[float]] = {} # type: ignore
+
+    def observar(self, valor: float, *etiquetas: str) -> None:
+        # Un lugar por bucket, uno para +Inf y uno para la suma
+        fila = self.valores.setdefault(etiquetas, [0] * (len(self.buckets) + 2))
+        fila[bisect_left(self.buckets, valor)] += 1
+        fila[-1] += valor
+
+
+_registro: List[Metrica] = []
+
+
+HTTP_REQUESTS = Contador(
+    "http_requests_total", "Requests HTTP atendidos.", ("method", "route", "status")
+)
+HTTP_DURACION = Histograma(
+    "http_request_duration_seconds", "Duración de los requests HTTP en segundos.", ("method", "route", "status")
+)
+HTTP_EN_CURSO = Gauge(
+    "http_requests_in_progress", "Requests HTTP en curso."
+)
+DB_POOL = Gauge(
+    "db_pool_connections", "Conexiones del pool de la base por estado.", ("state",)
+)
+RECAUDACIONES_CREADAS = Contador(
+    "recaudaciones_creadas_total", "Recaudaciones registradas, individuales o por importación.", ("origen",)
+)
+
+
+def _actualizar_pool() -> None:
+    from core.db import engine
+
+    pool = engine.pool
+    # Los pools sin tamaño (SQLite en memoria) no tienen estas estadísticas
+    if not hasattr(pool, "size"):
+        return
+
+    DB_POOL.set(pool.size(), "size")
+    DB_POOL.set(pool.checkedout(), "checked_out")
+    DB_POOL.set(pool.checkedin(), "checked_in")
+    DB_POOL.set(max(pool.overflow(), 0), "overflow")
+
+
+def volcar() -> None:
+    """
+    Escribe las métricas de este proceso en `METRICAS_DIR/<pid>.json`,
+    reemplazando el archivo de forma atómica.
+    """
+    _actualizar_pool()
+
+    datos = {
+        metrica.nombre: [[list(etiquetas), valor] for etiquetas, valor in metrica.valores.items()]
+        for metrica in _registro
+    }
+
+    os.makedirs(METRICAS_DIR, exist_ok=True)
+    destino = os.path.join(METRICAS_DIR, f"{os.getpid()}.json")
+    temporal = f"{destino}.tmp"
+    with open(temporal, "w") as archivo:
+        json.dump(datos, archivo)
+    os.replace(temporal, destino)
+
+
+async def volcar_periodicamente() -> None:
+    """
+    Tarea de fondo de cada worker: vuelca sus métricas cada `METRICAS_INTERVALO`.
+    """
+    while True:
+        await asyncio.sleep(METRICAS_INTERVALO)
+        volcar()
+
+
+def _proceso_vivo(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _leer_procesos() -> List[Tuple[int, dict]]:
+    procesos = []
+    if not os.path.isdir(METRICAS_DIR):
+        return procesos
+
+    for nombre in os.listdir(METRICAS_DIR):
+        if not nombre.endswith(".json"):
+            continue
+        try:
+            with open(os.path.join(METRICAS_DIR, nombre)) as archivo:
+                procesos.append((int(nombre[:-5]), json.load(archivo)))
+        except (OSError, ValueError):
+            # Archivo de otro proceso a medio escribir o ajeno; se lee en el próximo scrape
+            continue
+
+    return procesos
+
+
+def _escapar(valor: str) -> str:
+    return valor.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _etiquetas(nombres: Tuple[str, ...], valores, extra: str = "") -> str:
+    pares = [f'{nombre}="{_escapar(str(valor))}"' for nombre, valor in zip(nombres, valores)]
+    if extra:
+        pares.append(extra)
+    return "{" + ",".join(pares) + "}" if pares else ""
+
+
+def _numero(valor: float) -> str:
+    return str(int(valor)) if float(valor).is_integer() else repr(float(valor))
+
+
+def exponer() -> str:
+    """
+    Suma las métricas de todos los workers y las devuelve en el formato de texto
+    de Prometheus. Contadores e histogramas incluyen procesos ya terminados;
+    los gauges solo los de procesos vivos.
+    """
+    volcar()
+
+    procesos = _leer_procesos()
+    lineas: List[str] = []
+
+    for metrica in _registro:
+        total: Dict[tuple, object] = {}
+
+        for pid, datos in procesos:
+            if metrica.tipo == "gauge" and not _proceso_vivo(pid):
+                continue
+
+            for etiquetas, valor in datos.get(metrica.nombre, []):
+                clave = tuple(etiquetas)
+                if isinstance(metrica, Histograma):
+                    acumulado = total.setdefault(clave, [0] * len(valor))
+                    total[clave] = [a + b for a, b in zip(acumulado, valor)] # type: ignore
+                else:
+                    total[clave] = total.get(clave, 0) + valor # type: ignore
+
+        lineas.append(f"# HELP {metrica.nombre} {metrica.ayuda}")
+        lineas.append(f"# TYPE {metrica.nombre} {metrica.tipo}")
+
+        for clave, valor in sorted(total.items()):
+            if isinstance(metrica, Histograma):
+                acumulado = 0
+                for limite, cantidad in zip((*metrica.buckets, "+Inf"), valor): # type: ignore
+                    acumulado += cantidad
+                    le = f'le="{limite}"'
+                    lineas.append(f"{metrica.nombre}_bucket{_etiquetas(metrica.etiquetas, clave, le)} {_numero(acumulado)}")
+                lineas.append(f"{metrica.nombre}_sum{_etiquetas(metrica.etiquetas, clave)} {_numero(valor[-1])}") # type: ignore
+                lineas.append(f"{metrica.nombre}_count{_etiquetas(metrica.etiquetas, clave)} {_numero(acumulado)}")
+            else:
+                lineas.append(f"{metrica.nombre}{_etiquetas(metrica.etiquetas, clave)} {_numero(valor)}") # type: ignore
+
+    return "\n".join(lineas) + "\n"
+
+
+class MetricasMiddleware:
+    """
+    Middleware ASGI que cuenta y mide cada request por método, plantilla
+    de ruta y código de estado, y lleva los requests en curso.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        estado = {"codigo": 500}
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                estado["codigo"] = mensaje["status"]
+            await send(mensaje)
+
+        inicio = time.perf_counter()
+        HTTP_EN_CURSO.inc()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            HTTP_EN_CURSO.inc(cantidad=-1)
+
+            # Plantilla y no la URL real, para no abrir una serie por cada id.
+            # Las URLs que no coinciden con ninguna ruta se agrupan juntas.
+            route = scope.get("route")
+            ruta = getattr(route, "path_format", None) or "sin_ruta"
+            etiquetas = (scope["method"], ruta, str(estado["codigo"]))
+
+            HTTP_REQUESTS.inc(*etiquetas)
+            HTTP_DURACION.observar(time.perf_counter() - inicio, *etiquetas)
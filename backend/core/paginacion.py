@@ -0,0 +1,73 @@
+import base64
+import json
+from typing import Any, Callable, List, Tuple
+
+from fastapi import HTTPException, Response, status
+
+
+# Header donde se devuelve el cursor de la página siguiente.
+# Si no viene en la respuesta, no hay más registros.
+HEADER_NEXT_CURSOR = "X-Next-Cursor"
+
+# Tamaño de página máximo de los listados
+MAX_LIMIT = 1000
+
+
+def codificar_cursor(*valores: Any) -> str:
+    """
+    Genera un cursor opaco a partir de los valores de la clave de orden
+    del último registro devuelto. ej: (fecha_turno, id)
+    """
+    crudo = json.dumps(valores, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(crudo.encode()).decode().rstrip("=")
+
+
+def decodificar_cursor(cursor: str, tipos: Tuple[Callable[[Any], Any], ...]) -> List[Any]:
+    """
+    Recupera los valores de la clave de orden desde un cursor opaco.
+
+    Args:
+        cursor: Cursor recibido del cliente.
+        tipos: Conversor para cada valor de la clave. ej: (date.fromisoformat, int)
+
+    Raises:
+        HTTPException (400): Si el cursor está mal formado o fue manipulado.
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        valores = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+
+        if not isinstance(valores, list) or len(valores) != len(tipos):
+            raise ValueError(cursor)
+
+        return [convertir(valor) for convertir, valor in zip(tipos, valores)]
+
+    except (TypeError, ValueError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor de paginación no válido."
+        )
+
+
+def recortar_pagina(filas: list, limit: int, response: Response, clave) -> list:
+    """
+    Recibe `limit + 1` filas, devuelve solo `limit` y si sobró alguna
+    agrega el header `X-Next-Cursor` con la clave del último registro.
+
+    Args:
+        filas: Resultado de la consulta pedido con `limit + 1`.
+        limit: Tamaño de página solicitado.
+        response: Respuesta donde se escribe el header.
+        clave: Función que devuelve la tupla de orden de una fila.
+    """
+    # Los endpoints validan `limit >= 1`; sin filas no hay clave para el cursor
+    if limit < 1:
+        return []
+
+    if len(filas) <= limit:
+        return filas
+
+    pagina = filas[:limit]
+    response.headers[HEADER_NEXT_CURSOR] = codificar_cursor(*clave(pagina[-1]))
+
+    return pagina
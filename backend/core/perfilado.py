@@ -0,0 +1,196 @@
+import hmac
+import os
+import random
+import re
+import sys
+import threading
+from collections import Counter
+from datetime import datetime
+from typing import List
+
+
+# Fracción de requests que se perfilan al azar (0.01 = 1%). 0 lo desactiva.
+PERFILADO_FRACCION = float(os.getenv("PERFILADO_FRACCION", "0"))
+
+# Con este valor en el header `X-Perfilar` se perfila el request, sin importar la fracción.
+# También es el que habilita los endpoints para listar y descargar perfiles.
+PERFILADO_TOKEN = os.getenv("PERFILADO_TOKEN", "")
+
+# Sin fracción ni token el middleware ni siquiera se monta
+PERFILADO_ACTIVO = PERFILADO_FRACCION > 0 or bool(PERFILADO_TOKEN)
+
+# Carpeta donde se guardan los perfiles y cuántos se conservan (se borran los más viejos)
+PERFILADO_DIR = os.getenv("PERFILADO_DIR", "data/perfiles")
+PERFILADO_MAXIMO = int(os.getenv("PERFILADO_MAXIMO", "50"))
+
+# Cada cuántos milisegundos se toma una muestra de las pilas
+PERFILADO_INTERVALO_MS = float(os.getenv("PERFILADO_INTERVALO_MS", "2"))
+
+HEADER_PERFILAR = "X-Perfilar"
+HEADER_PERFIL = "X-Perfil"
+
+EXTENSION = ".folded"
+
+# Funciones donde un hilo está esperando (event loop sin trabajo, pool de threads o
+# hilos de aiosqlite ociosos). Esas muestras no suman al perfil.
+_ESPERAS = {
+    ("selectors.py", "select"),
+    ("threading.py", "wait"),
+    ("queue.py", "get"),
+}
+
+_CARACTERES_RUTA = re.compile(r"[^a-zA-Z0-9]+")
+
+
+class MuestreadorPilas(threading.Thread):
+    """
+    Toma cada `intervalo` segundos la pila de todos los hilos del proceso
+    (event loop, threadpool y conexiones de aiosqlite) y cuenta cuántas
+    veces aparece cada una.
+
+    El resultado está en formato "folded" (`hilo;funcion (archivo:linea);... N`),
+    que leen flamegraph.pl, inferno o speedscope. La línea es la que se estaba
+    ejecutando en cada frame, así se distingue por ejemplo un hilo de aiosqlite
+    esperando trabajo de uno ejecutando una consulta.
+
+    Al muestrear el proceso entero, si hay otros requests en paralelo
+    también aparecen en el perfil.
+    """
+
+    def __init__(self, intervalo: float):
+        super().__init__(name="perfilado", daemon=True)
+        self.intervalo = intervalo
+        self.pilas: Counter = Counter()
+        self._fin = threading.Event()
+
+
+    def detener(self) -> None:
+        self._fin.set()
+        self.join()
+
+
+    def run(self) -> None:
+        propio = threading.get_ident()
+
+        while not self._fin.wait(self.intervalo):
+            nombres = {hilo.ident: hilo.name for hilo in threading.enumerate()}
+
+            for ident, frame in sys._current_frames().items():
+                if ident == propio:
+                    continue
+
+                codigo = frame.f_code
+                if (os.path.basename(codigo.co_filename), codigo.co_name) in _ESPERAS:
+                    continue
+
+                pila: List[str] = []
+                while frame is not None:
+                    codigo = frame.f_code
+                    pila.append(
+                        f"{codigo.co_name} ({os.path.basename(codigo.co_filename)}:{frame.f_lineno})"
+                        .replace(";", ":")
+                    )
+                    frame = frame.f_back
+
+                pila.append(nombres.get(ident, str(ident)).replace(";", ":"))
+                self.pilas[";".join(reversed(pila))] += 1
+
+
+    def folded(self) -> str:
+        return "".join(f"{pila} {cantidad}\n" for pila, cantidad in self.pilas.most_common())
+
+
+def token_valido(token: str | None) -> bool:
+    return bool(PERFILADO_TOKEN) and token is not None and hmac.compare_digest(token, PERFILADO_TOKEN)
+
+
+def listar_perfiles() -> List[dict]:
+    """
+    Perfiles guardados, del más nuevo al más viejo.
+    """
+    if not os.path.isdir(PERFILADO_DIR):
+        return []
+
+    perfiles = []
+    for nombre in os.listdir(PERFILADO_DIR):
+        if not nombre.endswith(EXTENSION):
+            continue
+        try:
+            datos = os.stat(os.path.join(PERFILADO_DIR, nombre))
+        except OSError:
+            # Lo borró la rotación de otro worker entre el listado y el stat
+            continue
+        perfiles.append({
+            "nombre": nombre,
+            "bytes": datos.st_size,
+            "creado": datetime.fromtimestamp(datos.st_mtime),
+        })
+
+    return sorted(perfiles, key=lambda perfil: perfil["creado"], reverse=True)
+
+
+def ruta_perfil(nombre: str) -> str | None:
+    """
+    Ruta en disco de un perfil, o `None` si el nombre no es de un perfil existente.
+    Solo acepta nombres simples dentro de `PERFILADO_DIR`.
+    """
+    if os.path.basename(nombre) != nombre or not nombre.endswith(EXTENSION):
+        return None
+
+    ruta = os.path.join(PERFILADO_DIR, nombre)
+    return ruta if os.path.isfile(ruta) else None
+
+
+def _guardar(nombre: str, contenido: str) -> None:
+    os.makedirs(PERFILADO_DIR, exist_ok=True)
+    with open(os.path.join(PERFILADO_DIR, nombre), "w") as archivo:
+        archivo.write(contenido)
+
+    for perfil in listar_perfiles()[PERFILADO_MAXIMO:]:
+        try:
+            os.remove(os.path.join(PERFILADO_DIR, perfil["nombre"]))
+        except OSError:
+            pass
+
+
+class PerfiladoMiddleware:
+    """
+    Middleware ASGI que perfila una fracción de los requests, o los que
+    traen `X-Perfilar` con el token de administración, y guarda el perfil
+    en `PERFILADO_DIR`. La respuesta indica el archivo en el header `X-Perfil`.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+
+    def _debe_perfilar(self, scope) -> bool:
+        if PERFILADO_TOKEN:
+            for clave, valor in scope["headers"]:
+                if clave == b"x-perfilar":
+                    return token_valido(valor.decode("latin-1"))
+
+        return PERFILADO_FRACCION > 0 and random.random() < PERFILADO_FRACCION
+
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._debe_perfilar(scope):
+            await self.app(scope, receive, send)
+            return
+
+        momento = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+        ruta = _CARACTERES_RUTA.sub("_", scope["path"]).strip("_")
+        nombre = f"{momento}_{scope['method']}_{ruta}{EXTENSION}"
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start":
+                mensaje["headers"] = [*mensaje.get("headers", []), (b"x-perfil", nombre.encode("latin-1"))]
+            await send(mensaje)
+
+        muestreador = MuestreadorPilas(PERFILADO_INTERVALO_MS / 1000)
+        muestreador.start()
+        try:
+            await self.app(scope, receive, enviar)
+        finally:
+            muestreador.detener()
+            _guardar(nombre, muestreador.folded())
@@ -0,0 +1,183 @@
+import os
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from fastapi import HTTPException, Response, status
+from pydantic import TypeAdapter
+from sqlmodel import SQLModel
+
+
+# Los listados leen columnas sueltas y las serializan con pydantic-core, sin pasar
+# por los objetos del ORM ni por la validación del `response_model`.
+# La salida es el mismo JSON (ver `python -m scripts.benchmark_serializacion`).
+JSON_RAPIDO = os.getenv("JSON_RAPIDO", "false").lower() in ("1", "true", "yes")
+
+# Serializa por el tipo de cada valor: Decimal como texto, fechas ISO y enums por su valor,
+# igual que los campos de los esquemas públicos.
+_FILAS = TypeAdapter(List[Dict[str, Any]])
+
+
+def _lista(valor: Optional[str]) -> List[str]:
+    return [parte.strip() for parte in (valor or "").split(",") if parte.strip()]
+
+
+class Proyeccion:
+    """
+    Campos de un listado y de sus relaciones expandidas (ej: `chofer`), leídos
+    como columnas sueltas con un único `select`, sin objetos del ORM.
+
+    Uso:
+        proyeccion = Proyeccion.desde_parametros(fields, expand, RecaudacionPublic, relaciones, claves=("fecha_turno", "id"))
+        ...select(*proyeccion.columnas(Recaudacion, tablas={"chofer": Chofer}))...
+        filas = [proyeccion.armar(fila) for fila in resultado.all()]
+
+    La consulta debe hacer el join de cada relación expandida.
+    """
+
+    def __init__(self, campos: List[str], relaciones: Dict[str, List[str]], claves: Sequence[str] = ("id",)):
+        self.campos = campos
+        self.relaciones = relaciones
+
+        # Orden de las columnas del `select`: los campos pedidos, las `claves` (el orden
+        # del cursor) aunque no se hayan pedido, y de cada relación su `id` y sus campos
+        self._nombres = list(dict.fromkeys([*campos, *claves]))
+        self._nombres_relaciones = {
+            relacion: list(dict.fromkeys(["id", *campos_relacion]))
+            for relacion, campos_relacion in relaciones.items()
+        }
+
+        # Posición en la fila de cada campo a devolver
+        self._posiciones: List[Tuple[str, int]] = [(campo, self._nombres.index(campo)) for campo in campos]
+        self._posiciones_relaciones: List[Tuple[str, int, List[Tuple[str, int]]]] = []
+        inicio = len(self._nombres)
+        for relacion, nombres in self._nombres_relaciones.items():
+            self._posiciones_relaciones.append((
+                relacion,
+                inicio,
+                [(campo, inicio + nombres.index(campo)) for campo in relaciones[relacion]],
+            ))
+            inicio += len(nombres)
+
+
+    @classmethod
+    def completa(
+        cls,
+        esquema: type[SQLModel],
+        relaciones: Optional[Dict[str, type[SQLModel]]] = None,
+        claves: Sequence[str] = ("id",),
+    ) -> "Proyeccion":
+        """
+        Todos los campos del esquema y todas las relaciones: la respuesta normal del listado.
+        """
+        return cls(
+            list(esquema.model_fields),
+            {nombre: list(relacion.model_fields) for nombre, relacion in (relaciones or {}).items()},
+            claves,
+        )
+
+
+    @classmethod
+    def desde_parametros(
+        cls,
+        fields: Optional[str],
+        expand: Optional[str],
+        esquema: type[SQLModel],
+        relaciones: Optional[Dict[str, type[SQLModel]]] = None,
+        claves: Sequence[str] = ("id",),
+    ) -> Optional["Proyeccion"]:
+        """
+        Interpreta los parámetros `fields` y `expand` de un listado.
+
+        - **fields**: campos separados por coma. ej: `fecha_turno,total_recaudado,chofer.nombre`
+        Un campo de una relación (`chofer.nombre`) la expande con solo esos campos.
+        Si `fields` no nombra campos propios, van todos.
+        - **expand**: relaciones a incluir completas. ej: `chofer,coche`
+
+        `claves` son las columnas del orden del cursor, que se leen siempre.
+
+        Returns:
+            `None` si no vino ninguno de los dos (respuesta completa).
+
+        Raises:
+            HTTPException (400): Si algún campo o relación no existe.
+        """
+        if fields is None and expand is None:
+            return None
+
+        relaciones = relaciones or {}
+        campos: List[str] = []
+        pedidas: Dict[str, List[str]] = {}
+
+        for campo in _lista(fields):
+            relacion, _, campo_relacion = campo.rpartition(".")
+            if not relacion:
+                _validar(campo, esquema.model_fields, "el campo")
+                campos.append(campo)
+            else:
+                _validar(relacion, relaciones, "la relación")
+                _validar(campo_relacion, relaciones[relacion].model_fields, f"el campo de {relacion}")
+                pedidas.setdefault(relacion, []).append(campo_relacion)
+
+        for relacion in _lista(expand):
+            _validar(relacion, relaciones, "la relación")
+            pedidas[relacion] = list(relaciones[relacion].model_fields)
+
+        if fields is None or not campos:
+            campos = list(esquema.model_fields)
+
+        # Mismo orden de claves que el esquema, sin repetidos
+        return cls(
+            [campo for campo in esquema.model_fields if campo in campos],
+            {
+                relacion: [campo for campo in relaciones[relacion].model_fields if campo in pedidas[relacion]]
+                for relacion in relaciones if relacion in pedidas
+            },
+            claves,
+        )
+
+
+    def columnas(self, tabla: type[SQLModel], tablas: Optional[Dict[str, type[SQLModel]]] = None) -> list:
+        """
+        Columnas del `select`, en el orden en que las lee `armar`.
+        `tablas` es el modelo de cada relación expandida. ej: {"chofer": Chofer}
+        """
+        seleccion = [getattr(tabla, nombre) for nombre in self._nombres]
+        for relacion, nombres in self._nombres_relaciones.items():
+            seleccion += [getattr((tablas or {})[relacion], nombre) for nombre in nombres]
+
+        return seleccion
+
+
+    def armar(self, fila: Sequence[Any]) -> Dict[str, Any]:
+        """
+        Diccionario con los campos pedidos de una fila del `select` de `columnas`.
+        Una relación sin registro (outer join vacío) queda en `None`.
+        """
+        resultado = {campo: fila[posicion] for campo, posicion in self._posiciones}
+
+        for relacion, posicion_id, posiciones in self._posiciones_relaciones:
+            resultado[relacion] = (
+                {campo: fila[posicion] for campo, posicion in posiciones}
+                if fila[posicion_id] is not None else None
+            )
+
+        return resultado
+
+
+def _validar(nombre: str, disponibles: Iterable[str], tipo: str) -> None:
+    if nombre not in disponibles:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"No existe {tipo} '{nombre}'. Disponibles: {', '.join(disponibles) or 'ninguno'}."
+        )
+
+
+def respuesta_json(datos: List[Dict[str, Any]], response: Response) -> Response:
+    """
+    Respuesta JSON ya serializada. Copia los headers que el endpoint escribió
+    en `response` (cursor, ETag), que FastAPI no agrega a una respuesta propia.
+    """
+    return Response(
+        content=_FILAS.dump_json(datos),
+        media_type="application/json",
+        headers=dict(response.headers),
+    )
@@ -1,4 +1,5 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
 from sqlmodel import SQLModel
 from contextlib import asynccontextmanager
@@ -7,8 +8,21 @@ from contextlib import asynccontextmanager
 from routers import recaudacion
 from routers import coche
 from routers import chofer
+from routers import reporte
+from routers import tasa
+from routers import perfilado as perfilado_router
 from core.handlers import configure_exception_handlers
-from core.db import engine
+from core.paginacion import HEADER_NEXT_CURSOR
+from core.instrumentacion import InstrumentacionSQLMiddleware
+from core.cache import CacheRespuestasMiddleware, HEADER_CACHE
+from core.conteo import HEADER_TOTAL
+from core.compresion import CompresionMiddleware
+from core import metricas
+from core import perfilado
+from core.db import engine, async_session, crear_indices
+from services.resumen_services import ResumenService
+from services.tasa_services import TasaService
+from services.recaudacion_services import RecaudacionService
 
 
 @asynccontextmanager
@@ -19,10 +33,30 @@ async def lifespan(app: FastAPI):
 
     async with engine.begin() as conn:
         await conn.run_sync(SQLModel.metadata.create_all)
+        await conn.run_sync(crear_indices)
+
+    async with async_session() as session:
+        # Sin tasas cargadas, registra los porcentajes históricos
+        await TasaService(session).asegurar_tasa_inicial(
+            RecaudacionService.Porcentaje.SUELDO.value,
+            RecaudacionService.Porcentaje.APORTE.value,
+        )
+
+        # Si los resúmenes diarios son nuevos en una base con historial, los construye
+        resumenes = ResumenService(session)
+        if await resumenes.esta_vacio():
+            print("📊 Construyendo resúmenes diarios...")
+            await resumenes.reconstruir()
+            await session.commit()
+
+    # Cada worker vuelca sus métricas a disco para sumarlas en /metrics
+    volcado_metricas = asyncio.create_task(metricas.volcar_periodicamente())
 
     yield
     # --- CÓDIGO DE APAGADO ---
     print("👋 Apagando aplicación...")
+    volcado_metricas.cancel()
+    metricas.volcar()
 
 # Inicializa la App con el lifespan
 app = FastAPI(
@@ -37,19 +71,41 @@ origins = [ "adm-taxis.themattdev.com", "www.adm-taxis.themattdev.com", "wwww.th
 ]
 
 
+# Cache de respuestas de los endpoints marcados con `cacheada` (ver `core.cache`).
+# Se agrega primero para quedar por dentro de CORS, la instrumentación y las métricas.
+app.add_middleware(CacheRespuestasMiddleware)
+
 app.add_middleware(
     CORSMiddleware,
     allow_origins=origins,
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=[HEADER_NEXT_CURSOR, "Server-Timing", perfilado.HEADER_PERFIL, HEADER_CACHE, HEADER_TOTAL, "ETag"],
 )
 
+# gzip (o brotli si está instalado) para respuestas grandes, incluidas las exportaciones.
+# Por dentro de las métricas y el perfilado, que así incluyen el tiempo de comprimir.
+app.add_middleware(CompresionMiddleware)
+
+# Consultas SQL por request: header `Server-Timing`, log de consultas lentas y aviso de N+1
+app.add_middleware(InstrumentacionSQLMiddleware)
+
+# Latencia por ruta, requests en curso y estado del pool, expuestos en /metrics
+app.add_middleware(metricas.MetricasMiddleware)
+
+# Perfilado por muestreo de pilas, solo si está configurado (ver `core.perfilado`)
+if perfilado.PERFILADO_ACTIVO:
+    app.add_middleware(perfilado.PerfiladoMiddleware)
+
 
 # Rutas
 app.include_router(recaudacion.router, prefix="/api")
 app.include_router(coche.router, prefix="/api")
 app.include_router(chofer.router, prefix="/api")
+app.include_router(reporte.router, prefix="/api")
+app.include_router(tasa.router, prefix="/api")
+app.include_router(perfilado_router.router, prefix="/api")
 
 configure_exception_handlers(app)
 
@@ -58,3 +114,11 @@ configure_exception_handlers(app)
 @app.get("/")
 def read_root():
     return {"status": "ok", "message": "Sistema de Gestión de Flota Activo"}
+
+
+# Métricas en formato de texto de Prometheus, sumadas entre todos los workers.
+# Fuera de /api: nginx no la publica, se consulta desde la red interna.
+# Es async para leer las métricas del proceso desde el mismo hilo que las modifica.
+@app.get("/metrics", include_in_schema=False)
+async def leer_metricas():
+    return Response(content=metricas.exponer(), media_type=metricas.CONTENT_TYPE)
@@ -0,0 +1,64 @@
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlmodel import SQLModel
+
+
+# Índice de texto de los choferes (FTS5) sobre la tabla `choferes`, sin copiar los datos.
+# Lo usa `GET /choferes/buscar` (ver `services.busqueda_services`).
+TABLA_BUSQUEDA_CHOFERES = "choferes_busqueda"
+COLUMNAS_BUSQUEDA_CHOFERES = ("nombre", "apellido", "cedula_identidad", "codigo_chofer")
+
+# `remove_diacritics 2`: sin importar acentos ni la ñ ("ibanez" encuentra "Ibáñez").
+# `prefix`: índices de los prefijos de 1 a 3 letras, para buscar mientras se escribe.
+_TOKENIZER = "unicode61 remove_diacritics 2"
+_PREFIJOS = "1 2 3"
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def crear_indice_busqueda_choferes(target, connection: Connection, **kw) -> None:
+    """
+    Después de cada `create_all` crea el índice de búsqueda si falta, lo llena
+    con los choferes existentes y crea los triggers que lo mantienen al día.
+
+    Con triggers el índice refleja también las altas y cambios de los
+    scripts que escriben directo en la base.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+
+    columnas = ", ".join(COLUMNAS_BUSQUEDA_CHOFERES)
+    existe = connection.exec_driver_sql(
+        "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (TABLA_BUSQUEDA_CHOFERES,)
+    ).first()
+
+    if not existe:
+        connection.exec_driver_sql(
+            f"CREATE VIRTUAL TABLE {TABLA_BUSQUEDA_CHOFERES} USING fts5("
+            f"{columnas}, content='choferes', content_rowid='id', "
+            f"tokenize='{_TOKENIZER}', prefix='{_PREFIJOS}')"
+        )
+        connection.exec_driver_sql(
+            f"INSERT INTO {TABLA_BUSQUEDA_CHOFERES} ({TABLA_BUSQUEDA_CHOFERES}) VALUES ('rebuild')"
+        )
+
+    # El índice no guarda los textos: para sacar una fila hay que pasarle los valores viejos
+    nuevos = ", ".join(f"new.{columna}" for columna in COLUMNAS_BUSQUEDA_CHOFERES)
+    viejos = ", ".join(f"old.{columna}" for columna in COLUMNAS_BUSQUEDA_CHOFERES)
+    agregar = f"INSERT INTO {TABLA_BUSQUEDA_CHOFERES} (rowid, {columnas}) VALUES (new.id, {nuevos});"
+    sacar = (
+        f"INSERT INTO {TABLA_BUSQUEDA_CHOFERES} ({TABLA_BUSQUEDA_CHOFERES}, rowid, {columnas}) "
+        f"VALUES ('delete', old.id, {viejos});"
+    )
+
+    triggers = {
+        "insert": ("INSERT", agregar),
+        # Solo cuando cambia un campo indexado, no con cada cambio de estado o teléfono
+        "update": (f"UPDATE OF {columnas}", sacar + " " + agregar),
+        "delete": ("DELETE", sacar),
+    }
+    for nombre, (evento, cuerpo) in triggers.items():
+        connection.exec_driver_sql(
+            f"CREATE TRIGGER IF NOT EXISTS indexar_choferes_{nombre} "
+            f"AFTER {evento} ON choferes "
+            f"BEGIN {cuerpo} END"
+        )
@@ -0,0 +1,11 @@
+from datetime import datetime
+from sqlmodel import SQLModel
+
+
+class PerfilPublic(SQLModel):
+    """
+    Perfil de un request guardado en disco por el middleware de perfilado.
+    """
+    nombre: str
+    bytes: int
+    creado: datetime
@@ -1,9 +1,10 @@
 from datetime import date
 from enum import Enum
 from decimal import Decimal
-from typing import Optional
-from pydantic import field_validator, model_validator
-from sqlmodel import SQLModel, Field, Relationship
+from typing import Any, Optional
+from pydantic import ConfigDict, field_validator, model_validator
+from sqlalchemy import Index
+from sqlmodel import SQLModel, Field, Relationship, col
 
 from models.chofer import Chofer, ChoferPublic
 from models.coche import Coche, CochePublic
@@ -43,6 +44,16 @@ class RecaudacionBase(SQLModel):
 
 class Recaudacion(RecaudacionBase, table=True):
     __tablename__ = "recaudaciones" # type: ignore
+    __table_args__ = (
+        # Clave de orden y paginación por cursor del listado
+        Index("ix_recaudaciones_fecha_turno_id", "fecha_turno", "id"),
+        # Filtros del listado, terminan en la clave de orden para no ordenar en memoria
+        Index("ix_recaudaciones_chofer_fecha_turno_id", "chofer_id", "fecha_turno", "id"),
+        Index("ix_recaudaciones_coche_fecha_turno_id", "coche_id", "fecha_turno", "id"),
+        Index("ix_recaudaciones_turno_fecha_turno_id", "turno", "fecha_turno", "id"),
+        # Último km_salida de un coche antes de una fecha, sin leer la tabla
+        Index("ix_recaudaciones_coche_fecha_turno_km_salida", "coche_id", "fecha_turno", "km_salida"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
 
@@ -69,6 +80,40 @@ class RecaudacionPublicDetail(RecaudacionPublic):
     coche: Optional[CochePublic] = None
 
 
+class RecaudacionFiltros(SQLModel):
+    """
+    Filtros opcionales del listado de recaudaciones.
+
+    Cada filtro está respaldado por un índice de `recaudaciones`, así
+    las consultas filtradas no recorren la tabla completa.
+    """
+
+    chofer_id: int | None = None
+    coche_id: int | None = None
+    desde: date | None = None
+    hasta: date | None = None
+    turno: Turnos | None = None
+
+    def condiciones(self) -> list:
+        """
+        Devuelve las condiciones `WHERE` de los filtros enviados.
+        """
+        condiciones = []
+
+        if self.chofer_id is not None:
+            condiciones.append(col(Recaudacion.chofer_id) == self.chofer_id)
+        if self.coche_id is not None:
+            condiciones.append(col(Recaudacion.coche_id) == self.coche_id)
+        if self.desde is not None:
+            condiciones.append(col(Recaudacion.fecha_turno) >= self.desde)
+        if self.hasta is not None:
+            condiciones.append(col(Recaudacion.fecha_turno) <= self.hasta)
+        if self.turno is not None:
+            condiciones.append(col(Recaudacion.turno) == self.turno)
+
+        return condiciones
+
+
 class RecaudacionCreate(SQLModel):
     """
     Schema de entrada para crear una Recaudación.
@@ -144,6 +189,17 @@ class RecaudacionCreate(SQLModel):
 
 
 class RecaudacionUpdate(SQLModel):
+    """
+    Schema de entrada para editar una Recaudación.
+
+    Solo admite los datos de entrada del turno. Los campos calculados
+    (salario, liquido, total_entregar, km_totales, rendimiento, etc.) no se
+    pueden escribir: `RecaudacionService` los recalcula cuando cambian sus entradas.
+    Enviar uno de ellos, o cualquier campo desconocido, responde 422.
+    """
+
+    model_config = ConfigDict(extra="forbid")
+
     # Identificadores
     id: int | None = None
     coche_id: int | None = None
@@ -156,18 +212,34 @@ class RecaudacionUpdate(SQLModel):
     # Rendimiento
     km_entrada: int | None = None
     km_salida: int | None = None
-    km_totales: int | None = None
-    rendimiento: Decimal | None = None
 
     # Valores
-    total_recaudado: Decimal | None = None
-    salario: Decimal | None = None
-    combustible: Decimal | None = None
-    otros_gastos: Decimal | None = None
-    total_gastos: Decimal | None = None
-    liquido: Decimal | None = None
-    aportes: Decimal | None = None
-    sub_total: Decimal | None = None
-    h13: Decimal | None = None
-    credito: Decimal | None = None
-    total_entregar: Decimal | None = None
+    total_recaudado: Decimal | None = Field(default=None, max_digits=10, decimal_places=2)
+    combustible: Decimal | None = Field(default=None, max_digits=10, decimal_places=2)
+    otros_gastos: Decimal | None = Field(default=None, max_digits=10, decimal_places=2)
+    h13: Decimal | None = Field(default=None, max_digits=10, decimal_places=2)
+    credito: Decimal | None = Field(default=None, max_digits=10, decimal_places=2)
+
+
+class DetalleError(SQLModel):
+    """
+    Un error de validación, con la forma de los de Pydantic (ver `core.handlers.detalle_error`).
+    """
+    type: str
+    loc: list[str | int]
+    msg: str
+    input: Any = None
+
+
+class ErrorImportacion(SQLModel):
+    indice: int
+    errores: list[DetalleError]
+
+
+class ResultadoImportacion(SQLModel):
+    """
+    Resultado de una importación masiva de recaudaciones.
+    Los errores se informan por `indice` de la fila en el lote (desde 0).
+    """
+    insertadas: int = 0
+    errores: list[ErrorImportacion] = []
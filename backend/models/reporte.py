@@ -0,0 +1,33 @@
+from datetime import date
+from enum import Enum
+from decimal import Decimal
+from sqlmodel import SQLModel
+
+
+class Periodo(str, Enum):
+    DIA="dia"
+    SEMANA="semana"
+    MES="mes"
+
+
+class ReporteTotales(SQLModel):
+    """
+    Fila agregada de un reporte de recaudaciones.
+
+    Las claves de agrupación que no se pidieron quedan en `None`.
+    ej: un reporte por mes y coche trae `periodo` y `coche_id`, pero no `chofer_id`.
+    `periodo` es el primer día del período (lunes para las semanas).
+    """
+
+    # Claves de agrupación
+    periodo: date | None = None
+    coche_id: int | None = None
+    chofer_id: int | None = None
+
+    # Totales
+    cantidad_turnos: int
+    total_recaudado: Decimal
+    liquido: Decimal
+    aportes: Decimal
+    total_entregar: Decimal
+    km_totales: int
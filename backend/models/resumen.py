@@ -0,0 +1,34 @@
+from datetime import date
+from decimal import Decimal
+from sqlmodel import SQLModel, Field
+
+
+class ResumenDiarioBase(SQLModel):
+    """
+    Totales acumulados de las recaudaciones de un día.
+
+    Se mantienen en la misma transacción que cada alta, edición o baja
+    de una recaudación (ver `ResumenService`), así los reportes por período
+    leen unas pocas filas en vez de todo el historial.
+    """
+
+    fecha: date = Field(primary_key=True)
+
+    cantidad_turnos: int = Field(default=0)
+    total_recaudado: Decimal = Field(default=0, max_digits=12, decimal_places=2)
+    liquido: Decimal = Field(default=0, max_digits=12, decimal_places=2)
+    aportes: Decimal = Field(default=0, max_digits=12, decimal_places=2)
+    total_entregar: Decimal = Field(default=0, max_digits=12, decimal_places=2)
+    km_totales: int = Field(default=0)
+
+
+class ResumenDiarioCoche(ResumenDiarioBase, table=True):
+    __tablename__ = "resumen_diario_coches" # type: ignore
+
+    coche_id: int = Field(primary_key=True, foreign_key="coches.id", index=True)
+
+
+class ResumenDiarioChofer(ResumenDiarioBase, table=True):
+    __tablename__ = "resumen_diario_choferes" # type: ignore
+
+    chofer_id: int = Field(primary_key=True, foreign_key="choferes.id", index=True)
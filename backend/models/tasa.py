@@ -0,0 +1,84 @@
+from datetime import date, datetime
+from enum import Enum
+from decimal import Decimal
+from typing import Optional
+from pydantic import field_validator
+from sqlmodel import SQLModel, Field
+
+
+class TasaComisionBase(SQLModel):
+    # Desde qué fecha de turno se aplica (inclusive)
+    vigente_desde: date = Field(unique=True, index=True)
+
+    sueldo: Decimal = Field(max_digits=5, decimal_places=4)
+    aporte: Decimal = Field(max_digits=5, decimal_places=4)
+
+
+class TasaComision(TasaComisionBase, table=True):
+    """
+    Porcentajes de sueldo y aportes vigentes a partir de una fecha.
+
+    La tasa de un turno es la de mayor `vigente_desde` que no supere su `fecha_turno`.
+    """
+    __tablename__ = "tasas_comision" # type: ignore
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    def __repr__(self):
+        return f"<Tasa desde {self.vigente_desde}: sueldo {self.sueldo}, aporte {self.aporte}>"
+
+
+class TasaComisionPublic(TasaComisionBase):
+    id: int
+
+
+class TasaComisionCreada(TasaComisionPublic):
+    reliquidacion_id: int
+
+
+class TasaComisionCreate(TasaComisionBase):
+    """
+    Schema de entrada para una nueva tasa.
+
+    Al crearla se re-liquidan en segundo plano los turnos afectados.
+    """
+
+    @field_validator("sueldo", "aporte")
+    @classmethod
+    def validar_porcentaje(cls, v: Decimal) -> Decimal:
+        """
+        Reglas:
+        - Debe estar entre 0 y 1. ej: 0.29 para 29%
+        """
+        if v < 0 or v > 1:
+            raise ValueError("El porcentaje debe estar entre 0 y 1 (ej: 0.29 para 29%).")
+        return v
+
+
+class EstadoReliquidacion(str, Enum):
+    PENDIENTE="Pendiente"
+    EN_CURSO="En curso"
+    FINALIZADA="Finalizada"
+    ERROR="Error"
+
+
+class Reliquidacion(SQLModel, table=True):
+    """
+    Progreso de un trabajo de re-liquidación de recaudaciones.
+    Se guarda en la base para poder consultarlo desde cualquier worker.
+    """
+    __tablename__ = "reliquidaciones" # type: ignore
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+
+    # Rango de fecha_turno afectado (inclusive). Sin `hasta` llega hasta hoy.
+    desde: date
+    hasta: Optional[date] = Field(default=None)
+
+    estado: EstadoReliquidacion = Field(default=EstadoReliquidacion.PENDIENTE)
+    total: int = Field(default=0)
+    procesadas: int = Field(default=0)
+    error: Optional[str] = Field(default=None)
+
+    creada: datetime = Field(default_factory=datetime.now)
+    finalizada: Optional[datetime] = Field(default=None)
@@ -0,0 +1,70 @@
+import random
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from typing import Optional
+from sqlmodel import SQLModel, Field
+
+
+# Tablas con contador de cambios. Lo usan los ETag de los GET (ver `core.etag`)
+# y la cache de tasas de cada worker (ver `TasaService`).
+TABLAS_VERSIONADAS = ("choferes", "coches", "recaudaciones", "tasas_comision")
+
+
+class VersionTabla(SQLModel, table=True):
+    """
+    Contador de cambios y cantidad de filas por tabla. Los mantienen triggers
+    de SQLite en cada INSERT, UPDATE o DELETE, así cuentan también las
+    escrituras de otros workers y de los scripts que escriben directo en la base.
+    """
+    __tablename__ = "versiones_tablas" # type: ignore
+
+    tabla: str = Field(primary_key=True)
+    version: int = Field(default=0)
+    # Total de filas de la tabla, sin contarlas (ver `core.conteo`)
+    filas: Optional[int] = Field(default=None)
+
+    def __repr__(self):
+        return f"<Versión {self.tabla}: {self.version}>"
+
+
+@event.listens_for(SQLModel.metadata, "after_create")
+def crear_triggers_versiones(target, connection: Connection, **kw) -> None:
+    """
+    Después de cada `create_all` registra las tablas versionadas que falten, cuenta
+    sus filas la primera vez y crea los triggers que mantienen ambos contadores.
+
+    El contador arranca en un valor al azar: una base recreada no repite
+    versiones, y un ETag de la base anterior no da un 304 equivocado.
+    """
+    if connection.dialect.name != "sqlite":
+        return
+
+    # Bases creadas antes de que se guardara la cantidad de filas
+    columnas = [fila[1] for fila in connection.exec_driver_sql("PRAGMA table_info(versiones_tablas)")]
+    if "filas" not in columnas:
+        connection.exec_driver_sql("ALTER TABLE versiones_tablas ADD COLUMN filas INTEGER")
+
+    for tabla in TABLAS_VERSIONADAS:
+        connection.exec_driver_sql(
+            "INSERT OR IGNORE INTO versiones_tablas (tabla, version) VALUES (?, ?)",
+            (tabla, random.randrange(2 ** 31)),
+        )
+        connection.exec_driver_sql(
+            f"UPDATE versiones_tablas SET filas = (SELECT count(*) FROM {tabla}) "
+            f"WHERE tabla = ? AND filas IS NULL",
+            (tabla,),
+        )
+
+        for operacion, diferencia in (("INSERT", "+ 1"), ("DELETE", "- 1")):
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS contar_{tabla}_{operacion.lower()} "
+                f"AFTER {operacion} ON {tabla} "
+                f"BEGIN UPDATE versiones_tablas SET filas = filas {diferencia} WHERE tabla = '{tabla}'; END"
+            )
+
+        for operacion in ("INSERT", "UPDATE", "DELETE"):
+            connection.exec_driver_sql(
+                f"CREATE TRIGGER IF NOT EXISTS versionar_{tabla}_{operacion.lower()} "
+                f"AFTER {operacion} ON {tabla} "
+                f"BEGIN UPDATE versiones_tablas SET version = version + 1 WHERE tabla = '{tabla}'; END"
+            )
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
-from typing import List
+from sqlmodel import select, col
+from sqlmodel.sql.expression import Select
+from typing import Dict, List, Optional
 
+from core import cache, claves, conteo, serializacion
 from core.db import get_session
+from core.etag import verificar_etag
+from core.paginacion import MAX_LIMIT, decodificar_cursor, recortar_pagina
+from services.busqueda_services import MAX_RESULTADOS_BUSQUEDA, BusquedaService
 from models.chofer import (
     Chofer, ChoferPublic,
     ChoferCreate, ChoferUpdate,
@@ -58,6 +63,7 @@ async def crear_chofer(
     try:
         session.add(nuevo_chofer)
         await session.commit()
+        await cache.invalidar("choferes")
         await session.refresh(nuevo_chofer)
 
         return nuevo_chofer
@@ -76,24 +82,185 @@ async def crear_chofer(
     response_model=List[ChoferPublic],
     response_description="Lista paginada de choferes.",
 )
+@cache.cacheada("choferes")
 async def leer_choferes(
-    offset: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     session: AsyncSession = Depends(get_session)
 ):
     """
     Obtiene el listado completo de choferes en la flota.
 
     - **offset**: Cantidad de registros a saltar (para paginación).
-    - **limit**: Cantidad máxima de registros a devolver (default 100).
+    - **limit**: Cantidad máxima de registros a devolver (default 100, máximo 1000).
+    - **cursor**: Valor del header `X-Next-Cursor` de la página anterior.
+    Si se envía, se ignora `offset`.
+    - **fields**: Campos a devolver, separados por coma. ej: fields=id,codigo_chofer,nombre,apellido
+
+    Devuelve en `X-Total-Count` el total de choferes, sin paginar.
+
+    Devuelve un `ETag`: con `If-None-Match` y sin cambios en los choferes responde `304`.
     """
 
-    query = (select(Chofer).offset(offset).limit(limit))
+    if no_modificada := await verificar_etag(request, response, session, "choferes"):
+        return no_modificada
+
+    response.headers[conteo.HEADER_TOTAL] = str(await conteo.contar(session, Chofer))
+
+    # Con `fields` o `JSON_RAPIDO` se leen columnas sueltas, sin objetos del ORM (ver `core.serializacion`)
+    proyeccion = serializacion.Proyeccion.desde_parametros(fields, None, ChoferPublic)
+    if proyeccion is None and serializacion.JSON_RAPIDO:
+        proyeccion = serializacion.Proyeccion.completa(ChoferPublic)
+
+    # `Select` y no `select`: con una sola columna (ej: fields=id) `select` devuelve valores sueltos, no filas
+    query = (
+        Select(*proyeccion.columnas(Chofer)) if proyeccion else select(Chofer)
+    ).order_by(col(Chofer.id)).limit(limit + 1)
+
+    if cursor:
+        id_cursor, = decodificar_cursor(cursor, (int,))
+        query = query.where(col(Chofer.id) > id_cursor)
+    else:
+        query = query.offset(offset)
 
     resultado = await session.exec(query)
+
+    if proyeccion:
+        filas = recortar_pagina(list(resultado.all()), limit, response, clave=lambda c: (c.id,))
+        return serializacion.respuesta_json([proyeccion.armar(fila) for fila in filas], response)
+
     choferes = resultado.all()
 
-    return choferes
+    return recortar_pagina(list(choferes), limit, response, clave=lambda c: (c.id,))
+
+
+@router.get(
+    "/buscar",
+    response_model=List[ChoferPublic],
+    response_description="Choferes que coinciden con la búsqueda, los más relevantes primero.",
+)
+async def buscar_choferes(
+    q: str,
+    limit: int = Query(20, ge=1, le=MAX_RESULTADOS_BUSQUEDA),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Busca choferes por nombre, apellido, cédula o código, sin importar mayúsculas ni acentos.
+    Pensado para autocompletar mientras se escribe.
+
+    - **q**: Texto a buscar. Cada palabra debe ser el comienzo de alguna palabra de
+    nombre, apellido, cédula o código. ej: q=jose per, q=ibanez, q=5123
+    - **limit**: Cantidad máxima de resultados (default 20, máximo 100).
+
+    Primero van las coincidencias exactas de código o cédula y después el resto
+    por relevancia (pesa más el apellido).
+    """
+
+    return await BusquedaService(session).buscar_choferes(q, limit)
+
+
+@router.get(
+    "/codigo",
+    response_model=Dict[str, Optional[ChoferPublic]],
+    response_description="Chofer de cada código de chofer pedido, `null` si no existe.",
+)
+async def obtener_choferes_por_codigo_lote(
+    request: Request,
+    response: Response,
+    valores: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Busca varios choferes por código de chofer en una sola consulta (ej: los de una planilla).
+
+    - **valores**: Códigos separados por coma, hasta 500. ej: valores=104,2231
+
+    Devuelve un objeto con cada valor pedido y su chofer, o `null` si no existe.
+    """
+
+    if no_modificada := await verificar_etag(request, response, session, "choferes"):
+        return no_modificada
+
+    return await claves.buscar_por_clave(session, Chofer, "codigo_chofer", claves.separar(valores))
+
+
+@router.get(
+    "/codigo/{codigo}",
+    response_model=ChoferPublic,
+    response_description="Chofer solicitado.",
+)
+async def obtener_chofer_por_codigo(
+    request: Request,
+    response: Response,
+    codigo: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Busca un chofer por su código de chofer, sin conocer su ID interno.
+    """
+
+    if no_modificada := await verificar_etag(request, response, session, "choferes"):
+        return no_modificada
+
+    chofer = await claves.buscar_uno(session, Chofer, "codigo_chofer", codigo)
+    if not chofer:
+        raise HTTPException(status_code=404, detail="Chofer no encontrado")
+
+    return chofer
+
+
+@router.get(
+    "/cedula",
+    response_model=Dict[str, Optional[ChoferPublic]],
+    response_description="Chofer de cada cédula de identidad pedida, `null` si no existe.",
+)
+async def obtener_choferes_por_cedula_lote(
+    request: Request,
+    response: Response,
+    valores: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Busca varios choferes por cédula de identidad en una sola consulta (ej: los de una planilla).
+
+    - **valores**: Cédulas separadas por coma, hasta 500. ej: valores=51234567,49876543
+
+    Devuelve un objeto con cada valor pedido y su chofer, o `null` si no existe.
+    """
+
+    if no_modificada := await verificar_etag(request, response, session, "choferes"):
+        return no_modificada
+
+    return await claves.buscar_por_clave(session, Chofer, "cedula_identidad", claves.separar(valores))
+
+
+@router.get(
+    "/cedula/{cedula}",
+    response_model=ChoferPublic,
+    response_description="Chofer solicitado.",
+)
+async def obtener_chofer_por_cedula(
+    request: Request,
+    response: Response,
+    cedula: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Busca un chofer por su cédula de identidad, sin conocer su ID interno.
+    """
+
+    if no_modificada := await verificar_etag(request, response, session, "choferes"):
+        return no_modificada
+
+    chofer = await claves.buscar_uno(session, Chofer, "cedula_identidad", cedula)
+    if not chofer:
+        raise HTTPException(status_code=404, detail="Chofer no encontrado")
+
+    return chofer
 
 
 @router.get(
@@ -102,6 +269,8 @@ async def leer_choferes(
     response_description="Chofer solicitado.",
 )
 async def leer_chofer(
+    request: Request,
+    response: Response,
     chofer_id: int,
     session: AsyncSession = Depends(get_session)
 ):
@@ -109,6 +278,9 @@ async def leer_chofer(
     Busca un chofer específico por su ID.
     """
 
+    if no_modificada := await verificar_etag(request, response, session, "choferes"):
+        return no_modificada
+
     query = (
         select(Chofer)
         .where(Chofer.id == chofer_id)
@@ -124,6 +296,7 @@ async def leer_chofer(
 
 
 @router.get("/enums/estados")
+@cache.cacheada("enums")
 async def get_estados_chofer():
     """Retorna una lista de objetos con label y value"""
     return [{"label": e.value, "value": e.value} for e in EstadoChofer]
@@ -158,6 +331,8 @@ async def actualizar_chofer(
     try:
         session.add(chofer_db)
         await session.commit()
+        await cache.invalidar("choferes")
+        claves.invalidar("choferes")
         await session.refresh(chofer_db)
 
         return chofer_db
@@ -195,5 +370,6 @@ async def dar_baja_chofer(
 
     session.add(chofer_db)
     await session.commit()
+    await cache.invalidar("choferes")
 
     return chofer_db
@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
-from typing import List
+from sqlmodel import select, col
+from sqlmodel.sql.expression import Select
+from typing import Dict, List, Optional
 
+from core import cache, claves, conteo, serializacion
 from core.db import get_session
+from core.etag import verificar_etag
+from core.paginacion import MAX_LIMIT, decodificar_cursor, recortar_pagina
 from models.coche import (
     Coche, CochePublic,
     CocheCreate, CocheUpdate,
@@ -17,6 +21,11 @@ router = APIRouter(
 )
 
 
+def _matricula(valor: str) -> str:
+    # Se guarda sin el prefijo: "STX-1234" -> "1234" (ver `Coche.matricula_completa`)
+    return valor.strip().upper().removeprefix("STX-")
+
+
 @router.post(
     "/",
     response_model=CochePublic,
@@ -56,6 +65,7 @@ async def crear_coche(
     try:
         session.add(nuevo_coche)
         await session.commit()
+        await cache.invalidar("coches")
         await session.refresh(nuevo_coche)
 
         return nuevo_coche
@@ -74,24 +84,164 @@ async def crear_coche(
     response_model=List[CochePublic],
     response_description="Lista paginada de coches."
 )
+@cache.cacheada("coches")
 async def obtener_coches(
-    offset: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
     session: AsyncSession = Depends(get_session)
 ):
     """
     Obtiene el listado completo de coches en la flota.
 
     - **offset**: Cantidad de registros a saltar (para paginación).
-    - **limit**: Cantidad máxima de registros a devolver (default 100).
+    - **limit**: Cantidad máxima de registros a devolver (default 100, máximo 1000).
+    - **cursor**: Valor del header `X-Next-Cursor` de la página anterior.
+    Si se envía, se ignora `offset`.
+    - **fields**: Campos a devolver, separados por coma. ej: fields=id,movil,matricula
+
+    Devuelve en `X-Total-Count` el total de coches, sin paginar.
+
+    Devuelve un `ETag`: con `If-None-Match` y sin cambios en los coches responde `304`.
     """
 
-    query = (select(Coche).offset(offset).limit(limit))
+    if no_modificada := await verificar_etag(request, response, session, "coches"):
+        return no_modificada
+
+    response.headers[conteo.HEADER_TOTAL] = str(await conteo.contar(session, Coche))
+
+    # Con `fields` o `JSON_RAPIDO` se leen columnas sueltas, sin objetos del ORM (ver `core.serializacion`)
+    proyeccion = serializacion.Proyeccion.desde_parametros(fields, None, CochePublic)
+    if proyeccion is None and serializacion.JSON_RAPIDO:
+        proyeccion = serializacion.Proyeccion.completa(CochePublic)
+
+    # `Select` y no `select`: con una sola columna (ej: fields=id) `select` devuelve valores sueltos, no filas
+    query = (
+        Select(*proyeccion.columnas(Coche)) if proyeccion else select(Coche)
+    ).order_by(col(Coche.id)).limit(limit + 1)
+
+    if cursor:
+        id_cursor, = decodificar_cursor(cursor, (int,))
+        query = query.where(col(Coche.id) > id_cursor)
+    else:
+        query = query.offset(offset)
 
     resultado = await session.exec(query)
+
+    if proyeccion:
+        filas = recortar_pagina(list(resultado.all()), limit, response, clave=lambda c: (c.id,))
+        return serializacion.respuesta_json([proyeccion.armar(fila) for fila in filas], response)
+
     coches = resultado.all()
 
-    return coches
+    return recortar_pagina(list(coches), limit, response, clave=lambda c: (c.id,))
+
+
+@router.get(
+    "/movil",
+    response_model=Dict[str, Optional[CochePublic]],
+    response_description="Coche de cada móvil pedido, `null` si no existe.",
+)
+async def obtener_coches_por_movil_lote(
+    request: Request,
+    response: Response,
+    valores: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Busca varios coches por móvil en una sola consulta (ej: los de una planilla).
+
+    - **valores**: Móviles separados por coma, hasta 500. ej: valores=12,45,103
+
+    Devuelve un objeto con cada valor pedido y su coche, o `null` si no existe.
+    """
+
+    if no_modificada := await verificar_etag(request, response, session, "coches"):
+        return no_modificada
+
+    return await claves.buscar_por_clave(session, Coche, "movil", claves.separar(valores))
+
+
+@router.get(
+    "/movil/{movil}",
+    response_model=CochePublic,
+    response_description="Coche solicitado.",
+)
+async def obtener_coche_por_movil(
+    request: Request,
+    response: Response,
+    movil: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Busca un coche por su móvil, sin conocer su ID interno.
+    """
+
+    if no_modificada := await verificar_etag(request, response, session, "coches"):
+        return no_modificada
+
+    coche = await claves.buscar_uno(session, Coche, "movil", movil)
+    if not coche:
+        raise HTTPException(status_code=404, detail="Coche no encontrado")
+
+    return coche
+
+
+@router.get(
+    "/matricula",
+    response_model=Dict[str, Optional[CochePublic]],
+    response_description="Coche de cada matrícula pedida, `null` si no existe.",
+)
+async def obtener_coches_por_matricula_lote(
+    request: Request,
+    response: Response,
+    valores: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Busca varios coches por matrícula en una sola consulta (ej: los de una planilla).
+
+    - **valores**: Matrículas separadas por coma, hasta 500. ej: valores=1234,5678
+    Se aceptan con o sin el prefijo `STX-`; en la respuesta van sin el prefijo.
+
+    Devuelve un objeto con cada valor pedido y su coche, o `null` si no existe.
+    """
+
+    if no_modificada := await verificar_etag(request, response, session, "coches"):
+        return no_modificada
+
+    matriculas = [_matricula(valor) for valor in claves.separar(valores)]
+
+    return await claves.buscar_por_clave(session, Coche, "matricula", matriculas)
+
+
+@router.get(
+    "/matricula/{matricula}",
+    response_model=CochePublic,
+    response_description="Coche solicitado.",
+)
+async def obtener_coche_por_matricula(
+    request: Request,
+    response: Response,
+    matricula: str,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Busca un coche por su matrícula, sin conocer su ID interno.
+    Se acepta con o sin el prefijo `STX-`.
+    """
+
+    if no_modificada := await verificar_etag(request, response, session, "coches"):
+        return no_modificada
+
+    coche = await claves.buscar_uno(session, Coche, "matricula", _matricula(matricula))
+    if not coche:
+        raise HTTPException(status_code=404, detail="Coche no encontrado")
+
+    return coche
 
 
 @router.get(
@@ -100,6 +250,8 @@ async def obtener_coches(
     response_description="Coche solicitado."
 )
 async def obtener_coche(
+    request: Request,
+    response: Response,
     coche_id: int,
     session: AsyncSession = Depends(get_session)
 ):
@@ -107,6 +259,9 @@ async def obtener_coche(
     Busca un coche específico por su ID único interno.
     """
 
+    if no_modificada := await verificar_etag(request, response, session, "coches"):
+        return no_modificada
+
     query = (
         select(Coche)
         .where(Coche.id == coche_id)
@@ -122,6 +277,7 @@ async def obtener_coche(
 
 
 @router.get("/enums/estados")
+@cache.cacheada("enums")
 async def get_estados_coche():
     """Retorna una lista de objetos con label y value"""
     return [{"label": e.value, "value": e.value} for e in EstadoCoche]
@@ -156,6 +312,8 @@ async def actualizar_coche(
     try:
         session.add(coche_db)
         await session.commit()
+        await cache.invalidar("coches")
+        claves.invalidar("coches")
         await session.refresh(coche_db)
 
         return coche_db
@@ -193,5 +351,6 @@ async def dar_baja_coche(
 
     session.add(coche_db)
     await session.commit()
+    await cache.invalidar("coches")
 
     return coche_db
@@ -0,0 +1,58 @@
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import FileResponse
+from typing import List, Optional
+
+from core import perfilado
+from models.perfil import PerfilPublic
+
+
+def verificar_token(x_perfilar: Optional[str] = Header(default=None)) -> None:
+    """
+    Los perfiles muestran el código interno: solo se accede con el token de administración.
+    """
+    if not perfilado.PERFILADO_TOKEN:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="El perfilado no está habilitado")
+
+    if not perfilado.token_valido(x_perfilar):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Token de perfilado inválido")
+
+
+router = APIRouter(
+    prefix="/perfiles",
+    tags=["Perfilado"],
+    dependencies=[Depends(verificar_token)]
+)
+
+
+@router.get(
+    "/",
+    response_model=List[PerfilPublic],
+    response_description="Perfiles guardados, del más nuevo al más viejo.",
+)
+async def leer_perfiles():
+    """
+    Lista los perfiles de requests guardados en disco.
+
+    Se perfila un request enviando el header `X-Perfilar` con el token de
+    administración; la respuesta trae el nombre del perfil en `X-Perfil`.
+    """
+
+    return perfilado.listar_perfiles()
+
+
+@router.get(
+    "/{nombre}",
+    response_class=FileResponse,
+    response_description="Perfil en formato folded para flamegraph.pl, inferno o speedscope.",
+)
+async def descargar_perfil(nombre: str):
+    """
+    Descarga un perfil. Cada línea es una pila (`hilo;funcion;...`) y la
+    cantidad de muestras en que apareció.
+    """
+
+    ruta = perfilado.ruta_perfil(nombre)
+    if not ruta:
+        raise HTTPException(status_code=404, detail="Perfil no encontrado")
+
+    return FileResponse(ruta, media_type="text/plain", filename=nombre)
@@ -1,17 +1,33 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+import csv
+import io
+from datetime import date
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response, UploadFile, status
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, StreamingResponse
 from sqlmodel.ext.asyncio.session import AsyncSession
-from sqlmodel import select
+from sqlmodel import select, col, or_, and_
 from sqlalchemy.orm import joinedload
-from typing import List
+from typing import List, Optional
 
+from core import cache, conteo, serializacion
 from core.db import get_session
+from core.etag import ETAG_ACTIVO, calcular_etag, coincide, headers_etag, no_modificado, verificar_etag
+from core.paginacion import MAX_LIMIT, decodificar_cursor, recortar_pagina
 from services.recaudacion_services import RecaudacionService
+from services.exportacion_services import ExportacionService, FormatoExportacion
 from models.recaudacion import (
     Recaudacion, RecaudacionCreate,
     RecaudacionPublic,
-    RecaudacionPublicDetail,
-    RecaudacionUpdate, Turnos
+    RecaudacionPublicDetail, RecaudacionFiltros,
+    RecaudacionUpdate, Turnos,
+    ResultadoImportacion
 )
+from models.chofer import Chofer, ChoferPublic
+from models.coche import Coche, CochePublic
+
+
+# Máximo de filas por importación masiva
+MAX_FILAS_IMPORTACION = 20000
 
 
 router = APIRouter(
@@ -19,6 +35,27 @@ router = APIRouter(
     tags=["Recaudaciones"]
 )
 
+# Un lote rechazado responde 422 con el mismo cuerpo que uno aceptado
+RESPUESTAS_IMPORTACION = {
+    status.HTTP_422_UNPROCESSABLE_ENTITY: {
+        "model": ResultadoImportacion,
+        "description": "Lote rechazado: alguna fila tiene errores y no se insertó ninguna.",
+    },
+}
+
+
+def _respuesta_importacion(resultado: ResultadoImportacion, parcial: bool):
+    """
+    Sin `parcial`, un lote con errores no inserta nada: responde 422 para que
+    el cliente no lo tome por aceptado, con los errores de cada fila.
+    """
+    if resultado.errores and not parcial:
+        return JSONResponse(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            content=jsonable_encoder(resultado),
+        )
+    return resultado
+
 
 @router.post(
     "/",
@@ -42,37 +79,229 @@ async def crear_recaudacion(
     return nueva_recaudacion
 
 
+@router.post(
+    "/bulk",
+    response_model=ResultadoImportacion,
+    response_description="Cantidad de recaudaciones insertadas y errores por fila.",
+    responses=RESPUESTAS_IMPORTACION,
+)
+async def importar_recaudaciones(
+    filas: List[dict] = Body(..., max_length=MAX_FILAS_IMPORTACION),
+    parcial: bool = False,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Importa un lote de recaudaciones (ej: todas las planillas del día) en una sola transacción.
+
+    Recibe un array JSON con el mismo formato que `POST /recaudaciones`.
+
+    - **parcial**: Si es `true` inserta las filas válidas aunque otras tengan errores.
+    Por defecto, si alguna fila tiene errores no se inserta ninguna y responde `422`.
+
+    Los errores se devuelven por `indice` de la fila dentro del array (desde 0).
+    """
+
+    service = RecaudacionService(session)
+
+    return _respuesta_importacion(await service.importar_recaudaciones(filas, parcial=parcial), parcial)
+
+
+@router.post(
+    "/bulk/csv",
+    response_model=ResultadoImportacion,
+    response_description="Cantidad de recaudaciones insertadas y errores por fila.",
+    responses=RESPUESTAS_IMPORTACION,
+)
+async def importar_recaudaciones_csv(
+    archivo: UploadFile,
+    parcial: bool = False,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Importa un lote de recaudaciones desde un archivo CSV.
+
+    La primera línea debe tener los nombres de los campos de `POST /recaudaciones`
+    (chofer_id, coche_id, turno, fecha_turno, km_entrada, km_salida, total_recaudado, ...).
+    Las celdas vacías toman el valor por defecto del campo.
+
+    - **parcial**: Igual que en `POST /recaudaciones/bulk`.
+
+    Los errores se devuelven por `indice` de la fila de datos (desde 0, sin contar el encabezado).
+    """
+
+    try:
+        contenido = (await archivo.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El archivo debe ser un CSV en UTF-8."
+        )
+
+    filas = [
+        {campo: valor for campo, valor in fila.items() if campo and valor not in (None, "")}
+        for fila in csv.DictReader(io.StringIO(contenido))
+    ]
+
+    if len(filas) > MAX_FILAS_IMPORTACION:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El archivo supera el máximo de {MAX_FILAS_IMPORTACION} filas."
+        )
+
+    service = RecaudacionService(session)
+
+    return _respuesta_importacion(await service.importar_recaudaciones(filas, parcial=parcial), parcial)
+
+
 @router.get(
     "/",
     response_model=List[RecaudacionPublicDetail],
     response_description="Lista paginada de recaudaciones.",
 )
 async def leer_recaudaciones(
-    offset: int = 0,
-    limit: int = 100,
+    request: Request,
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=MAX_LIMIT),
+    cursor: Optional[str] = None,
+    fields: Optional[str] = None,
+    expand: Optional[str] = None,
+    filtros: RecaudacionFiltros = Depends(),
     session: AsyncSession = Depends(get_session)
 ):
     """
-    Obtiene el listado completo de recaudaciones registradas.
+    Obtiene el listado completo de recaudaciones registradas,
+    ordenadas de la más reciente a la más antigua (`fecha_turno`, `id`).
     
     - **offset**: Cantidad de registros a saltar (para paginación).
-    - **limit**: Cantidad máxima de registros a devolver (default 100).
+    - **limit**: Cantidad máxima de registros a devolver (default 100, máximo 1000).
+    - **cursor**: Valor del header `X-Next-Cursor` de la página anterior.
+    Si se envía, se ignora `offset` y la página se obtiene por índice
+    sin recorrer los registros anteriores.
+
+    **Filtros** (opcionales, combinables):
+    - **chofer_id** / **coche_id**: Solo las recaudaciones de ese chofer o coche.
+    - **desde** / **hasta**: Rango de `fecha_turno`, ambos inclusive.
+    ej: desde=2026-03-01&hasta=2026-03-31
+    - **turno**: Mañana, Noche o Solo.
+
+    **Campos** (opcionales, para traer solo lo que se muestra):
+    - **fields**: Campos a devolver, separados por coma. Los de chofer o coche con prefijo.
+    ej: fields=id,fecha_turno,total_recaudado,chofer.nombre,coche.movil
+    - **expand**: Relaciones completas a incluir: chofer, coche o ambas.
+    Con `fields` o `expand` solo se incluyen las relaciones pedidas.
+
+    Devuelve en `X-Total-Count` el total de recaudaciones con los filtros aplicados, sin paginar.
+
+    Devuelve un `ETag`: con `If-None-Match` y sin cambios en recaudaciones,
+    choferes ni coches responde `304`.
     """
 
-    query = (
-        select(Recaudacion)
-        .options(
+    if no_modificada := await verificar_etag(request, response, session, "recaudaciones", "choferes", "coches"):
+        return no_modificada
+
+    total = await conteo.contar(session, Recaudacion, filtros.model_dump(exclude_none=True), filtros.condiciones())
+    response.headers[conteo.HEADER_TOTAL] = str(total)
+
+    # Con `fields`, `expand` o `JSON_RAPIDO` se leen columnas sueltas, con joins en lugar
+    # de objetos del ORM, y se arma el JSON desde las filas (ver `core.serializacion`)
+    relaciones = {"chofer": ChoferPublic, "coche": CochePublic}
+    # El cursor ordena por fecha e id: se leen aunque no se pidan
+    claves = ("fecha_turno", "id")
+    proyeccion = serializacion.Proyeccion.desde_parametros(fields, expand, RecaudacionPublic, relaciones, claves)
+    if proyeccion is None and serializacion.JSON_RAPIDO:
+        proyeccion = serializacion.Proyeccion.completa(RecaudacionPublic, relaciones, claves)
+
+    if proyeccion:
+        query = select(
+            *proyeccion.columnas(Recaudacion, tablas={"chofer": Chofer, "coche": Coche})
+        )
+        # Solo los joins de las relaciones pedidas
+        if "chofer" in proyeccion.relaciones:
+            query = query.outerjoin(Chofer, col(Chofer.id) == col(Recaudacion.chofer_id))
+        if "coche" in proyeccion.relaciones:
+            query = query.outerjoin(Coche, col(Coche.id) == col(Recaudacion.coche_id))
+    else:
+        query = select(Recaudacion).options(
             joinedload(Recaudacion.chofer), # type: ignore
             joinedload(Recaudacion.coche) # type: ignore
         )
-        .offset(offset)
-        .limit(limit)
+
+    query = (
+        query
+        .where(*filtros.condiciones())
+        .order_by(col(Recaudacion.fecha_turno).desc(), col(Recaudacion.id).desc())
+        .limit(limit + 1)
     )
 
+    if cursor:
+        fecha_cursor, id_cursor = decodificar_cursor(cursor, (date.fromisoformat, int))
+
+        query = query.where(
+            or_(
+                col(Recaudacion.fecha_turno) < fecha_cursor,
+                and_(
+                    col(Recaudacion.fecha_turno) == fecha_cursor,
+                    col(Recaudacion.id) < id_cursor
+                )
+            )
+        )
+    else:
+        query = query.offset(offset)
+
     resultado = await session.exec(query)
+
+    if proyeccion:
+        filas = recortar_pagina(list(resultado.all()), limit, response, clave=lambda r: (r.fecha_turno, r.id))
+        return serializacion.respuesta_json([proyeccion.armar(fila) for fila in filas], response)
+
     recaudaciones = resultado.all()
 
-    return recaudaciones
+    return recortar_pagina(
+        list(recaudaciones), limit, response,
+        clave=lambda r: (r.fecha_turno, r.id)
+    )
+
+
+@router.get(
+    "/exportar",
+    response_class=StreamingResponse,
+    response_description="Archivo CSV o NDJSON con las recaudaciones.",
+)
+async def exportar_recaudaciones(
+    request: Request,
+    formato: FormatoExportacion = FormatoExportacion.CSV,
+    filtros: RecaudacionFiltros = Depends(),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Exporta todas las recaudaciones que cumplan los filtros, sin paginar.
+
+    La respuesta se genera por bloques a medida que se lee la base de datos,
+    por lo que el uso de memoria es el mismo para mil o millones de filas.
+
+    - **formato**: csv (default) o ndjson.
+    - Acepta los mismos filtros que el listado (chofer_id, coche_id, desde, hasta, turno).
+    - Devuelve un `ETag`, como el listado. Si no hubo cambios responde `304` sin volver a exportar.
+    """
+
+    headers = {"Content-Disposition": f'attachment; filename="recaudaciones.{formato.value}"'}
+
+    if ETAG_ACTIVO:
+        etag = await calcular_etag(session, request, "recaudaciones", "choferes", "coches")
+        if coincide(request, etag):
+            return no_modificado(etag)
+        headers.update(headers_etag(etag))
+
+    service = ExportacionService(session)
+
+    media_type = "text/csv" if formato == FormatoExportacion.CSV else "application/x-ndjson"
+
+    return StreamingResponse(
+        service.exportar(filtros, formato),
+        media_type=media_type,
+        headers=headers,
+    )
 
 
 @router.get(
@@ -81,6 +310,8 @@ async def leer_recaudaciones(
     response_description="Recaudacion solicitada.",
 )
 async def leer_recaudacion(
+    request: Request,
+    response: Response,
     recaudacion_id: int,
     session: AsyncSession = Depends(get_session)
 ):
@@ -88,6 +319,9 @@ async def leer_recaudacion(
     Busca una recaudación específica por su ID.
     """
 
+    if no_modificada := await verificar_etag(request, response, session, "recaudaciones", "choferes", "coches"):
+        return no_modificada
+
     query = (
         select(Recaudacion)
         .where(Recaudacion.id == recaudacion_id)
@@ -107,6 +341,7 @@ async def leer_recaudacion(
 
 
 @router.get("/enums/turnos")
+@cache.cacheada("enums")
 async def get_turnos():
     """Retorna una lista de objetos con label y value"""
     return [{"label": e.value, "value": e.value} for e in Turnos]
@@ -129,36 +364,18 @@ async def actualizar_recaudacion(
     Los campos omitidos o nulos se mantendrán con su valor original.
     """
 
-    # Obtiene la recaudación existente
-    db_recaudacion = await session.get(Recaudacion, recaudacion_id)
-    if not db_recaudacion:
-        raise HTTPException(status_code=404, detail="Recaudación no encontrada")
-
-    # Actualiza los datos del modelo con los datos de entrada
-    recaudacion_data = recaudacion_update.model_dump(exclude_unset=True)
-    for key, value in recaudacion_data.items():
-        setattr(db_recaudacion, key, value)
-
-    try:
-        session.add(db_recaudacion)
-        await session.commit()
-
-        # Vuelve a consultar la recaudación con sus relaciones (Eager Loading)
-        query = select(Recaudacion).where(Recaudacion.id == recaudacion_id).options(
-            joinedload(Recaudacion.chofer), joinedload(Recaudacion.coche) # type: ignore
-        )
-        result = await session.exec(query)
-        updated_recaudacion = result.one()
+    service = RecaudacionService(session)
 
-        return updated_recaudacion
+    await service.actualizar_recaudacion(recaudacion_id, recaudacion_update)
 
-    except Exception as e:
-        await session.rollback()
+    # Vuelve a consultar la recaudación con sus relaciones (Eager Loading)
+    query = select(Recaudacion).where(Recaudacion.id == recaudacion_id).options(
+        joinedload(Recaudacion.chofer), joinedload(Recaudacion.coche) # type: ignore
+    )
+    result = await session.exec(query)
+    updated_recaudacion = result.one()
 
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Error al actualizar la recaudación: {str(e)}"
-        )
+    return updated_recaudacion
 
 
 @router.delete(
@@ -172,9 +389,6 @@ async def eliminar_recaudacion(
     """
     Elimina una recaudación específica por su ID.
     """
-    recaudacion_db = await session.get(Recaudacion, recaudacion_id)
-    if not recaudacion_db:
-        raise HTTPException(status_code=404, detail="Recaudación no encontrada")
+    service = RecaudacionService(session)
 
-    await session.delete(recaudacion_db)
-    await session.commit()
+    await service.eliminar_recaudacion(recaudacion_id)
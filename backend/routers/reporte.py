@@ -0,0 +1,104 @@
+from fastapi import APIRouter, Depends
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
+
+from core.db import get_session
+from services.reporte_services import ReporteService
+from models.recaudacion import RecaudacionFiltros
+from models.reporte import Periodo, ReporteTotales
+
+
+router = APIRouter(
+    prefix="/reportes",
+    tags=["Reportes"]
+)
+
+
+@router.get(
+    "/periodos",
+    response_model=List[ReporteTotales],
+    response_description="Totales de la flota por período.",
+)
+async def reporte_por_periodo(
+    periodo: Periodo = Periodo.MES,
+    filtros: RecaudacionFiltros = Depends(),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Totales de toda la flota agrupados por día, semana o mes.
+
+    - **periodo**: dia, semana o mes (default mes).
+    - Acepta los mismos filtros que el listado de recaudaciones
+    (chofer_id, coche_id, desde, hasta, turno).
+    """
+
+    service = ReporteService(session)
+
+    return await service.totales(filtros, periodo=periodo)
+
+
+@router.get(
+    "/coches",
+    response_model=List[ReporteTotales],
+    response_description="Totales por coche.",
+)
+async def reporte_por_coche(
+    periodo: Optional[Periodo] = None,
+    filtros: RecaudacionFiltros = Depends(),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Totales agrupados por coche.
+
+    - **periodo**: Si se envía, además agrupa por dia, semana o mes.
+    - Acepta los mismos filtros que el listado de recaudaciones.
+    """
+
+    service = ReporteService(session)
+
+    return await service.totales(filtros, periodo=periodo, por_coche=True)
+
+
+@router.get(
+    "/choferes",
+    response_model=List[ReporteTotales],
+    response_description="Totales por chofer.",
+)
+async def reporte_por_chofer(
+    periodo: Optional[Periodo] = None,
+    filtros: RecaudacionFiltros = Depends(),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Totales agrupados por chofer.
+
+    - **periodo**: Si se envía, además agrupa por dia, semana o mes.
+    - Acepta los mismos filtros que el listado de recaudaciones.
+    """
+
+    service = ReporteService(session)
+
+    return await service.totales(filtros, periodo=periodo, por_chofer=True)
+
+
+@router.get(
+    "/coches-choferes",
+    response_model=List[ReporteTotales],
+    response_description="Totales por coche y chofer.",
+)
+async def reporte_por_coche_y_chofer(
+    periodo: Optional[Periodo] = None,
+    filtros: RecaudacionFiltros = Depends(),
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Totales agrupados por cada par coche/chofer.
+    Útil para la liquidación mensual de cada chofer en cada móvil.
+
+    - **periodo**: Si se envía, además agrupa por dia, semana o mes.
+    - Acepta los mismos filtros que el listado de recaudaciones.
+    """
+
+    service = ReporteService(session)
+
+    return await service.totales(filtros, periodo=periodo, por_coche=True, por_chofer=True)
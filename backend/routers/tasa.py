@@ -0,0 +1,111 @@
+from datetime import date
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from sqlmodel.ext.asyncio.session import AsyncSession
+from typing import List, Optional
+
+from core.db import get_session
+from services.tasa_services import TasaService
+from services.reliquidacion_services import ReliquidacionService, ejecutar_reliquidacion
+from models.tasa import (
+    TasaComisionCreate, TasaComisionPublic,
+    TasaComisionCreada, Reliquidacion
+)
+
+
+router = APIRouter(
+    prefix="/tasas",
+    tags=["Tasas de comisión"]
+)
+
+
+@router.get(
+    "/",
+    response_model=List[TasaComisionPublic],
+    response_description="Tasas ordenadas por fecha de vigencia.",
+)
+async def leer_tasas(
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Lista el historial de tasas de sueldo y aportes.
+    Cada turno se liquida con la tasa de mayor `vigente_desde` que no supere su `fecha_turno`.
+    """
+
+    service = TasaService(session)
+
+    return await service.listar()
+
+
+@router.post(
+    "/",
+    response_model=TasaComisionCreada,
+    status_code=status.HTTP_201_CREATED,
+    response_description="La tasa creada y el id de la re-liquidación lanzada.",
+)
+async def crear_tasa(
+    datos_entrada: TasaComisionCreate,
+    background_tasks: BackgroundTasks,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Registra una nueva tasa de sueldo y aportes.
+
+    **Re-liquidación**: En segundo plano se vuelven a calcular todas las recaudaciones
+    con `fecha_turno` desde `vigente_desde` hasta el día anterior a la siguiente tasa.
+    El progreso se consulta en `GET /tasas/reliquidaciones/{reliquidacion_id}`.
+
+    - **sueldo** / **aporte**: Entre 0 y 1. ej: 0.29 para 29%
+    """
+
+    service = TasaService(session)
+    nueva_tasa, hasta = await service.crear(datos_entrada)
+
+    reliquidacion = await ReliquidacionService(session).crear_trabajo(nueva_tasa.vigente_desde, hasta)
+    background_tasks.add_task(ejecutar_reliquidacion, reliquidacion.id)
+
+    return TasaComisionCreada(**nueva_tasa.model_dump(), reliquidacion_id=reliquidacion.id)
+
+
+@router.post(
+    "/reliquidaciones",
+    response_model=Reliquidacion,
+    status_code=status.HTTP_202_ACCEPTED,
+    response_description="El trabajo de re-liquidación lanzado.",
+)
+async def crear_reliquidacion(
+    desde: date,
+    background_tasks: BackgroundTasks,
+    hasta: Optional[date] = None,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Vuelve a liquidar en segundo plano las recaudaciones de un rango de fechas
+    con las tasas vigentes. Útil para auditorías o para reparar datos.
+
+    - **desde** / **hasta**: Rango de `fecha_turno`, ambos inclusive. Sin `hasta` llega hasta hoy.
+    """
+
+    reliquidacion = await ReliquidacionService(session).crear_trabajo(desde, hasta)
+    background_tasks.add_task(ejecutar_reliquidacion, reliquidacion.id)
+
+    return reliquidacion
+
+
+@router.get(
+    "/reliquidaciones/{reliquidacion_id}",
+    response_model=Reliquidacion,
+    response_description="Estado y progreso de la re-liquidación.",
+)
+async def leer_reliquidacion(
+    reliquidacion_id: int,
+    session: AsyncSession = Depends(get_session)
+):
+    """
+    Consulta el progreso de una re-liquidación: `procesadas` de `total`.
+    """
+
+    reliquidacion = await session.get(Reliquidacion, reliquidacion_id)
+    if not reliquidacion:
+        raise HTTPException(status_code=404, detail="Re-liquidación no encontrada")
+
+    return reliquidacion
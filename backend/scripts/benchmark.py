@@ -0,0 +1,403 @@
+"""
+Benchmark de los endpoints de la API contra bases sembradas de distintos tamaños.
+
+Para cada escala (cantidad de recaudaciones) crea o reutiliza una base SQLite en
+`DIRECTORIO`, la siembra con `scripts.generar_flota` y recorre los endpoints de
+todos los routers de dos formas:
+
+- **asgi**: en el mismo proceso con `httpx.ASGITransport`, sin red. Mide la app.
+- **uvicorn**: contra un `uvicorn main:app --workers N` real, como en producción.
+
+La base sembrada no se modifica: cada modo corre sobre una copia de trabajo que se
+restaura desde ella antes de empezar, así los POST y PATCH no la hacen crecer entre
+corridas y todos los modos miden sobre los mismos datos.
+
+Informa requests por segundo y p50/p95/p99 por endpoint, y guarda todo en un JSON
+para comparar corridas.
+
+Uso (desde la carpeta `backend`):
+    python -m scripts.benchmark [--escalas 1000 100000 1000000] [--modos asgi uvicorn]
+                                [--requests 200] [--concurrencia 10] [--workers 4]
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import dataclass
+from datetime import date, datetime
+from typing import Callable, Dict, List, Tuple
+
+import httpx
+
+
+ESCALAS = (1_000, 100_000, 1_000_000)
+MODOS = ("asgi", "uvicorn")
+
+# Bases sembradas (se reutilizan entre corridas) y resultados
+DIRECTORIO = "data/benchmarks"
+
+PUERTO_UVICORN = 8765
+
+
+@dataclass
+class Contexto:
+    """
+    Datos de la base sembrada que usan los endpoints para armar sus requests.
+    """
+    coches: int
+    choferes: int
+    recaudaciones: int
+    desde: date
+    hasta: date
+    km_maximo: int
+
+
+@dataclass
+class Endpoint:
+    nombre: str
+    metodo: str
+    # Recibe el contexto y el número de request, devuelve (url, json)
+    armar: Callable[[Contexto, int], Tuple[str, dict | None]]
+
+
+def _mes(ctx: Contexto) -> str:
+    inicio = ctx.hasta.replace(day=1)
+    return f"desde={inicio}&hasta={ctx.hasta}"
+
+
+# Uno o más por cada router. Las escrituras van a la copia de trabajo (ver `correr_escala`).
+# No se miden los DELETE: cada id se borra una sola vez y los GET y PATCH siguientes
+# de ese id darían 404. Tampoco la importación masiva, que mide el tamaño del lote
+# más que el del endpoint.
+ENDPOINTS: List[Endpoint] = [
+    Endpoint("recaudaciones_listar", "GET", lambda ctx, i: ("/api/recaudaciones/?limit=50", None)),
+    Endpoint("recaudaciones_listar_coche", "GET", lambda ctx, i: (
+        f"/api/recaudaciones/?coche_id={1 + i % ctx.coches}&limit=50", None
+    )),
+    Endpoint("recaudaciones_listar_offset", "GET", lambda ctx, i: (
+        f"/api/recaudaciones/?limit=50&offset={min(ctx.recaudaciones // 2, 10_000)}", None
+    )),
+    Endpoint("recaudaciones_leer", "GET", lambda ctx, i: (
+        f"/api/recaudaciones/{1 + (i * 7919) % ctx.recaudaciones}", None
+    )),
+    Endpoint("recaudaciones_exportar_coche_mes", "GET", lambda ctx, i: (
+        f"/api/recaudaciones/exportar?coche_id={1 + i % ctx.coches}&{_mes(ctx)}", None
+    )),
+    Endpoint("recaudaciones_crear", "POST", lambda ctx, i: ("/api/recaudaciones/", {
+        # Hoy y con km por encima de todo lo sembrado: nunca rompe la continuidad
+        "chofer_id": 1 + i % ctx.choferes,
+        "coche_id": 1 + i % ctx.coches,
+        "turno": "Mañana",
+        "fecha_turno": str(date.today()),
+        "km_entrada": ctx.km_maximo + i * 300,
+        "km_salida": ctx.km_maximo + i * 300 + 150,
+        "total_recaudado": "2500.00",
+        "combustible": "600.00",
+    })),
+    Endpoint("recaudaciones_actualizar", "PATCH", lambda ctx, i: (
+        f"/api/recaudaciones/{1 + (i * 104729) % ctx.recaudaciones}", {"otros_gastos": str(i % 100)}
+    )),
+    Endpoint("coches_listar", "GET", lambda ctx, i: ("/api/coches/", None)),
+    Endpoint("coches_leer", "GET", lambda ctx, i: (f"/api/coches/{1 + i % ctx.coches}", None)),
+    Endpoint("coches_estados", "GET", lambda ctx, i: ("/api/coches/enums/estados", None)),
+    Endpoint("choferes_listar", "GET", lambda ctx, i: ("/api/choferes/", None)),
+    Endpoint("choferes_leer", "GET", lambda ctx, i: (f"/api/choferes/{1 + i % ctx.choferes}", None)),
+    Endpoint("reportes_periodos", "GET", lambda ctx, i: ("/api/reportes/periodos?periodo=mes", None)),
+    Endpoint("reportes_coches_mes", "GET", lambda ctx, i: (f"/api/reportes/coches?{_mes(ctx)}", None)),
+    Endpoint("reportes_choferes_mes", "GET", lambda ctx, i: (f"/api/reportes/choferes?{_mes(ctx)}", None)),
+    Endpoint("reportes_coches_choferes_mes", "GET", lambda ctx, i: (
+        f"/api/reportes/coches-choferes?{_mes(ctx)}", None
+    )),
+    Endpoint("tasas_listar", "GET", lambda ctx, i: ("/api/tasas/", None)),
+]
+
+
+def ruta_base(escala: int) -> str:
+    return os.path.abspath(os.path.join(DIRECTORIO, f"recaudaciones_{escala}.sqlite"))
+
+
+def url_base(escala: int) -> str:
+    return f"sqlite+aiosqlite:///{ruta_base(escala)}"
+
+
+def ruta_trabajo(escala: int) -> str:
+    return os.path.abspath(os.path.join(DIRECTORIO, f"recaudaciones_{escala}.trabajo.sqlite"))
+
+
+def url_trabajo(escala: int) -> str:
+    return f"sqlite+aiosqlite:///{ruta_trabajo(escala)}"
+
+
+def copiar_base(origen: str, destino: str) -> None:
+    """
+    Copia una base SQLite con la API de backup: incluye lo que esté en el WAL
+    y reemplaza el contenido del destino aunque tenga conexiones abiertas.
+    """
+    fuente = sqlite3.connect(origen)
+    copia = sqlite3.connect(destino)
+    try:
+        fuente.backup(copia)
+    finally:
+        fuente.close()
+        copia.close()
+
+
+def borrar_base(ruta: str) -> None:
+    for sufijo in ("", "-wal", "-shm"):
+        if os.path.exists(ruta + sufijo):
+            os.remove(ruta + sufijo)
+
+
+async def sembrar(escala: int) -> None:
+    """
+    Genera una flota sintética de tres años con `escala` recaudaciones
+    (ver `scripts.generar_flota`). Los datos terminan ayer: hoy queda
+    libre para los POST del benchmark.
+    """
+    from scripts.generar_flota import generar
+
+    await generar(escala, anios=3, semilla=escala)
+
+
+def leer_contexto(escala: int) -> Contexto:
+    with sqlite3.connect(ruta_base(escala)) as conexion:
+        coches, choferes = conexion.execute(
+            "SELECT (SELECT count(*) FROM coches), (SELECT count(*) FROM choferes)"
+        ).fetchone()
+        recaudaciones, desde, hasta, km_maximo = conexion.execute(
+            "SELECT count(*), min(fecha_turno), max(fecha_turno), max(km_salida) FROM recaudaciones"
+        ).fetchone()
+
+    return Contexto(
+        coches=coches,
+        choferes=choferes,
+        recaudaciones=recaudaciones,
+        desde=date.fromisoformat(desde),
+        hasta=date.fromisoformat(hasta),
+        km_maximo=km_maximo + 1,
+    )
+
+
+def percentil(tiempos: List[float], p: int) -> float:
+    if len(tiempos) < 2:
+        return tiempos[0] if tiempos else 0.0
+    return statistics.quantiles(tiempos, n=100, method="inclusive")[p - 1]
+
+
+async def medir(client: httpx.AsyncClient, ctx: Contexto, endpoint: Endpoint, cantidad: int, concurrencia: int) -> dict:
+    """
+    Envía `cantidad` requests al endpoint con `concurrencia` en paralelo.
+    """
+    tiempos: List[float] = []
+    errores: Dict[int, int] = {}
+    siguiente = iter(range(cantidad))
+
+    async def trabajador():
+        for numero in siguiente:
+            url, cuerpo = endpoint.armar(ctx, numero)
+            inicio = time.perf_counter()
+            respuesta = await client.request(endpoint.metodo, url, json=cuerpo)
+            await respuesta.aread()
+            tiempos.append(time.perf_counter() - inicio)
+            if respuesta.status_code >= 400:
+                errores[respuesta.status_code] = errores.get(respuesta.status_code, 0) + 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador() for _ in range(concurrencia)))
+    duracion = time.perf_counter() - inicio
+
+    return {
+        "requests": cantidad,
+        "errores": errores,
+        "rps": round(cantidad / duracion, 1),
+        "p50_ms": round(percentil(tiempos, 50) * 1000, 2),
+        "p95_ms": round(percentil(tiempos, 95) * 1000, 2),
+        "p99_ms": round(percentil(tiempos, 99) * 1000, 2),
+        "max_ms": round(max(tiempos) * 1000, 2),
+    }
+
+
+async def recorrer(client: httpx.AsyncClient, ctx: Contexto, cantidad: int, concurrencia: int) -> Dict[str, dict]:
+    resultados = {}
+    for endpoint in ENDPOINTS:
+        # Unos requests de calentamiento, fuera de la medición
+        await medir(client, ctx, endpoint, min(10, cantidad), 1)
+        resultados[endpoint.nombre] = await medir(client, ctx, endpoint, cantidad, concurrencia)
+        imprimir(endpoint.nombre, resultados[endpoint.nombre])
+    return resultados
+
+
+def imprimir(nombre: str, resultado: dict) -> None:
+    errores = f" ❌ {resultado['errores']}" if resultado["errores"] else ""
+    print(
+        f"  {nombre:<34} {resultado['rps']:>8} req/s  "
+        f"p50 {resultado['p50_ms']:>8} ms  p95 {resultado['p95_ms']:>8} ms  p99 {resultado['p99_ms']:>8} ms{errores}",
+        flush=True,
+    )
+
+
+async def correr_asgi(escala: int, cantidad: int, concurrencia: int) -> Dict[str, dict]:
+    """
+    Corre en el proceso hijo de la escala, con `DATABASE_URL` ya apuntando a su copia de trabajo.
+    """
+    from main import app, lifespan
+
+    ctx = leer_contexto(escala)
+    async with lifespan(app):
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark", timeout=None) as client:
+            return await recorrer(client, ctx, cantidad, concurrencia)
+
+
+async def correr_uvicorn(escala: int, cantidad: int, concurrencia: int, workers: int) -> Dict[str, dict]:
+    ctx = leer_contexto(escala)
+    entorno = {**os.environ, "DATABASE_URL": url_trabajo(escala)}
+    servidor = subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "main:app",
+            "--port", str(PUERTO_UVICORN), "--workers", str(workers), "--log-level", "warning",
+        ],
+        env=entorno,
+    )
+
+    try:
+        limites = httpx.Limits(max_connections=concurrencia, max_keepalive_connections=concurrencia)
+        async with httpx.AsyncClient(
+            base_url=f"http://127.0.0.1:{PUERTO_UVICORN}", timeout=None, limits=limites
+        ) as client:
+            for _ in range(600):
+                try:
+                    if (await client.get("/")).status_code == 200:
+                        break
+                except httpx.TransportError:
+                    pass
+                if servidor.poll() is not None:
+                    raise RuntimeError("uvicorn terminó antes de aceptar conexiones")
+                await asyncio.sleep(0.1)
+            else:
+                raise RuntimeError("uvicorn no respondió en 60 segundos")
+
+            return await recorrer(client, ctx, cantidad, concurrencia)
+    finally:
+        servidor.terminate()
+        servidor.wait()
+
+
+def correr_escala(args) -> None:
+    """
+    Proceso hijo: siembra si hace falta y mide una escala en los modos pedidos.
+    `core.db` lee `DATABASE_URL` al importarse, por eso cada escala va en su propio proceso.
+
+    `DATABASE_URL` apunta a la copia de trabajo: se siembra ahí y se guarda como base
+    sembrada, y antes de cada modo se vuelve a copiar desde ella.
+    """
+    escala = args.escala
+    resultados: Dict[str, dict] = {}
+
+    if not os.path.exists(ruta_base(escala)):
+        print(f"🌱 Sembrando {escala} recaudaciones...", flush=True)
+        inicio = time.perf_counter()
+        borrar_base(ruta_trabajo(escala))
+        asyncio.run(sembrar(escala))
+        copiar_base(ruta_trabajo(escala), ruta_base(escala))
+        print(f"   Sembrado en {time.perf_counter() - inicio:.1f}s", flush=True)
+
+    contexto = leer_contexto(escala)
+
+    try:
+        for modo in args.modos:
+            print(f"⏱️  {escala} recaudaciones · {modo}", flush=True)
+            copiar_base(ruta_base(escala), ruta_trabajo(escala))
+            if modo == "asgi":
+                resultados[modo] = asyncio.run(correr_asgi(escala, args.requests, args.concurrencia))
+            else:
+                resultados[modo] = asyncio.run(
+                    correr_uvicorn(escala, args.requests, args.concurrencia, args.workers)
+                )
+    finally:
+        borrar_base(ruta_trabajo(escala))
+
+    with open(args.salida_escala, "w") as archivo:
+        json.dump({"contexto": contexto.__dict__, "resultados": resultados}, archivo, default=str)
+
+
+def version_git() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main(args) -> None:
+    os.makedirs(DIRECTORIO, exist_ok=True)
+    corrida = {
+        "fecha": datetime.now().isoformat(timespec="seconds"),
+        "commit": version_git(),
+        "python": platform.python_version(),
+        "parametros": {
+            "requests": args.requests,
+            "concurrencia": args.concurrencia,
+            "workers": args.workers,
+            "modos": args.modos,
+        },
+        "escalas": {},
+    }
+
+    for escala in args.escalas:
+        with tempfile.NamedTemporaryFile(suffix=".json", delete=False) as temporal:
+            salida_escala = temporal.name
+
+        if args.resembrar and os.path.exists(ruta_base(escala)):
+            os.remove(ruta_base(escala))
+
+        subprocess.run(
+            [
+                sys.executable, "-m", "scripts.benchmark",
+                "--escala", str(escala), "--salida-escala", salida_escala,
+                "--modos", *args.modos,
+                "--requests", str(args.requests),
+                "--concurrencia", str(args.concurrencia),
+                "--workers", str(args.workers),
+            ],
+            env={**os.environ, "DATABASE_URL": url_trabajo(escala)},
+            check=True,
+        )
+
+        with open(salida_escala) as archivo:
+            corrida["escalas"][str(escala)] = json.load(archivo)
+        os.remove(salida_escala)
+
+    destino = os.path.join(DIRECTORIO, f"resultado_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(destino, "w") as archivo:
+        json.dump(corrida, archivo, indent=2)
+
+    print(f"✅ Resultados guardados en {destino}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark de los endpoints contra bases sembradas.")
+    parser.add_argument("--escalas", type=int, nargs="+", default=list(ESCALAS))
+    parser.add_argument("--modos", nargs="+", choices=MODOS, default=list(MODOS))
+    parser.add_argument("--requests", type=int, default=200, help="Requests medidos por endpoint")
+    parser.add_argument("--concurrencia", type=int, default=10)
+    parser.add_argument("--workers", type=int, default=4, help="Workers de uvicorn")
+    parser.add_argument("--resembrar", action="store_true", help="Vuelve a crear las bases sembradas")
+    # Uso interno: proceso hijo de una escala
+    parser.add_argument("--escala", type=int, help=argparse.SUPPRESS)
+    parser.add_argument("--salida-escala", help=argparse.SUPPRESS)
+
+    args = parser.parse_args()
+
+    if args.escala is not None:
+        correr_escala(args)
+    else:
+        main(args)
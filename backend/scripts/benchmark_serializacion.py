@@ -0,0 +1,102 @@
+"""
+Compara los dos caminos de serialización de los listados sobre una base sembrada:
+
+- **normal**: objetos del ORM validados por el `response_model` y codificados con `json`.
+- **rapido**: columnas sueltas serializadas con pydantic-core (`JSON_RAPIDO`, ver `core.serializacion`).
+
+Para cada listado y tamaño de página verifica que ambos devuelvan el mismo JSON
+y mide el tiempo por request en el mismo proceso, sin red (`httpx.ASGITransport`).
+Usa las bases de `scripts.benchmark` y las siembra si no existen.
+
+Uso (desde la carpeta `backend`):
+    python -m scripts.benchmark_serializacion [--escala 100000] [--paginas 100 1000] [--requests 30]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+
+from scripts.benchmark import ruta_base, sembrar, url_base
+
+
+LISTADOS = {
+    "recaudaciones": "/api/recaudaciones/",
+    "choferes": "/api/choferes/",
+    "coches": "/api/coches/",
+}
+
+
+async def medir(client: httpx.AsyncClient, url: str, cantidad: int) -> tuple[List[float], bytes]:
+    tiempos: List[float] = []
+    cuerpo = b""
+    for _ in range(cantidad):
+        inicio = time.perf_counter()
+        respuesta = await client.get(url)
+        tiempos.append(time.perf_counter() - inicio)
+        respuesta.raise_for_status()
+        cuerpo = respuesta.content
+    return tiempos, cuerpo
+
+
+async def correr(args) -> int:
+    # Importar recién acá: `core.db` y `core.cache` leen el entorno al importarse
+    from core import serializacion
+    from main import app, lifespan
+
+    diferencias = 0
+    async with lifespan(app):
+        transporte = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://benchmark", timeout=None) as client:
+            for nombre, ruta in LISTADOS.items():
+                for pagina in args.paginas:
+                    url = f"{ruta}?limit={pagina}"
+                    resultados: Dict[str, tuple] = {}
+
+                    for modo, rapido in (("normal", False), ("rapido", True)):
+                        serializacion.JSON_RAPIDO = rapido
+                        await medir(client, url, 2)  # Calentar
+                        resultados[modo] = await medir(client, url, args.requests)
+
+                    normal, cuerpo_normal = resultados["normal"]
+                    rapido, cuerpo_rapido = resultados["rapido"]
+                    mediana_normal = statistics.median(normal) * 1000
+                    mediana_rapido = statistics.median(rapido) * 1000
+
+                    igual = cuerpo_normal == cuerpo_rapido
+                    if not igual:
+                        diferencias += 1
+
+                    print(
+                        f"{nombre:<14} limit={pagina:<6} normal {mediana_normal:8.2f} ms | "
+                        f"rápido {mediana_rapido:8.2f} ms | x{mediana_normal / mediana_rapido:5.2f} | "
+                        f"{len(cuerpo_normal) / 1024:8.1f} KiB {'✅' if igual else '❌ JSON distinto'}"
+                    )
+
+    return diferencias
+
+
+def main(args) -> int:
+    os.environ["DATABASE_URL"] = url_base(args.escala)
+    # Sin cache de respuestas: se mide el endpoint en cada request
+    os.environ["CACHE_TTL"] = "0"
+
+    if not os.path.exists(ruta_base(args.escala)):
+        print(f"🌱 Sembrando base de {args.escala} recaudaciones...")
+        asyncio.run(sembrar(args.escala))
+
+    diferencias = asyncio.run(correr(args))
+    print("✅ Mismo JSON en todos los casos." if not diferencias else f"❌ {diferencias} casos con JSON distinto.")
+    return diferencias
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serialización normal vs. rápida de los listados.")
+    parser.add_argument("--escala", type=int, default=100_000, help="Recaudaciones de la base sembrada")
+    parser.add_argument("--paginas", type=int, nargs="+", default=[100, 1000], help="Valores de limit")
+    parser.add_argument("--requests", type=int, default=30, help="Requests medidos por caso")
+
+    raise SystemExit(1 if main(parser.parse_args()) else 0)
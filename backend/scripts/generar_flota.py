@@ -0,0 +1,370 @@
+"""
+Genera una flota sintética con años de recaudaciones para pruebas de escala.
+
+Crea coches y choferes y recorre día por día el período: cada coche trabaja
+a doble turno (Mañana y Noche, con dos choferes titulares) o con un único
+chofer (Solo), descansa algunos días y su odómetro solo avanza. Recaudación,
+combustible, gastos y crédito siguen distribuciones parecidas a las reales.
+
+Los turnos se liquidan con `liquidar_centavos`, el motor que usan la importación
+masiva y la re-liquidación (idéntico a `calcular_liquidacion`, ver
+`python -m scripts.verificar_liquidacion`), con la tasa vigente de cada fecha,
+y se insertan con `INSERT` executemany en transacciones de `FILAS_POR_LOTE`.
+Durante la carga se quitan los índices de `recaudaciones` y se vuelven a crear
+al final, que es más rápido que mantenerlos fila por fila.
+
+Usa la base de `DATABASE_URL`, que tiene que estar vacía.
+
+Uso (desde la carpeta `backend`):
+    python -m scripts.generar_flota 5000000 [--anios 3] [--coches 3000] [--semilla 1]
+"""
+import argparse
+import asyncio
+import math
+import random
+import time
+from datetime import date, timedelta
+from decimal import Decimal
+from typing import Dict, Iterator, List, Tuple
+from sqlalchemy import bindparam, func, insert, update
+from sqlmodel import SQLModel, select
+
+from core.db import engine, async_session, crear_indices
+from models.chofer import Chofer
+from models.coche import Coche
+from models.recaudacion import Recaudacion, Turnos
+from services.liquidacion import CAMPOS_ENTRADA_LIQUIDACION, CAMPOS_LIQUIDACION, liquidar_centavos
+from services.recaudacion_services import RecaudacionService
+from services.resumen_services import ResumenService
+from services.tasa_services import TasaService
+
+
+# Recaudaciones por transacción
+FILAS_POR_LOTE = 100_000
+
+# Parte de la flota que trabaja a doble turno; el resto trabaja Solo
+DOBLE_TURNO = 0.7
+# Probabilidad de que un coche salga a trabajar un día dado
+DIAS_TRABAJADOS = 0.92
+# Probabilidad de que un turno lo haga un suplente en lugar del titular
+SUPLENCIA = 0.07
+# Choferes suplentes por cada coche
+SUPLENTES_POR_COCHE = 0.15
+
+TURNOS_POR_DIA = DIAS_TRABAJADOS * (DOBLE_TURNO * 2 + (1 - DOBLE_TURNO))
+
+# Límite de coches por el largo de `matricula` (4 dígitos)
+MAXIMO_COCHES = 9_000
+
+MARCAS = (
+    ("Toyota", "Corolla"), ("Chevrolet", "Onix"), ("Fiat", "Cronos"), ("Nissan", "Versa"),
+    ("Hyundai", "HB20"), ("Renault", "Logan"), ("Volkswagen", "Virtus"), ("BYD", "Dolphin"),
+)
+NOMBRES = (
+    "Juan", "María", "José", "Ana", "Carlos", "Laura", "Luis", "Lucía", "Diego", "Sofía",
+    "Martín", "Valentina", "Pablo", "Camila", "Andrés", "Florencia", "Jorge", "Gabriela",
+)
+APELLIDOS = (
+    "González", "Rodríguez", "Fernández", "López", "Martínez", "Pérez", "García", "Sánchez",
+    "Romero", "Silva", "Pereira", "Díaz", "Álvarez", "Suárez", "Núñez", "Méndez", "Acosta",
+)
+
+
+class CocheSintetico:
+    """
+    Estado de un coche durante la generación.
+    """
+
+    def __init__(self, id: int, titulares: List[int], aleatorio: random.Random):
+        self.id = id
+        self.titulares = titulares
+        self.km = aleatorio.randint(20_000, 350_000)
+        # Pesos por km recorrido y km por litro, propios de cada coche
+        self.tarifa_km = aleatorio.uniform(42, 55)
+        self.consumo = aleatorio.uniform(11, 15)
+
+
+def cantidad_coches(recaudaciones: int, dias: int) -> int:
+    return min(MAXIMO_COCHES, max(3, math.ceil(recaudaciones / (dias * TURNOS_POR_DIA))))
+
+
+def generar_turnos(
+    flota: List[CocheSintetico],
+    suplentes: List[int],
+    desde: date,
+    hasta: date,
+    cantidad: int,
+    aleatorio: random.Random,
+) -> Iterator[dict]:
+    """
+    Turnos en orden de fecha, con los montos en centavos, hasta llegar a `cantidad`.
+    """
+    generadas = 0
+    fecha = desde
+
+    while fecha <= hasta and generadas < cantidad:
+        fin_de_semana = fecha.weekday() >= 4
+        # Combustible más caro cada año
+        precio_litro = 70 * 1.08 ** (fecha.year - desde.year)
+
+        for coche in flota:
+            if aleatorio.random() > DIAS_TRABAJADOS:
+                continue
+
+            if len(coche.titulares) == 2:
+                turnos = ((Turnos.AM, coche.titulares[0], 170), (Turnos.PM, coche.titulares[1], 170))
+            else:
+                turnos = ((Turnos.COMPLETO, coche.titulares[0], 260),)
+
+            for turno, chofer_id, recorrido_medio in turnos:
+                if aleatorio.random() < SUPLENCIA and suplentes:
+                    chofer_id = aleatorio.choice(suplentes)
+
+                # De vez en cuando el coche se mueve fuera de turno (taller, lavado)
+                if aleatorio.random() < 0.05:
+                    coche.km += aleatorio.randint(1, 30)
+
+                recorrido = max(20, int(aleatorio.gauss(recorrido_medio, recorrido_medio * 0.27)))
+                demanda = aleatorio.lognormvariate(0, 0.18) * (1.25 if fin_de_semana and turno != Turnos.AM else 1)
+                total = int(recorrido * coche.tarifa_km * demanda * 100)
+
+                recibida = fecha + timedelta(days=0 if aleatorio.random() < 0.8 else 1)
+
+                yield {
+                    "chofer_id": chofer_id,
+                    "coche_id": coche.id,
+                    "turno": turno,
+                    "fecha_turno": fecha,
+                    "fecha_recibida": min(recibida, hasta),
+                    "km_entrada": coche.km,
+                    "km_salida": coche.km + recorrido,
+                    "total_recaudado": total,
+                    "combustible": int(recorrido / coche.consumo * precio_litro * 100),
+                    "otros_gastos": aleatorio.randint(200, 2_500) * 100 if aleatorio.random() < 0.06 else 0,
+                    "h13": aleatorio.randint(100, 800) * 100 if aleatorio.random() < 0.03 else 0,
+                    "credito": int(total * aleatorio.uniform(0.05, 0.4)) if aleatorio.random() < 0.35 else 0,
+                }
+
+                coche.km += recorrido
+                generadas += 1
+                if generadas == cantidad:
+                    return
+
+        fecha += timedelta(days=1)
+
+
+async def _guardar_lote(session, turnos: List[dict], tasas: TasaService, tasa_por_fecha: Dict[date, tuple]) -> None:
+    """
+    Liquida el lote agrupado por tasa vigente y lo inserta en una transacción.
+    """
+    grupos: Dict[tuple, List[dict]] = {}
+    for turno in turnos:
+        fecha = turno["fecha_turno"]
+        if fecha not in tasa_por_fecha:
+            tasa_por_fecha[fecha] = await tasas.resolver(fecha)
+        grupos.setdefault(tasa_por_fecha[fecha], []).append(turno)
+
+    filas = []
+    for (sueldo, aporte), grupo in grupos.items():
+        # El signo de los -0.00 no importa al guardar, se descarta
+        calculado, _ = liquidar_centavos(
+            **{campo: [turno[campo] for turno in grupo] for campo in CAMPOS_ENTRADA_LIQUIDACION},
+            sueldo=sueldo,
+            aporte=aporte,
+        )
+
+        for indice, turno in enumerate(grupo):
+            fila = {
+                **turno,
+                **{campo: calculado[campo][indice] for campo in CAMPOS_LIQUIDACION},
+            }
+            for campo in ("total_recaudado", "combustible", "otros_gastos", "h13", "credito", *CAMPOS_LIQUIDACION):
+                if campo != "km_totales":
+                    fila[campo] = Decimal(fila[campo]).scaleb(-2)
+            filas.append(fila)
+
+    conexion = await session.connection()
+    await insertar_filas(conexion, Recaudacion.__table__, filas) # type: ignore
+    await session.commit()
+
+
+async def insertar_filas(conexion, tabla, filas: List[dict]) -> None:
+    """
+    `INSERT` executemany directo al driver.
+
+    Compila la sentencia una sola vez y convierte cada columna con el
+    `bind_processor` de su tipo para el dialecto (ej: fechas, enums y
+    `Numeric` en SQLite), sin el armado de parámetros por fila de SQLAlchemy,
+    que es la mayor parte del tiempo con cientos de miles de filas.
+    """
+    dialecto = conexion.dialect
+    columnas = [columna for columna in tabla.columns if columna.name in filas[0]]
+    compilada = insert(tabla).values({columna.name: bindparam(columna.name) for columna in columnas}).compile(dialect=dialecto)
+
+    procesadores = {columna.name: columna.type.bind_processor(dialecto) for columna in columnas}
+    valores = {
+        nombre: [fila[nombre] for fila in filas] if procesador is None else [procesador(fila[nombre]) for fila in filas]
+        for nombre, procesador in procesadores.items()
+    }
+
+    if compilada.positional:
+        parametros = list(zip(*(valores[nombre] for nombre in compilada.positiontup))) # type: ignore
+    else:
+        parametros = [dict(zip(valores, fila)) for fila in zip(*valores.values())]
+
+    await conexion.exec_driver_sql(str(compilada), parametros)
+
+
+async def generar(
+    recaudaciones: int,
+    anios: float = 3,
+    coches: int | None = None,
+    semilla: int = 0,
+    hasta: date | None = None,
+) -> dict:
+    """
+    Genera la flota y sus recaudaciones en la base de `DATABASE_URL`.
+
+    Args:
+        recaudaciones: Cantidad de recaudaciones a generar.
+        anios: Largo del período, que termina en `hasta`.
+        coches: Tamaño de la flota. Por defecto, el necesario para llegar
+            a `recaudaciones` en el período.
+        semilla: Con la misma semilla se generan los mismos datos.
+        hasta: Último día con turnos. Por defecto, ayer.
+
+    Returns:
+        dict: Cantidad de coches, choferes y recaudaciones generados, y el período.
+
+    Raises:
+        ValueError: Si la base ya tiene coches, choferes o recaudaciones.
+    """
+    aleatorio = random.Random(semilla)
+
+    hasta = hasta or date.today() - timedelta(days=1)
+    dias = max(1, round(anios * 365))
+    desde = hasta - timedelta(days=dias - 1)
+    coches = coches or cantidad_coches(recaudaciones, dias)
+
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with async_session() as session:
+        for modelo in (Coche, Chofer, Recaudacion):
+            if (await session.exec(select(func.count()).select_from(modelo))).one():
+                raise ValueError(f"La base ya tiene datos en `{modelo.__tablename__}`; se necesita una base vacía.")
+
+        # Sin tasas cargadas, registra los porcentajes históricos
+        await TasaService(session).asegurar_tasa_inicial(
+            RecaudacionService.Porcentaje.SUELDO.value,
+            RecaudacionService.Porcentaje.APORTE.value,
+        )
+
+        # Choferes: 1 titular por coche Solo, 2 por coche de doble turno, más suplentes
+        dobles = round(coches * DOBLE_TURNO)
+        titulares = dobles * 2 + (coches - dobles)
+        choferes = titulares + math.ceil(coches * SUPLENTES_POR_COCHE)
+
+        cedulas = aleatorio.sample(range(10_000_000, 99_999_999), choferes)
+        await session.exec(insert(Chofer), params=[ # type: ignore
+            {
+                "codigo_chofer": str(numero),
+                "cedula_identidad": str(cedulas[numero - 1]),
+                "nombre": aleatorio.choice(NOMBRES),
+                "apellido": aleatorio.choice(APELLIDOS),
+                "telefono": f"09{aleatorio.randint(1_000_000, 9_999_999)}",
+                "fecha_ingreso": desde - timedelta(days=aleatorio.randint(0, 3_000)),
+                "vencimiento_libreta": hasta + timedelta(days=aleatorio.randint(30, 1_800)),
+            }
+            for numero in range(1, choferes + 1)
+        ])
+
+        matriculas = aleatorio.sample(range(1_000, 10_000), coches)
+        await session.exec(insert(Coche), params=[ # type: ignore
+            {
+                "matricula": str(matriculas[numero - 1]),
+                "movil": str(numero),
+                "marca": marca,
+                "modelo": modelo,
+                "año": str(aleatorio.randint(2016, 2025)),
+            }
+            for numero in range(1, coches + 1)
+            for marca, modelo in (aleatorio.choice(MARCAS),)
+        ])
+        await session.commit()
+
+        # Los ids son correlativos en una base vacía
+        flota = []
+        chofer_id = 1
+        for coche_id in range(1, coches + 1):
+            cantidad_titulares = 2 if coche_id <= dobles else 1
+            flota.append(CocheSintetico(coche_id, list(range(chofer_id, chofer_id + cantidad_titulares)), aleatorio))
+            chofer_id += cantidad_titulares
+        suplentes = list(range(titulares + 1, choferes + 1))
+
+        conexion = await session.connection()
+        for indice in Recaudacion.__table__.indexes: # type: ignore
+            await conexion.run_sync(indice.drop, checkfirst=True)
+        await session.commit()
+
+        tasas = TasaService(session)
+        tasa_por_fecha: Dict[date, Tuple[Decimal, Decimal]] = {}
+        generadas = 0
+        inicio = time.perf_counter()
+        lote: List[dict] = []
+
+        for turno in generar_turnos(flota, suplentes, desde, hasta, recaudaciones, aleatorio):
+            lote.append(turno)
+            if len(lote) == FILAS_POR_LOTE:
+                await _guardar_lote(session, lote, tasas, tasa_por_fecha)
+                generadas += len(lote)
+                lote = []
+                print(f"   {generadas:>10} recaudaciones · {generadas / (time.perf_counter() - inicio):,.0f}/s", flush=True)
+
+        if lote:
+            await _guardar_lote(session, lote, tasas, tasa_por_fecha)
+            generadas += len(lote)
+
+        print("🗂️  Creando índices y resúmenes diarios...", flush=True)
+        conexion = await session.connection()
+        await conexion.run_sync(crear_indices)
+
+        await conexion.execute(
+            update(Coche.__table__) # type: ignore
+            .where(Coche.__table__.c.id == bindparam("b_id")) # type: ignore
+            .values(kilometros=bindparam("b_km")),
+            [{"b_id": coche.id, "b_km": coche.km} for coche in flota],
+        )
+
+        await ResumenService(session).reconstruir()
+        await session.commit()
+
+    return {
+        "coches": coches,
+        "choferes": choferes,
+        "recaudaciones": generadas,
+        "desde": desde,
+        "hasta": hasta,
+    }
+
+
+async def main(args):
+    inicio = time.perf_counter()
+    resumen = await generar(args.recaudaciones, args.anios, args.coches, args.semilla)
+    await engine.dispose()
+
+    print(
+        f"✅ {resumen['recaudaciones']} recaudaciones de {resumen['coches']} coches y "
+        f"{resumen['choferes']} choferes ({resumen['desde']} a {resumen['hasta']}) "
+        f"en {time.perf_counter() - inicio:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Genera una flota sintética para pruebas de escala.")
+    parser.add_argument("recaudaciones", type=int)
+    parser.add_argument("--anios", type=float, default=3, help="Años de historia (default 3)")
+    parser.add_argument("--coches", type=int, help="Tamaño de la flota (default: según recaudaciones y años)")
+    parser.add_argument("--semilla", type=int, default=0)
+
+    asyncio.run(main(parser.parse_args()))
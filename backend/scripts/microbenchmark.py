@@ -0,0 +1,392 @@
+"""
+Microbenchmarks de los caminos calientes de cada escritura, medidos aislados
+(sin base ni HTTP):
+
+- `RecaudacionService.calcular_liquidacion` fila a fila, y los lotes
+  `calcular_liquidacion_lote` / `liquidar_centavos`.
+- Los validadores de `ChoferCreate`, `CocheCreate` y `RecaudacionCreate`,
+  con datos válidos y con datos que fallan.
+- La traducción de errores: `traducir_errores` y `validation_exception_handler`.
+
+Cada caso se mide con una fila y con lotes de `--filas` filas (10.000 por defecto).
+Informa el tiempo por llamada (mejor de `--repeticiones` rondas) y, con `tracemalloc`,
+la memoria pico y la retenida por llamada, además del tiempo y la memoria por fila
+en los lotes. Guarda todo en un JSON en `DIRECTORIO` para comparar corridas.
+
+Uso (desde la carpeta `backend`):
+    python -m scripts.microbenchmark [--filas 10000] [--repeticiones 5] [--solo chofer]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import timeit
+import tracemalloc
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from typing import Callable, Dict, List
+
+from fastapi.exceptions import RequestValidationError
+from pydantic import ValidationError
+
+from core.handlers import traducir_errores, validation_exception_handler
+from models.chofer import ChoferCreate
+from models.coche import CocheCreate
+from models.recaudacion import RecaudacionCreate
+from scripts.benchmark import DIRECTORIO, version_git
+from services.liquidacion import calcular_liquidacion_lote, liquidar_centavos
+from services.recaudacion_services import RecaudacionService
+
+
+# Tiempo mínimo de cada ronda, para que las llamadas cortas no queden bajo la resolución del reloj
+SEGUNDOS_POR_RONDA = 0.2
+
+SUELDO = RecaudacionService.Porcentaje.SUELDO.value
+APORTE = RecaudacionService.Porcentaje.APORTE.value
+
+
+@dataclass
+class Caso:
+    nombre: str
+    funcion: Callable[[], object]
+    # Filas que procesa cada llamada, para informar el costo por fila de los lotes
+    filas: int = 1
+
+
+# ---------------------------------------------------------------------------
+# Datos de entrada, como llegan en el body JSON o en las filas del CSV
+# ---------------------------------------------------------------------------
+
+def monto() -> str:
+    return f"{random.randint(0, 3_000_000) / 100:.2f}"
+
+
+def chofer_valido(indice: int) -> dict:
+    return {
+        "codigo_chofer": str(indice % 100_000),
+        "cedula_identidad": f"{random.randint(10_000_000, 99_999_999)}",
+        "nombre": "  maría josé ",
+        "apellido": "pérez núñez",
+        "telefono": f"09{random.randint(1_000_000, 9_999_999)}",
+        "vencimiento_libreta": "2027-05-01",
+        "fecha_ingreso": "2020-03-15",
+    }
+
+
+def chofer_invalido(indice: int) -> dict:
+    # Falla en varios validadores a la vez: código, cédula, nombre y teléfono
+    return {
+        "codigo_chofer": f"A{indice}",
+        "cedula_identidad": "1.234.567-8",
+        "nombre": "María 2",
+        "apellido": "Pérez",
+        "telefono": "12345",
+    }
+
+
+def coche_valido(indice: int) -> dict:
+    return {
+        "matricula": f"{indice % 10_000:04d}",
+        "movil": str(indice % 10_000),
+        "marca": "Toyota",
+        "modelo": "Corolla",
+        "año": "2019",
+        "kilometros": random.randint(0, 900_000),
+    }
+
+
+def coche_invalido(indice: int) -> dict:
+    return {
+        "matricula": f"STX{indice}",
+        "movil": "12345",
+        "kilometros": "muchos",
+    }
+
+
+def recaudacion_valida(indice: int) -> dict:
+    km_entrada = random.randint(0, 900_000)
+    return {
+        "chofer_id": indice % 500 + 1,
+        "coche_id": indice % 250 + 1,
+        "turno": random.choice(["Mañana", "Noche", "Solo"]),
+        "fecha_turno": (date.today() - timedelta(days=indice % 1_000)).isoformat(),
+        "km_entrada": km_entrada,
+        "km_salida": km_entrada + random.randint(0, 400),
+        "total_recaudado": monto(),
+        "combustible": monto(),
+        "otros_gastos": monto(),
+        "h13": monto(),
+        "credito": monto(),
+    }
+
+
+def recaudacion_invalida(indice: int) -> dict:
+    # Fecha futura, monto fuera de rango y turno desconocido (errores de campo),
+    # que cortan antes del validador de modelo
+    fila = recaudacion_valida(indice)
+    fila["fecha_turno"] = (date.today() + timedelta(days=1)).isoformat()
+    fila["total_recaudado"] = "45000"
+    fila["turno"] = "Tarde"
+    return fila
+
+
+def recaudacion_km_invertidos(indice: int) -> dict:
+    # Solo falla el validador de modelo (km_entrada > km_salida)
+    fila = recaudacion_valida(indice)
+    fila["km_entrada"], fila["km_salida"] = fila["km_salida"] + 1, fila["km_entrada"]
+    return fila
+
+
+def liquidacion(indice: int) -> dict:
+    km_entrada = random.randint(0, 900_000)
+    return {
+        "total_recaudado": Decimal(monto()),
+        "combustible": Decimal(monto()),
+        "otros_gastos": Decimal(monto()),
+        "km_entrada": km_entrada,
+        "km_salida": km_entrada + random.randint(0, 400),
+        "h13": Decimal(monto()),
+        "credito": Decimal(monto()),
+    }
+
+
+# ---------------------------------------------------------------------------
+# Casos
+# ---------------------------------------------------------------------------
+
+def errores_de(modelo, fila: dict) -> list:
+    try:
+        modelo.model_validate(fila)
+    except ValidationError as e:
+        return e.errors()
+    raise ValueError(f"La fila no falla la validación de {modelo.__name__}")
+
+
+def error_request(modelo, fila: dict) -> RequestValidationError:
+    """
+    `RequestValidationError` como la que arma FastAPI al validar el body.
+    """
+    errores = [{**error, "loc": ("body", *error["loc"])} for error in errores_de(modelo, fila)]
+    return RequestValidationError(errores, body=fila)
+
+
+def ejecutar(corrutina):
+    """
+    Corre una corrutina que no llega a suspenderse (como el handler), sin el
+    costo de un event loop que se sumaría a la medición.
+    """
+    try:
+        corrutina.send(None)
+    except StopIteration as fin:
+        return fin.value
+    raise RuntimeError("La corrutina se suspendió")
+
+
+def validar_lote(modelo, filas: List[dict]) -> int:
+    """
+    Valida fila a fila y traduce los errores, como `importar_recaudaciones`.
+    """
+    errores = 0
+    for fila in filas:
+        try:
+            modelo.model_validate(fila)
+        except ValidationError as e:
+            traducir_errores(e.errors())
+            errores += 1
+    return errores
+
+
+def armar_casos(cantidad: int) -> List[Caso]:
+    random.seed(cantidad)
+    casos: List[Caso] = []
+
+    # Liquidación
+    fila = liquidacion(0)
+    lote = [liquidacion(indice) for indice in range(cantidad)]
+    columnas = {campo: [fila[campo] for fila in lote] for campo in fila}
+    centavos = {
+        campo: [int(valor.scaleb(2)) if isinstance(valor, Decimal) else valor for valor in columna]
+        for campo, columna in columnas.items()
+    }
+
+    casos += [
+        Caso("liquidacion.fila", lambda: RecaudacionService.calcular_liquidacion(**fila)),
+        Caso(
+            "liquidacion.fila_a_fila",
+            lambda: [RecaudacionService.calcular_liquidacion(**fila) for fila in lote],
+            cantidad,
+        ),
+        Caso(
+            "liquidacion.lote_decimal",
+            lambda: calcular_liquidacion_lote(**columnas, sueldo=SUELDO, aporte=APORTE),
+            cantidad,
+        ),
+        Caso(
+            "liquidacion.lote_centavos",
+            lambda: liquidar_centavos(**centavos, sueldo=SUELDO, aporte=APORTE),
+            cantidad,
+        ),
+    ]
+
+    # Validadores, válidos y con errores
+    for nombre, modelo, valida, invalidas in (
+        ("chofer", ChoferCreate, chofer_valido, [chofer_invalido]),
+        ("coche", CocheCreate, coche_valido, [coche_invalido]),
+        ("recaudacion", RecaudacionCreate, recaudacion_valida, [recaudacion_invalida, recaudacion_km_invertidos]),
+    ):
+        fila_valida = valida(0)
+        lote_valido = [valida(indice) for indice in range(cantidad)]
+        casos += [
+            Caso(f"{nombre}.valida", lambda modelo=modelo, fila=fila_valida: modelo.model_validate(fila)),
+            Caso(
+                f"{nombre}.lote_valido",
+                lambda modelo=modelo, lote=lote_valido: validar_lote(modelo, lote),
+                cantidad,
+            ),
+        ]
+
+        for invalida in invalidas:
+            sufijo = invalida.__name__.removeprefix(f"{nombre}_")
+            fila_invalida = invalida(0)
+            lote_invalido = [invalida(indice) for indice in range(cantidad)]
+            casos += [
+                Caso(f"{nombre}.{sufijo}", lambda modelo=modelo, fila=fila_invalida: errores_de(modelo, fila)),
+                Caso(
+                    f"{nombre}.lote_{sufijo}",
+                    lambda modelo=modelo, lote=lote_invalido: validar_lote(modelo, lote),
+                    cantidad,
+                ),
+            ]
+
+    # Traducción de errores (respuesta 422)
+    errores_chofer = errores_de(ChoferCreate, chofer_invalido(0))
+    excepcion_chofer = error_request(ChoferCreate, chofer_invalido(0))
+    excepciones_recaudacion = [error_request(RecaudacionCreate, recaudacion_invalida(i)) for i in range(cantidad)]
+
+    casos += [
+        Caso("errores.traducir", lambda: traducir_errores(errores_chofer)),
+        Caso("errores.handler", lambda: ejecutar(validation_exception_handler(None, excepcion_chofer))), # type: ignore
+        Caso(
+            "errores.handler_lote",
+            lambda: [ejecutar(validation_exception_handler(None, e)) for e in excepciones_recaudacion], # type: ignore
+            cantidad,
+        ),
+    ]
+
+    return casos
+
+
+# ---------------------------------------------------------------------------
+# Medición
+# ---------------------------------------------------------------------------
+
+def medir_tiempo(funcion: Callable[[], object], repeticiones: int) -> float:
+    """
+    Segundos por llamada: la mejor de `repeticiones` rondas de al menos
+    `SEGUNDOS_POR_RONDA` cada una.
+    """
+    temporizador = timeit.Timer(funcion)
+
+    llamadas = 1
+    while temporizador.timeit(llamadas) < SEGUNDOS_POR_RONDA:
+        llamadas *= 2
+
+    return min(temporizador.repeat(repeat=repeticiones, number=llamadas)) / llamadas
+
+
+def medir_memoria(funcion: Callable[[], object]) -> Dict[str, int]:
+    """
+    Bytes de memoria pico durante una llamada y retenidos después de ella
+    (incluye el resultado, que se libera al salir).
+    """
+    funcion()  # Calienta cachés (validadores compilados, enums, etc.)
+
+    tracemalloc.start()
+    try:
+        antes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        resultado = funcion()
+        despues, pico = tracemalloc.get_traced_memory()
+        del resultado
+    finally:
+        tracemalloc.stop()
+
+    return {"pico": pico - antes, "retenida": despues - antes}
+
+
+def formato_tiempo(segundos: float) -> str:
+    if segundos < 1e-3:
+        return f"{segundos * 1e6:9.1f} µs"
+    if segundos < 1:
+        return f"{segundos * 1e3:9.2f} ms"
+    return f"{segundos:9.2f} s "
+
+
+def formato_bytes(cantidad: float) -> str:
+    if abs(cantidad) < 1024:
+        return f"{cantidad:9.0f} B "
+    if abs(cantidad) < 1024 ** 2:
+        return f"{cantidad / 1024:9.1f} KiB"
+    return f"{cantidad / 1024 ** 2:9.1f} MiB"
+
+
+def imprimir(caso: Caso, resultado: dict) -> None:
+    linea = (
+        f"{caso.nombre:<34} {formato_tiempo(resultado['segundos'])} "
+        f"| pico {formato_bytes(resultado['memoria']['pico'])} "
+        f"| retenida {formato_bytes(resultado['memoria']['retenida'])}"
+    )
+    if caso.filas > 1:
+        linea += (
+            f"  ({formato_tiempo(resultado['segundos_por_fila']).strip()}, "
+            f"{formato_bytes(resultado['memoria']['pico'] / caso.filas).strip()} por fila)"
+        )
+    print(linea)
+
+
+def main(args) -> None:
+    casos = [caso for caso in armar_casos(args.filas) if not args.solo or args.solo in caso.nombre]
+    if not casos:
+        print(f"❌ Ningún caso coincide con '{args.solo}'.")
+        return
+
+    print(f"⏱️  {len(casos)} casos, lotes de {args.filas} filas, mejor de {args.repeticiones} rondas\n")
+
+    resultados: Dict[str, dict] = {}
+    for caso in casos:
+        segundos = medir_tiempo(caso.funcion, args.repeticiones)
+        resultados[caso.nombre] = {
+            "filas": caso.filas,
+            "segundos": segundos,
+            "segundos_por_fila": segundos / caso.filas,
+            "memoria": medir_memoria(caso.funcion),
+        }
+        imprimir(caso, resultados[caso.nombre])
+
+    os.makedirs(DIRECTORIO, exist_ok=True)
+    destino = os.path.join(DIRECTORIO, f"microbenchmark_{datetime.now():%Y%m%d_%H%M%S}.json")
+    with open(destino, "w") as archivo:
+        json.dump(
+            {
+                "fecha": datetime.now().isoformat(timespec="seconds"),
+                "commit": version_git(),
+                "python": platform.python_version(),
+                "parametros": {"filas": args.filas, "repeticiones": args.repeticiones, "solo": args.solo},
+                "resultados": resultados,
+            },
+            archivo,
+            indent=2,
+        )
+
+    print(f"\n✅ Resultados guardados en {destino}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Microbenchmarks de liquidación, validadores y errores 422.")
+    parser.add_argument("--filas", type=int, default=10_000, help="Filas de cada lote")
+    parser.add_argument("--repeticiones", type=int, default=5, help="Rondas por caso (se toma la mejor)")
+    parser.add_argument("--solo", help="Corre solo los casos cuyo nombre contiene este texto")
+
+    main(parser.parse_args())
@@ -0,0 +1,27 @@
+"""
+Reconstruye los resúmenes diarios por coche y por chofer desde `recaudaciones`.
+
+Uso (desde la carpeta `backend`):
+    python -m scripts.reconstruir_resumenes
+"""
+import asyncio
+from sqlmodel import SQLModel
+
+from core.db import engine, async_session
+from services.resumen_services import ResumenService
+
+
+async def main():
+    async with engine.begin() as conn:
+        await conn.run_sync(SQLModel.metadata.create_all)
+
+    async with async_session() as session:
+        await ResumenService(session).reconstruir()
+        await session.commit()
+
+    await engine.dispose()
+    print("✅ Resúmenes diarios reconstruidos.")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
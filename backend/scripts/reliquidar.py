@@ -0,0 +1,40 @@
+"""
+Vuelve a liquidar las recaudaciones de un rango de fechas con las tasas vigentes,
+en lotes y mostrando el progreso.
+
+Uso (desde la carpeta `backend`):
+    python -m scripts.reliquidar 2026-01-01 [2026-03-31]
+"""
+import asyncio
+import sys
+from datetime import date
+
+from core.db import engine, async_session
+from services.reliquidacion_services import ReliquidacionService
+
+
+async def main(desde: date, hasta: date | None):
+    async with async_session() as session:
+        service = ReliquidacionService(session)
+
+        reliquidacion = await service.crear_trabajo(desde, hasta)
+        print(f"🔄 Re-liquidando {reliquidacion.total} recaudaciones...")
+
+        reliquidacion = await service.ejecutar(reliquidacion.id) # type: ignore
+
+    await engine.dispose()
+    print(f"{reliquidacion.estado.value}: {reliquidacion.procesadas}/{reliquidacion.total}")
+
+    if reliquidacion.error:
+        print(f"❌ {reliquidacion.error}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2:
+        sys.exit(__doc__)
+
+    desde = date.fromisoformat(sys.argv[1])
+    hasta = date.fromisoformat(sys.argv[2]) if len(sys.argv) > 2 else None
+
+    asyncio.run(main(desde, hasta))
@@ -0,0 +1,92 @@
+"""
+Compara `calcular_liquidacion_lote` contra `RecaudacionService.calcular_liquidacion`
+(la versión fila a fila con `Decimal`) y mide el tiempo de ambas.
+
+Los resultados deben ser idénticos: mismo valor, exponente y signo (`as_tuple`).
+
+Uso (desde la carpeta `backend`):
+    python -m scripts.verificar_liquidacion [cantidad_filas]
+"""
+import random
+import sys
+import time
+from decimal import Decimal
+
+from services.liquidacion import CAMPOS_LIQUIDACION, calcular_liquidacion_lote, liquidar_centavos
+from services.recaudacion_services import RecaudacionService
+
+
+def monto(maximo: int = 3_000_000) -> Decimal:
+    """Monto al azar en centavos, con valores de borde frecuentes."""
+    return Decimal(random.choice([0, 1, 5, 50, 99, random.randint(0, maximo)])).scaleb(-2)
+
+
+def generar_filas(cantidad: int) -> list:
+    filas = []
+    for _ in range(cantidad):
+        km_entrada = random.randint(0, 900_000)
+        filas.append({
+            "total_recaudado": monto(),
+            "combustible": monto(),
+            "otros_gastos": monto(),
+            "km_entrada": km_entrada,
+            "km_salida": km_entrada + random.choice([0, 1, 3, 7, random.randint(0, 900)]),
+            "h13": monto(),
+            "credito": monto(),
+        })
+    return filas
+
+
+def main(cantidad: int):
+    filas = generar_filas(cantidad)
+    columnas = {campo: [fila[campo] for fila in filas] for campo in filas[0]}
+
+    inicio = time.perf_counter()
+    esperado = [RecaudacionService.calcular_liquidacion(**fila) for fila in filas]
+    tiempo_filas = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    obtenido = calcular_liquidacion_lote(
+        **columnas,
+        sueldo=RecaudacionService.Porcentaje.SUELDO.value,
+        aporte=RecaudacionService.Porcentaje.APORTE.value,
+    )
+    tiempo_lote = time.perf_counter() - inicio
+
+    centavos = {
+        campo: [int(valor.scaleb(2)) if isinstance(valor, Decimal) else valor for valor in columna]
+        for campo, columna in columnas.items()
+    }
+
+    inicio = time.perf_counter()
+    obtenido_centavos, _ = liquidar_centavos(
+        **centavos,
+        sueldo=RecaudacionService.Porcentaje.SUELDO.value,
+        aporte=RecaudacionService.Porcentaje.APORTE.value,
+    )
+    tiempo_centavos = time.perf_counter() - inicio
+
+    diferencias = 0
+    for indice, fila in enumerate(esperado):
+        for campo in CAMPOS_LIQUIDACION:
+            if fila[campo].as_tuple() != obtenido[campo][indice].as_tuple():
+                diferencias += 1
+                print(f"❌ Fila {indice}, {campo}: {fila[campo]!r} != {obtenido[campo][indice]!r}")
+
+            escala = 0 if campo == "km_totales" else 2
+            if int(fila[campo].scaleb(escala)) != obtenido_centavos[campo][indice]:
+                diferencias += 1
+                print(f"❌ Fila {indice}, {campo} en centavos: {obtenido_centavos[campo][indice]}")
+
+    print(
+        f"Filas: {cantidad} | fila a fila: {tiempo_filas:.3f}s | "
+        f"lote Decimal: {tiempo_lote:.3f}s | lote centavos: {tiempo_centavos:.3f}s"
+    )
+    print("✅ Resultados idénticos." if not diferencias else f"❌ {diferencias} diferencias.")
+
+    return diferencias
+
+
+if __name__ == "__main__":
+    cantidad = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    sys.exit(1 if main(cantidad) else 0)
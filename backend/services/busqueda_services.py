@@ -0,0 +1,102 @@
+import re
+from typing import List
+from sqlalchemy import column, func, literal_column, or_, table
+from sqlmodel import select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.db import ES_SQLITE
+from models.busqueda import COLUMNAS_BUSQUEDA_CHOFERES, TABLA_BUSQUEDA_CHOFERES
+from models.chofer import Chofer
+
+
+# Resultados por búsqueda como máximo (es para autocompletar, no para listar).
+# Lo valida el parámetro `limit` de la ruta.
+MAX_RESULTADOS_BUSQUEDA = 100
+
+# Peso de cada columna en el ranking (`bm25`), en el orden de `COLUMNAS_BUSQUEDA_CHOFERES`
+PESOS_BUSQUEDA_CHOFERES = (8.0, 10.0, 5.0, 5.0)
+
+_busqueda = table(TABLA_BUSQUEDA_CHOFERES, column("rowid"))
+
+
+def _terminos(q: str) -> List[str]:
+    # Solo letras y números: el resto separa palabras, igual que en el índice
+    return re.findall(r"\w+", q)
+
+
+class BusquedaService:
+    """
+    Búsqueda de texto sin importar mayúsculas ni acentos.
+
+    En SQLite usa el índice FTS5 de `models.busqueda`: cada término encuentra
+    las palabras que empiezan con él en nombre, apellido, cédula o código,
+    sin recorrer la tabla. Con otra base hace un `ILIKE` por columna.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+
+    async def buscar_choferes(self, q: str, limit: int = 20) -> List[Chofer]:
+        """
+        Choferes que tienen todos los términos de `q`, cada uno como comienzo de
+        alguna palabra de cualquiera de los campos. ej: "jose per", "5123", "ibanez"
+
+        Orden:
+        1. Código o cédula exactos, buscados aparte por sus índices únicos:
+        siempre aparecen aunque el prefijo coincida con miles de choferes.
+        2. Relevancia del índice (`bm25`, pesa más el apellido).
+        3. Apellido y nombre.
+        """
+        terminos = _terminos(q)
+        if not terminos:
+            return []
+
+        if not ES_SQLITE:
+            return await self._buscar_choferes_like(terminos, limit)
+
+        texto = "".join(terminos)
+        resultado = await self.session.exec(
+            select(Chofer)
+            .where(or_(col(Chofer.codigo_chofer) == texto, col(Chofer.cedula_identidad) == texto))
+            .order_by(col(Chofer.id))
+        )
+        exactos = list(resultado.all())
+        if len(exactos) >= limit:
+            return exactos[:limit]
+
+        # Cada término entre comillas (texto literal, no sintaxis de FTS5) y con `*`: prefijo
+        consulta = " ".join(f'"{termino}"*' for termino in terminos)
+        indice = literal_column(TABLA_BUSQUEDA_CHOFERES)
+        relevancia = func.bm25(indice, *PESOS_BUSQUEDA_CHOFERES)
+
+        # Los más relevantes, ordenados dentro del índice antes de cortar
+        candidatos = (
+            select(_busqueda.c.rowid.label("id"), relevancia.label("relevancia"))
+            .select_from(_busqueda)
+            .where(indice.op("MATCH")(consulta))
+            .where(_busqueda.c.rowid.not_in([chofer.id for chofer in exactos]))
+            .order_by(relevancia)
+            .limit(limit - len(exactos))
+            .subquery()
+        )
+
+        resultado = await self.session.exec(
+            select(Chofer)
+            .join(candidatos, candidatos.c.id == col(Chofer.id))
+            .order_by(candidatos.c.relevancia, col(Chofer.apellido), col(Chofer.nombre))
+        )
+        return exactos + list(resultado.all())
+
+
+    async def _buscar_choferes_like(self, terminos: List[str], limit: int) -> List[Chofer]:
+        columnas = [getattr(Chofer, nombre) for nombre in COLUMNAS_BUSQUEDA_CHOFERES]
+
+        query = select(Chofer)
+        for termino in terminos:
+            query = query.where(or_(*(col(columna).ilike(f"%{termino}%") for columna in columnas)))
+
+        resultado = await self.session.exec(
+            query.order_by(col(Chofer.apellido), col(Chofer.nombre)).limit(limit)
+        )
+        return list(resultado.all())
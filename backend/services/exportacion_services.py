@@ -0,0 +1,106 @@
+import csv
+import io
+import json
+from enum import Enum
+from typing import AsyncIterator
+from sqlmodel import select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models.chofer import Chofer
+from models.coche import Coche
+from models.recaudacion import Recaudacion, RecaudacionFiltros
+
+
+class FormatoExportacion(str, Enum):
+    CSV="csv"
+    NDJSON="ndjson"
+
+
+# Filas que se traen de la base y se escriben por cada bloque enviado
+FILAS_POR_BLOQUE = 1000
+
+
+class ExportacionService:
+    """
+    Exportación completa de recaudaciones con memoria constante.
+
+    Lee con un cursor del lado del servidor (`session.stream` + `yield_per`)
+    solo las columnas necesarias, sin instanciar modelos, y va generando
+    el archivo por bloques de `FILAS_POR_BLOQUE` filas.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+
+    @staticmethod
+    def _columnas() -> list:
+        """
+        Columnas de la exportación: todas las de `recaudaciones` más
+        el código del chofer y el móvil, para no depender de los ids.
+        """
+        return [
+            *Recaudacion.__table__.columns, # type: ignore
+            col(Chofer.codigo_chofer),
+            col(Coche.movil),
+        ]
+
+
+    @staticmethod
+    def _valor(valor):
+        if isinstance(valor, Enum):
+            return valor.value
+        return valor
+
+
+    async def exportar(
+        self,
+        filtros: RecaudacionFiltros,
+        formato: FormatoExportacion
+    ) -> AsyncIterator[bytes]:
+        """
+        Genera la exportación por bloques, ordenada por (`fecha_turno`, `id`).
+
+        Args:
+            filtros: Mismos filtros que el listado de recaudaciones.
+            formato: csv (con encabezado) o ndjson (un objeto JSON por línea).
+        """
+        columnas = self._columnas()
+        nombres = [columna.name for columna in columnas]
+
+        query = (
+            select(*columnas)
+            .outerjoin(Chofer, col(Chofer.id) == col(Recaudacion.chofer_id))
+            .outerjoin(Coche, col(Coche.id) == col(Recaudacion.coche_id))
+            .where(*filtros.condiciones())
+            .order_by(col(Recaudacion.fecha_turno), col(Recaudacion.id))
+            .execution_options(yield_per=FILAS_POR_BLOQUE)
+        )
+
+        resultado = await self.session.stream(query)
+
+        if formato == FormatoExportacion.CSV:
+            buffer = io.StringIO()
+            escritor = csv.writer(buffer)
+            escritor.writerow(nombres)
+
+        async for bloque in resultado.partitions():
+            if formato == FormatoExportacion.CSV:
+                escritor.writerows([self._valor(v) for v in fila] for fila in bloque)
+                salida = buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+            else:
+                salida = "".join(
+                    json.dumps(
+                        {nombre: self._valor(v) for nombre, v in zip(nombres, fila)},
+                        default=str, ensure_ascii=False
+                    ) + "\n"
+                    for fila in bloque
+                )
+
+            yield salida.encode()
+
+        if formato == FormatoExportacion.CSV and buffer.tell():
+            # Solo el encabezado, si no hubo filas
+            yield buffer.getvalue().encode()
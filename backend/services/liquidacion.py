@@ -0,0 +1,215 @@
+from decimal import Decimal
+from typing import Dict, Iterable, List, Sequence, Set, Tuple
+
+
+# Campos de entrada de la liquidación, en el orden de `calcular_liquidacion`
+CAMPOS_ENTRADA_LIQUIDACION = (
+    "total_recaudado", "combustible", "otros_gastos",
+    "km_entrada", "km_salida", "h13", "credito",
+)
+
+# Campos calculados por la liquidación, en el orden de `calcular_liquidacion`
+CAMPOS_LIQUIDACION = (
+    "salario", "total_gastos", "liquido", "aportes",
+    "sub_total", "total_entregar", "km_totales", "rendimiento",
+)
+
+
+# Campos calculados que dependen de cada entrada. "tasa" es el cambio de
+# sueldo/aporte vigente, por ejemplo al mover el turno a otra fecha.
+DEPENDENCIAS = {
+    "total_recaudado": {"salario", "total_gastos", "liquido", "aportes", "sub_total", "total_entregar", "rendimiento"},
+    "combustible": {"total_gastos", "liquido", "sub_total", "total_entregar"},
+    "otros_gastos": {"total_gastos", "liquido", "sub_total", "total_entregar"},
+    "h13": {"total_entregar"},
+    "credito": {"total_entregar"},
+    "km_entrada": {"km_totales", "rendimiento"},
+    "km_salida": {"km_totales", "rendimiento"},
+    "tasa": {"salario", "total_gastos", "liquido", "aportes", "sub_total", "total_entregar"},
+}
+
+
+def campos_dependientes(entradas: Iterable[str]) -> Set[str]:
+    """
+    Campos calculados que hay que recalcular cuando cambian esas entradas.
+    ej: {"h13"} -> {"total_entregar"}
+    """
+    return set().union(*(DEPENDENCIAS.get(entrada, set()) for entrada in entradas))
+
+
+def _a_fraccion(porcentaje: Decimal) -> Tuple[int, int]:
+    """
+    Representa un porcentaje decimal como (numerador, 10^n). ej: 0.29 -> (29, 100)
+    """
+    signo, digitos, exponente = porcentaje.as_tuple()
+    numerador = int("".join(map(str, digitos))) * (-1 if signo else 1)
+
+    if exponente >= 0: # type: ignore
+        return numerador * 10 ** exponente, 1 # type: ignore
+
+    return numerador, 10 ** -exponente # type: ignore
+
+
+def _a_centavos(valores: Sequence[Decimal | int]) -> List[int]:
+    """
+    Convierte una columna de montos a centavos enteros.
+
+    Raises:
+        ValueError: Si algún monto tiene más de 2 decimales (no se puede representar exacto).
+    """
+    centavos = [Decimal(valor).scaleb(2) for valor in valores]
+    enteros = [int(valor) for valor in centavos]
+
+    if centavos != enteros:
+        raise ValueError("Los montos no pueden tener más de 2 decimales.")
+
+    return enteros
+
+
+def liquidar_centavos(
+    total_recaudado: Sequence[int],
+    combustible: Sequence[int],
+    otros_gastos: Sequence[int],
+    km_entrada: Sequence[int],
+    km_salida: Sequence[int],
+    h13: Sequence[int],
+    credito: Sequence[int],
+    sueldo: Decimal,
+    aporte: Decimal,
+) -> Tuple[Dict[str, List[int]], Set[Tuple[str, int]]]:
+    """
+    Motor de liquidación por lotes en aritmética entera de centavos.
+
+    Mismas fórmulas que `RecaudacionService.calcular_liquidacion`. Cada resultado
+    se arma como una única fracción exacta en centavos (la versión con `Decimal`
+    tampoco redondea los pasos intermedios) y se redondea una sola vez,
+    con empates alejándose del cero como `ROUND_HALF_UP`.
+
+    Es el camino rápido: recibe y devuelve columnas de enteros, sin crear
+    ningún `Decimal`. ej: los montos se pueden leer en centavos directo desde SQL.
+
+    Args:
+        total_recaudado, combustible, otros_gastos, h13, credito: Montos en centavos.
+        km_entrada, km_salida: Odómetro al inicio y al final de cada turno.
+        sueldo: Porcentaje de sueldo. ej: Decimal("0.29")
+        aporte: Porcentaje de aportes sobre el sueldo. ej: Decimal("0.19")
+
+    Returns:
+        Tuple con:
+        - Una lista por cada campo de `CAMPOS_LIQUIDACION`, en centavos
+        (salvo `km_totales`, en km), en el mismo orden que las filas de entrada.
+        - Los pares (campo, índice) de resultados negativos que redondearon a cero,
+        que `Decimal` representa como `-0.00`.
+
+    Raises:
+        ValueError: Si las columnas no tienen todas la misma cantidad de filas.
+    """
+
+    columnas = (total_recaudado, combustible, otros_gastos, km_entrada, km_salida, h13, credito)
+    if len({len(columna) for columna in columnas}) > 1:
+        raise ValueError("Todas las columnas deben tener la misma cantidad de filas.")
+
+    s, S = _a_fraccion(sueldo)
+    a, A = _a_fraccion(aporte)
+    SA = S * A
+
+    salario, total_gastos, liquido, aportes = [], [], [], []
+    sub_total, total_entregar, km_totales, rendimiento = [], [], [], []
+    ceros_negativos: Set[Tuple[str, int]] = set()
+
+    for indice, (t, c, o, ke, ks, h, k) in enumerate(zip(*columnas)):
+        # Fracciones exactas en centavos:
+        # salario = t*s/S, total_gastos = salario + gastos, liquido = t - total_gastos,
+        # aportes = salario*a/A, sub_total = liquido + aportes, total_entregar = sub_total - h13 - credito
+        ts = t * s
+        gastos = S * (c + o)
+        n_liquido = t * S - ts - gastos
+        n_sub_total = A * n_liquido + ts * a
+        n_total_entregar = n_sub_total - SA * (h + k)
+
+        # Los montos que no pueden ser negativos redondean directo: (2n + d) // 2d
+        salario.append((2 * ts + S) // (2 * S))
+        total_gastos.append((2 * (ts + gastos) + S) // (2 * S))
+        aportes.append((2 * ts * a + SA) // (2 * SA))
+
+        for campo, columna, n, d in (
+            ("liquido", liquido, n_liquido, S),
+            ("sub_total", sub_total, n_sub_total, SA),
+            ("total_entregar", total_entregar, n_total_entregar, SA),
+        ):
+            if n >= 0:
+                columna.append((2 * n + d) // (2 * d))
+            else:
+                redondeado = (d - 2 * n) // (2 * d)
+                columna.append(-redondeado)
+                if not redondeado:
+                    ceros_negativos.add((campo, indice))
+
+        km = ks - ke
+        km_totales.append(km)
+        rendimiento.append((2 * t + km) // (2 * km) if km > 0 else 0)
+
+    resultado = {
+        "salario": salario,
+        "total_gastos": total_gastos,
+        "liquido": liquido,
+        "aportes": aportes,
+        "sub_total": sub_total,
+        "total_entregar": total_entregar,
+        "km_totales": km_totales,
+        "rendimiento": rendimiento,
+    }
+
+    return resultado, ceros_negativos
+
+
+def calcular_liquidacion_lote(
+    total_recaudado: Sequence[Decimal],
+    combustible: Sequence[Decimal],
+    otros_gastos: Sequence[Decimal],
+    km_entrada: Sequence[int],
+    km_salida: Sequence[int],
+    h13: Sequence[Decimal],
+    credito: Sequence[Decimal],
+    sueldo: Decimal,
+    aporte: Decimal,
+) -> Dict[str, List[Decimal]]:
+    """
+    Liquida un lote de turnos recibiendo y devolviendo columnas de `Decimal`.
+
+    Convierte a centavos, llama a `liquidar_centavos` y vuelve a `Decimal`.
+    Los resultados son idénticos a `RecaudacionService.calcular_liquidacion`
+    fila a fila, incluido el exponente y el signo del cero
+    (ver `python -m scripts.verificar_liquidacion`).
+
+    Returns:
+        Dict[str, List[Decimal]]: Una lista por cada campo de `CAMPOS_LIQUIDACION`.
+
+    Raises:
+        ValueError: Si las columnas tienen distinto largo o algún monto más de 2 decimales.
+    """
+
+    centavos, ceros_negativos = liquidar_centavos(
+        _a_centavos(total_recaudado),
+        _a_centavos(combustible),
+        _a_centavos(otros_gastos),
+        km_entrada,
+        km_salida,
+        _a_centavos(h13),
+        _a_centavos(credito),
+        sueldo=sueldo,
+        aporte=aporte,
+    )
+
+    resultado = {
+        campo: (
+            [Decimal(km) for km in centavos[campo]] if campo == "km_totales"
+            else [Decimal(valor).scaleb(-2) for valor in centavos[campo]]
+        )
+        for campo in CAMPOS_LIQUIDACION
+    }
+
+    for campo, indice in ceros_negativos:
+        resultado[campo][indice] = resultado[campo][indice].copy_negate()
+
+    return resultado
@@ -1,13 +1,31 @@
 from datetime import date
 from enum import Enum
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Dict
+from typing import Dict, List
 from fastapi import HTTPException, status
+from pydantic import ValidationError
+from sqlalchemy import Date, Integer, bindparam, column, func, insert, update, values
+from sqlmodel import select, col
 from sqlmodel.ext.asyncio.session import AsyncSession
 
+from core.handlers import detalle_error, traducir_errores
+from core import cache
+from core import metricas
+
 from models.chofer import Chofer, EstadoChofer
 from models.coche import Coche #, EstadoCoche
-from models.recaudacion import Recaudacion, RecaudacionCreate
+from models.recaudacion import (
+    Recaudacion, RecaudacionCreate, RecaudacionUpdate,
+    ErrorImportacion, ResultadoImportacion
+)
+from services.resumen_services import ResumenService
+from services.liquidacion import CAMPOS_ENTRADA_LIQUIDACION, calcular_liquidacion_lote, campos_dependientes
+from services.tasa_services import TasaService
+
+
+# Pares (coche, fecha) por consulta en `_ultimos_km_salida`: dos parámetros cada uno,
+# lejos del máximo de variables por sentencia de SQLite (32766)
+PARES_POR_CONSULTA = 5000
 
 
 class RecaudacionService:
@@ -23,6 +41,9 @@ class RecaudacionService:
         **Constantes de Negocio:**
         - `Porcentaje.SUELDO` (29%): Parte de la recaudación bruta que corresponde al salario base.
         - `Porcentaje.APORTE` (19%): Cargas sociales aplicadas sobre el salario calculado.
+
+        Son los valores históricos y por defecto. Las tasas vigentes
+        por fecha se guardan en `tasas_comision` (ver `TasaService`).
         """
         SUELDO = Decimal("0.29")
         APORTE = Decimal("0.19")
@@ -40,7 +61,9 @@ class RecaudacionService:
         km_entrada: int,
         km_salida: int,
         h13: Decimal,
-        credito: Decimal
+        credito: Decimal,
+        sueldo: Decimal | None = None,
+        aporte: Decimal | None = None
     ) -> Dict[str, Decimal]:
         """
         Procesa los datos crudos del turno y genera el desglose financiero completo.
@@ -62,16 +85,23 @@ class RecaudacionService:
             km_salida (int): Odómetro al final.
             h13 (Decimal): Descuentos por concepto H13 (pagos diferidos).
             credito (Decimal): Descuentos por débitos y créditos (POS).
+            sueldo (Decimal): Tasa de sueldo vigente. Por defecto `Porcentaje.SUELDO`.
+            aporte (Decimal): Tasa de aportes vigente. Por defecto `Porcentaje.APORTE`.
 
         Returns:
             Dict[str, Decimal]: Diccionario con todas las claves calculadas 
             listas para ser inyectadas en el modelo `Recaudacion`.
         """
 
-        salario = total_recaudado*cls.Porcentaje.SUELDO.value
+        if sueldo is None:
+            sueldo = cls.Porcentaje.SUELDO.value
+        if aporte is None:
+            aporte = cls.Porcentaje.APORTE.value
+
+        salario = total_recaudado*sueldo
         total_gastos = salario + combustible + otros_gastos
         liquido = total_recaudado - total_gastos
-        aportes = salario * cls.Porcentaje.APORTE.value
+        aportes = salario * aporte
         sub_total = liquido + aportes
         total_entregar = sub_total - h13 - credito
 
@@ -119,9 +149,13 @@ class RecaudacionService:
         chofer, coche = await self._validar_entidades(datos_entrada.chofer_id, datos_entrada.coche_id)
 
         # 2. Validar Conitnuidad de Kilometraje
-        # await self._validar_continuidad_kilometraje(datos_entrada.chofer_id, datos_entrada.coche_id)
+        await self._validar_continuidad_kilometraje(
+            datos_entrada.coche_id, datos_entrada.fecha_turno, datos_entrada.km_entrada
+        )
+
+        # 3. Realizar Cálculos Financieros, con la tasa vigente en la fecha del turno.
+        sueldo, aporte = await TasaService(self.session).resolver(datos_entrada.fecha_turno)
 
-        # 3. Realizar Cálculos Financieros.
         liquidacion_calculada = self.calcular_liquidacion(
             total_recaudado=datos_entrada.total_recaudado,
             combustible=datos_entrada.combustible,
@@ -130,6 +164,8 @@ class RecaudacionService:
             km_salida=datos_entrada.km_salida,
             h13=datos_entrada.h13,
             credito=datos_entrada.credito,
+            sueldo=sueldo,
+            aporte=aporte,
         )
 
         liquidacon_completa = { # type: ignore
@@ -153,16 +189,289 @@ class RecaudacionService:
             )
 
         # Actualizar el kilometraje del coche.
-        if coche.kilometros < datos_entrada.km_salida:
-            coche.kilometros = datos_entrada.km_salida
-        self.session.add(coche)
+        await self._actualizar_kilometros({datos_entrada.coche_id: datos_entrada.km_salida})
+
+        # 5. Sumar a los resúmenes diarios, en la misma transacción.
+        await ResumenService(self.session).sumar(nueva_recaudacion)
 
         await self.session.commit()
         await self.session.refresh(nueva_recaudacion)
 
+        # El listado de coches muestra el kilometraje que se acaba de actualizar
+        await cache.invalidar("coches")
+        metricas.RECAUDACIONES_CREADAS.inc("individual")
+
         return nueva_recaudacion
 
 
+    async def actualizar_recaudacion(
+        self,
+        recaudacion_id: int,
+        datos_entrada: RecaudacionUpdate
+    ) -> Recaudacion:
+        """
+        Actualización parcial de una recaudación.
+
+        Solo se aplican los campos que realmente cambian. Si cambia alguna entrada
+        de la liquidación (o la tasa vigente, al mover la fecha del turno), se
+        recalculan únicamente los campos calculados que dependen de ella.
+
+        Descuenta los valores anteriores de los resúmenes diarios y suma los nuevos
+        en la misma transacción, así un cambio de fecha, coche o chofer mueve
+        los totales al resumen que corresponde.
+
+        Si cambian los km, el coche o la fecha, valida la continuidad del odómetro
+        como en el alta y sube el kilometraje del coche si corresponde.
+
+        Raises:
+            HTTPException (400): Si los kilómetros quedan inconsistentes.
+            HTTPException (404): Si la recaudación no existe.
+            HTTPException (500): Si falla la persistencia.
+        """
+
+        recaudacion_db = await self.session.get(Recaudacion, recaudacion_id)
+        if not recaudacion_db:
+            raise HTTPException(status_code=404, detail="Recaudación no encontrada")
+
+        resumenes = ResumenService(self.session)
+        valores_anteriores = resumenes.foto(recaudacion_db)
+
+        # Solo los campos enviados cuyo valor es distinto al guardado
+        recaudacion_data = datos_entrada.model_dump(exclude_unset=True)
+        cambios = {
+            key: value for key, value in recaudacion_data.items()
+            if getattr(recaudacion_db, key) != value
+        }
+
+        if not cambios:
+            return recaudacion_db
+
+        entradas_cambiadas = set(cambios)
+        cambia_odometro = bool(entradas_cambiadas & {"km_entrada", "km_salida", "coche_id", "fecha_turno"})
+
+        # Con los valores nuevos, antes de tocar el modelo de la sesión
+        if cambia_odometro:
+            await self._validar_continuidad_kilometraje(
+                cambios.get("coche_id", recaudacion_db.coche_id),
+                cambios.get("fecha_turno", recaudacion_db.fecha_turno),
+                cambios.get("km_entrada", recaudacion_db.km_entrada),
+                excluir_id=recaudacion_id,
+            )
+
+        if "fecha_turno" in cambios:
+            tasas = TasaService(self.session)
+            if await tasas.resolver(recaudacion_db.fecha_turno) != await tasas.resolver(cambios["fecha_turno"]):
+                entradas_cambiadas.add("tasa")
+
+        # Actualiza los datos del modelo con los datos de entrada
+        for key, value in cambios.items():
+            setattr(recaudacion_db, key, value)
+
+        if recaudacion_db.km_entrada > recaudacion_db.km_salida:
+            await self.session.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Los km de entrada, no pueden ser menor que los de salida"
+            )
+
+        # Recalcula solo los campos calculados afectados
+        a_recalcular = campos_dependientes(entradas_cambiadas)
+
+        if a_recalcular:
+            sueldo, aporte = await TasaService(self.session).resolver(recaudacion_db.fecha_turno)
+
+            liquidacion_calculada = calcular_liquidacion_lote(
+                **{campo: [getattr(recaudacion_db, campo)] for campo in CAMPOS_ENTRADA_LIQUIDACION},
+                sueldo=sueldo,
+                aporte=aporte,
+            )
+
+            for campo in a_recalcular:
+                valor = liquidacion_calculada[campo][0]
+                setattr(recaudacion_db, campo, int(valor) if campo == "km_totales" else valor)
+
+        try:
+            self.session.add(recaudacion_db)
+
+            await resumenes.sumar(valores_anteriores, signo=-1)
+            await resumenes.sumar(recaudacion_db)
+
+            if cambia_odometro:
+                await self._actualizar_kilometros({recaudacion_db.coche_id: recaudacion_db.km_salida})
+
+            await self.session.commit()
+
+        except Exception as e:
+            await self.session.rollback()
+
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error al actualizar la recaudación: {str(e)}"
+            )
+
+        if cambia_odometro:
+            await cache.invalidar("coches")
+
+        return recaudacion_db
+
+
+    async def eliminar_recaudacion(self, recaudacion_id: int) -> None:
+        """
+        Elimina una recaudación y descuenta sus valores de los resúmenes diarios.
+
+        Raises:
+            HTTPException (404): Si la recaudación no existe.
+        """
+
+        recaudacion_db = await self.session.get(Recaudacion, recaudacion_id)
+        if not recaudacion_db:
+            raise HTTPException(status_code=404, detail="Recaudación no encontrada")
+
+        await ResumenService(self.session).sumar(recaudacion_db, signo=-1)
+
+        await self.session.delete(recaudacion_db)
+        await self.session.commit()
+
+
+    async def importar_recaudaciones(
+        self,
+        filas: List[dict],
+        parcial: bool = False
+    ) -> ResultadoImportacion:
+        """
+        Importación masiva de recaudaciones en una sola transacción.
+
+        Pasos:
+        1. Validar cada fila con `RecaudacionCreate`.
+        2. Traer todos los choferes y coches del lote con una consulta `IN` por tabla,
+        y validar la continuidad de kilometraje.
+        3. Calcular la liquidación con `calcular_liquidacion_lote`, un lote por tasa vigente.
+        4. Insertar todas las filas con un único executemany, actualizar
+        kilometrajes y resúmenes diarios, y hacer un solo commit.
+
+        Args:
+            **filas**: Datos crudos de cada recaudación (JSON o filas del CSV).
+            **parcial**: Si es `True` inserta las filas válidas aunque otras tengan errores.
+            Por defecto, si alguna fila falla no se inserta ninguna.
+
+        Returns:
+            **ResultadoImportacion**: Cantidad insertada y errores por índice de fila.
+        """
+
+        resultado = ResultadoImportacion()
+        validas: Dict[int, RecaudacionCreate] = {}
+
+        # 1. Validar formato de cada fila
+        for indice, fila in enumerate(filas):
+            try:
+                validas[indice] = RecaudacionCreate.model_validate(fila)
+            except ValidationError as e:
+                resultado.errores.append(
+                    ErrorImportacion(indice=indice, errores=traducir_errores(e.errors()))
+                )
+
+        # 2. Validar Entidades y Estados, una consulta por tabla
+        choferes = await self._obtener_por_id(Chofer, {d.chofer_id for d in validas.values()})
+        coches = await self._obtener_por_id(Coche, {d.coche_id for d in validas.values()})
+
+        for indice, datos_entrada in list(validas.items()):
+            chofer = choferes.get(datos_entrada.chofer_id)
+            errores = []
+
+            if not chofer or chofer.estado != EstadoChofer.ACTIVO:
+                errores.append(
+                    detalle_error("chofer_no_valido", ["chofer_id"], "Chofer no válido", datos_entrada.chofer_id)
+                )
+            if datos_entrada.coche_id not in coches:
+                errores.append(
+                    detalle_error("coche_no_valido", ["coche_id"], "Coche no válido", datos_entrada.coche_id)
+                )
+
+            if errores:
+                del validas[indice]
+                resultado.errores.append(ErrorImportacion(indice=indice, errores=errores))
+
+        # Validar continuidad de kilometraje, contra la base y dentro del lote
+        for indice, mensaje in (await self._validar_continuidad_lote(validas)).items():
+            datos_entrada = validas.pop(indice)
+            resultado.errores.append(ErrorImportacion(
+                indice=indice,
+                errores=[detalle_error("continuidad_kilometraje", ["km_entrada"], mensaje, datos_entrada.km_entrada)],
+            ))
+
+        resultado.errores.sort(key=lambda error: error.indice)
+
+        if not validas or (resultado.errores and not parcial):
+            return resultado
+
+        # 3. Realizar Cálculos Financieros, un lote por cada tasa vigente.
+        tasas = TasaService(self.session)
+        grupos: Dict[tuple, List[RecaudacionCreate]] = {}
+        for datos_entrada in validas.values():
+            grupos.setdefault(await tasas.resolver(datos_entrada.fecha_turno), []).append(datos_entrada)
+
+        fecha_recibida = date.today()
+        nuevas = []
+
+        for (sueldo, aporte), entradas in grupos.items():
+            columnas = {
+                campo: [getattr(datos_entrada, campo) for datos_entrada in entradas]
+                for campo in CAMPOS_ENTRADA_LIQUIDACION
+            }
+            liquidacion_calculada = calcular_liquidacion_lote(**columnas, sueldo=sueldo, aporte=aporte)
+
+            for indice, datos_entrada in enumerate(entradas):
+                nuevas.append({
+                    **datos_entrada.model_dump(),
+                    **{campo: valores[indice] for campo, valores in liquidacion_calculada.items()},
+                    "km_totales": int(liquidacion_calculada["km_totales"][indice]),
+                    "fecha_recibida": fecha_recibida,
+                })
+
+        # 4. Guardar todo en una transacción
+        try:
+            await self.session.exec(insert(Recaudacion), params=nuevas)
+
+            # Actualizar el kilometraje de cada coche con el mayor km_salida del lote.
+            kilometros: Dict[int, int] = {}
+            for fila in nuevas:
+                kilometros[fila["coche_id"]] = max(kilometros.get(fila["coche_id"], 0), fila["km_salida"])
+
+            await self._actualizar_kilometros(kilometros)
+
+            fotos = [{"fecha": fila["fecha_turno"], **fila} for fila in nuevas]
+            await ResumenService(self.session).sumar_lote(fotos)
+
+            await self.session.commit()
+
+        except Exception as e:
+            await self.session.rollback()
+
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Error al importar las recaudaciones: {str(e)}"
+            )
+
+        resultado.insertadas = len(nuevas)
+        await cache.invalidar("coches")
+        metricas.RECAUDACIONES_CREADAS.inc("importacion", cantidad=len(nuevas))
+
+        return resultado
+
+
+    async def _obtener_por_id(self, modelo, ids: set) -> dict:
+        """
+        Trae todas las instancias de `modelo` con esos ids en una sola consulta.
+        Retorna un diccionario id -> instancia.
+        """
+        if not ids:
+            return {}
+
+        resultado = await self.session.exec(select(modelo).where(col(modelo.id).in_(ids)))
+
+        return {instancia.id: instancia for instancia in resultado.all()}
+
+
     async def _validar_entidades(self, chofer_id: int, coche_id: int) -> tuple[Chofer, Coche]:
         """
         Valida que las entidades existan y estén activos.
@@ -184,5 +493,162 @@ class RecaudacionService:
         return chofer, coche
 
 
-    # async def _validar_continuidad_kilometraje(self, coche_id: int, km_entrada: int):
-    #     pass
\ No newline at end of file
+    async def _ultimo_km_salida(
+        self,
+        coche_id: int,
+        fecha_turno: date,
+        excluir_id: int | None = None
+    ) -> int | None:
+        """
+        Último km de salida registrado para el coche en un turno anterior a la fecha.
+        Se resuelve con un solo acceso al índice (coche_id, fecha_turno, km_salida).
+
+        `excluir_id` deja afuera la recaudación que se está editando.
+        """
+        query = (
+            select(Recaudacion.km_salida)
+            .where(
+                Recaudacion.coche_id == coche_id,
+                col(Recaudacion.fecha_turno) < fecha_turno
+            )
+            .order_by(col(Recaudacion.fecha_turno).desc(), col(Recaudacion.km_salida).desc())
+            .limit(1)
+        )
+        if excluir_id is not None:
+            query = query.where(Recaudacion.id != excluir_id)
+        resultado = await self.session.exec(query)
+
+        return resultado.first()
+
+
+    async def _ultimos_km_salida(self, claves: set) -> Dict[tuple, int | None]:
+        """
+        `_ultimo_km_salida` de varios pares (coche_id, fecha_turno) en una consulta:
+        la lista de pares se cruza con una subconsulta correlacionada que es, para
+        cada par, un solo acceso al índice (coche_id, fecha_turno, km_salida).
+        """
+        ultimos: Dict[tuple, int | None] = dict.fromkeys(claves)
+        ordenadas = sorted(claves)
+
+        for inicio in range(0, len(ordenadas), PARES_POR_CONSULTA):
+            pares = values(
+                column("coche_id", Integer), column("fecha_turno", Date), name="pares"
+            ).data(ordenadas[inicio:inicio + PARES_POR_CONSULTA]).cte()
+
+            ultimo_km = (
+                select(Recaudacion.km_salida)
+                .where(
+                    Recaudacion.coche_id == pares.c.coche_id,
+                    col(Recaudacion.fecha_turno) < pares.c.fecha_turno
+                )
+                .order_by(col(Recaudacion.fecha_turno).desc(), col(Recaudacion.km_salida).desc())
+                .limit(1)
+                .scalar_subquery()
+            )
+
+            resultado = await self.session.exec(
+                select(pares.c.coche_id, pares.c.fecha_turno, ultimo_km)
+            )
+            for coche_id, fecha_turno, km_salida in resultado.all():
+                ultimos[(coche_id, fecha_turno)] = km_salida
+
+        return ultimos
+
+
+    def _mensaje_continuidad(self, km_entrada: int, ultimo_km: int) -> str:
+        return (
+            f"Los km de entrada ({km_entrada}) no pueden ser menores que los km de salida "
+            f"del turno anterior del coche ({ultimo_km})."
+        )
+
+
+    async def _validar_continuidad_kilometraje(
+        self,
+        coche_id: int,
+        fecha_turno: date,
+        km_entrada: int,
+        excluir_id: int | None = None
+    ):
+        """
+        Valida que el odómetro no retroceda respecto al último turno del coche
+        en una fecha anterior. Los turnos del mismo día no se comparan entre sí.
+        Al editar, `excluir_id` evita comparar el turno con su propia versión guardada.
+
+        Raises:
+            HTTPException (400): Si km_entrada es menor que ese último km_salida.
+        """
+        ultimo_km = await self._ultimo_km_salida(coche_id, fecha_turno, excluir_id)
+
+        if ultimo_km is not None and km_entrada < ultimo_km:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=self._mensaje_continuidad(km_entrada, ultimo_km)
+            )
+
+
+    async def _validar_continuidad_lote(self, validas: Dict[int, RecaudacionCreate]) -> Dict[int, str]:
+        """
+        Igual que `_validar_continuidad_kilometraje` para un lote: cada fila se compara
+        contra la base (una consulta para todos los coches y fechas, ver `_ultimos_km_salida`)
+        y contra las filas del mismo lote de ese coche en fechas anteriores.
+
+        Returns:
+            Dict[int, str]: Mensaje de error por índice de las filas que no pasan.
+        """
+        en_base = await self._ultimos_km_salida(
+            {(datos_entrada.coche_id, datos_entrada.fecha_turno) for datos_entrada in validas.values()}
+        )
+
+        # Mayor km_salida del lote por coche y fecha
+        en_lote: Dict[int, Dict[date, int]] = {}
+        for datos_entrada in validas.values():
+            por_fecha = en_lote.setdefault(datos_entrada.coche_id, {})
+            por_fecha[datos_entrada.fecha_turno] = max(
+                por_fecha.get(datos_entrada.fecha_turno, 0), datos_entrada.km_salida
+            )
+
+        # Para cada coche y fecha, el mayor km_salida del lote en fechas anteriores
+        anteriores: Dict[tuple, int] = {}
+        for coche_id, por_fecha in en_lote.items():
+            maximo = 0
+            for fecha in sorted(por_fecha):
+                anteriores[(coche_id, fecha)] = maximo
+                maximo = max(maximo, por_fecha[fecha])
+
+        errores = {}
+        for indice, datos_entrada in validas.items():
+            clave = (datos_entrada.coche_id, datos_entrada.fecha_turno)
+            ultimo_km = max(en_base[clave] or 0, anteriores[clave])
+
+            if datos_entrada.km_entrada < ultimo_km:
+                errores[indice] = self._mensaje_continuidad(datos_entrada.km_entrada, ultimo_km)
+
+        return errores
+
+
+    async def _actualizar_kilometros(self, kilometros: Dict[int, int]) -> None:
+        """
+        Sube el odómetro de cada coche al km indicado, si es mayor que el guardado.
+
+        Es un único `UPDATE ... SET kilometros = MAX(kilometros, :km)` (executemany),
+        atómico en la base: dos turnos simultáneos del mismo coche no se pisan.
+
+        Args:
+            kilometros: coche_id -> km_salida.
+        """
+        if not kilometros:
+            return
+
+        maximo = func.greatest if self.session.bind.dialect.name == "postgresql" else func.max
+
+        tabla = Coche.__table__ # type: ignore
+        query = (
+            update(tabla)
+            .where(tabla.c.id == bindparam("b_id"))
+            .values(kilometros=maximo(tabla.c.kilometros, bindparam("b_km")))
+        )
+
+        await self.session.exec(
+            query,
+            params=[{"b_id": coche_id, "b_km": km} for coche_id, km in kilometros.items()]
+        )
\ No newline at end of file
@@ -0,0 +1,260 @@
+import asyncio
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Tuple
+from sqlalchemy import Integer, bindparam, cast, func, update
+from sqlmodel import select, col, or_, and_
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.db import async_session
+from models.recaudacion import Recaudacion
+from models.tasa import Reliquidacion, EstadoReliquidacion
+from services.liquidacion import CAMPOS_ENTRADA_LIQUIDACION, CAMPOS_LIQUIDACION, liquidar_centavos
+from services.resumen_services import CAMPOS_RESUMEN, ResumenService
+from services.tasa_services import TasaService
+
+
+# Recaudaciones por lote. Cada lote es una transacción corta,
+# así la tabla nunca queda bloqueada durante todo el trabajo.
+FILAS_POR_LOTE = 500
+
+# Veces que se vuelve a leer un lote cuando otra escritura cambió alguna de sus filas
+REINTENTOS_POR_LOTE = 5
+
+# Montos que se leen en centavos enteros directo desde SQL
+MONTOS = ("total_recaudado", "combustible", "otros_gastos", "h13", "credito", "liquido", "aportes", "total_entregar")
+
+# Columnas que se leen de cada recaudación: las entradas de la liquidación, las claves
+# de los resúmenes y los montos que se descuentan de ellos
+LEIDAS = ("fecha_turno", "coche_id", "chofer_id", "km_entrada", "km_salida", "km_totales", *MONTOS)
+
+
+def _leida(campo: str):
+    """
+    Columna tal como la lee `_leer_lote`: los montos en centavos enteros.
+    """
+    columna = getattr(Recaudacion, campo)
+    return cast(func.round(columna * 100), Integer) if campo in MONTOS else col(columna)
+
+
+class ReliquidacionService:
+    """
+    Re-liquidación de recaudaciones ya guardadas, por ejemplo al cambiar una tasa.
+
+    Recorre el rango por (`fecha_turno`, `id`) en lotes de `FILAS_POR_LOTE`.
+    Cada lote se calcula con `liquidar_centavos`, se guarda con un único
+    `UPDATE` executemany junto con el ajuste de los resúmenes diarios, y se
+    confirma antes de pasar al siguiente, registrando el progreso.
+
+    El lote se lee fuera de la transacción que lo escribe: el `UPDATE` solo toca
+    las filas que siguen como se leyeron. Si una edición o baja entró en el medio,
+    se descarta el lote entero y se vuelve a leer (ver `_reliquidar_lote`).
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+
+    def _rango(self, desde: date, hasta: date | None) -> list:
+        condiciones = [col(Recaudacion.fecha_turno) >= desde]
+        if hasta is not None:
+            condiciones.append(col(Recaudacion.fecha_turno) <= hasta)
+        return condiciones
+
+
+    async def crear_trabajo(self, desde: date, hasta: date | None = None) -> Reliquidacion:
+        """
+        Registra un trabajo pendiente con la cantidad de recaudaciones a procesar.
+        """
+        query = select(func.count()).select_from(Recaudacion).where(*self._rango(desde, hasta))
+        total = (await self.session.exec(query)).one()
+
+        reliquidacion = Reliquidacion(desde=desde, hasta=hasta, total=total)
+        self.session.add(reliquidacion)
+        await self.session.commit()
+        await self.session.refresh(reliquidacion)
+
+        return reliquidacion
+
+
+    async def ejecutar(self, reliquidacion_id: int) -> Reliquidacion:
+        """
+        Ejecuta un trabajo de re-liquidación, lote por lote.
+
+        Si falla, el trabajo queda en estado `Error` con los lotes ya
+        confirmados guardados; se puede volver a lanzar sobre el mismo rango.
+        """
+        reliquidacion = await self.session.get(Reliquidacion, reliquidacion_id)
+        if not reliquidacion:
+            raise ValueError(f"No existe la re-liquidación {reliquidacion_id}")
+
+        reliquidacion.estado = EstadoReliquidacion.EN_CURSO
+        reliquidacion.procesadas = 0
+        self.session.add(reliquidacion)
+        await self.session.commit()
+
+        # Copias locales: un rollback expira los atributos del trabajo
+        desde, hasta = reliquidacion.desde, reliquidacion.hasta
+        procesadas = 0
+
+        try:
+            ultimo: Tuple[date, int] | None = None
+            reintentos = 0
+
+            while True:
+                filas = await self._leer_lote(desde, hasta, ultimo)
+                if not filas:
+                    break
+
+                if not await self._reliquidar_lote(filas):
+                    await self.session.rollback()
+                    reintentos += 1
+                    if reintentos > REINTENTOS_POR_LOTE:
+                        raise RuntimeError(
+                            f"Las recaudaciones desde el {filas[0]['fecha_turno']} cambiaron "
+                            f"{reintentos} veces durante la re-liquidación."
+                        )
+                    continue
+
+                reintentos = 0
+                procesadas += len(filas)
+                reliquidacion.procesadas = procesadas
+                self.session.add(reliquidacion)
+                await self.session.commit()
+
+                ultimo = (filas[-1]["fecha_turno"], filas[-1]["id"])
+
+                # Cede el turno a los requests en curso entre lote y lote
+                await asyncio.sleep(0)
+
+            reliquidacion.estado = EstadoReliquidacion.FINALIZADA
+
+        except Exception as e:
+            await self.session.rollback()
+            reliquidacion.estado = EstadoReliquidacion.ERROR
+            reliquidacion.error = str(e)
+
+        reliquidacion.finalizada = datetime.now()
+        self.session.add(reliquidacion)
+        await self.session.commit()
+
+        return reliquidacion
+
+
+    async def _leer_lote(
+        self,
+        desde: date,
+        hasta: date | None,
+        ultimo: Tuple[date, int] | None
+    ) -> List[dict]:
+        """
+        Siguiente lote de recaudaciones del rango, con los montos en centavos.
+        """
+        query = (
+            select(col(Recaudacion.id), *(_leida(campo).label(campo) for campo in LEIDAS))
+            .where(*self._rango(desde, hasta))
+            .order_by(col(Recaudacion.fecha_turno), col(Recaudacion.id))
+            .limit(FILAS_POR_LOTE)
+        )
+
+        if ultimo is not None:
+            fecha, id_ = ultimo
+            query = query.where(
+                or_(
+                    col(Recaudacion.fecha_turno) > fecha,
+                    and_(col(Recaudacion.fecha_turno) == fecha, col(Recaudacion.id) > id_)
+                )
+            )
+
+        resultado = await self.session.exec(query)
+
+        return [dict(fila._mapping) for fila in resultado.all()]
+
+
+    async def _reliquidar_lote(self, filas: List[dict]) -> bool:
+        """
+        Recalcula un lote agrupando las filas por tasa vigente, guarda los
+        campos calculados y ajusta los resúmenes diarios con la diferencia.
+
+        El `UPDATE` de cada fila exige que sus columnas `LEIDAS` sigan iguales.
+        Si alguna cambió o se borró desde la lectura no se ajustan los resúmenes
+        (la diferencia se calculó con valores viejos) y devuelve `False`:
+        quien llama descarta la transacción y vuelve a leer el lote.
+        """
+        tasas = TasaService(self.session)
+
+        grupos: Dict[Tuple[Decimal, Decimal], List[dict]] = {}
+        for fila in filas:
+            grupos.setdefault(await tasas.resolver(fila["fecha_turno"]), []).append(fila)
+
+        parametros = []
+        fotos_anteriores = []
+        fotos_nuevas = []
+
+        for (sueldo, aporte), grupo in grupos.items():
+            calculado, _ = liquidar_centavos(
+                **{campo: [fila[campo] for fila in grupo] for campo in CAMPOS_ENTRADA_LIQUIDACION},
+                sueldo=sueldo,
+                aporte=aporte,
+            )
+
+            for indice, fila in enumerate(grupo):
+                nuevos = {
+                    campo: (
+                        calculado[campo][indice] if campo == "km_totales"
+                        else Decimal(calculado[campo][indice]).scaleb(-2)
+                    )
+                    for campo in CAMPOS_LIQUIDACION
+                }
+                parametros.append({
+                    "b_id": fila["id"],
+                    **{f"b_{c}": v for c, v in nuevos.items()},
+                    **{f"l_{c}": fila[c] for c in LEIDAS},
+                })
+
+                clave = {"fecha": fila["fecha_turno"], "coche_id": fila["coche_id"], "chofer_id": fila["chofer_id"]}
+                fotos_anteriores.append({
+                    **clave,
+                    **{
+                        campo: fila[campo] if campo == "km_totales" else Decimal(fila[campo]).scaleb(-2)
+                        for campo in CAMPOS_RESUMEN
+                    },
+                })
+                fotos_nuevas.append({
+                    **clave,
+                    "total_recaudado": Decimal(fila["total_recaudado"]).scaleb(-2),
+                    **{campo: nuevos[campo] for campo in CAMPOS_RESUMEN if campo != "total_recaudado"},
+                })
+
+        tabla = Recaudacion.__table__ # type: ignore
+        query = (
+            update(tabla)
+            .where(
+                tabla.c.id == bindparam("b_id"),
+                *(
+                    _leida(campo).is_not_distinct_from(bindparam(f"l_{campo}", type_=_leida(campo).type))
+                    for campo in LEIDAS
+                ),
+            )
+            .values({campo: bindparam(f"b_{campo}") for campo in CAMPOS_LIQUIDACION})
+        )
+        resultado = await self.session.exec(query, params=parametros)
+
+        # En un executemany es la suma de las filas tocadas por cada sentencia
+        if resultado.rowcount != len(parametros):
+            return False
+
+        resumenes = ResumenService(self.session)
+        await resumenes.sumar_lote(fotos_anteriores, signo=-1)
+        await resumenes.sumar_lote(fotos_nuevas)
+
+        return True
+
+
+async def ejecutar_reliquidacion(reliquidacion_id: int) -> None:
+    """
+    Punto de entrada para correr un trabajo en segundo plano,
+    con su propia sesión independiente del request que lo creó.
+    """
+    async with async_session() as session:
+        await ReliquidacionService(session).ejecutar(reliquidacion_id)
@@ -0,0 +1,146 @@
+from typing import List, Optional, Type
+from sqlalchemy import Date, cast, func, literal_column, type_coerce
+from sqlmodel import select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models.recaudacion import Recaudacion, RecaudacionFiltros
+from models.reporte import Periodo, ReporteTotales
+from models.resumen import ResumenDiarioBase, ResumenDiarioCoche, ResumenDiarioChofer
+
+
+class ReporteService:
+    """
+    Reportes de recaudación agregados en la base de datos.
+
+    Todo el `GROUP BY` se resuelve en SQL: solo viajan las filas ya
+    agregadas, nunca el detalle de las recaudaciones.
+    Los totales se leen de los resúmenes diarios cuando alcanza con ellos.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+
+    def _expresion_periodo(self, periodo: Periodo, fecha):
+        """
+        Expresión SQL que lleva la columna `fecha` al primer día de su período.
+
+        Los modificadores van como literales y no como parámetros, para que
+        la expresión del `SELECT` y la del `GROUP BY` sean idénticas.
+        """
+        if periodo == Periodo.DIA:
+            return fecha
+
+        if self.session.bind.dialect.name == "sqlite":
+            if periodo == Periodo.SEMANA:
+                # 'weekday 0' avanza al domingo, -6 días vuelve al lunes de esa semana
+                expresion = func.date(fecha, literal_column("'weekday 0'"), literal_column("'-6 days'"))
+            else:
+                expresion = func.date(fecha, literal_column("'start of month'"))
+
+            return type_coerce(expresion, Date)
+
+        trunc = "week" if periodo == Periodo.SEMANA else "month"
+        return cast(func.date_trunc(literal_column(f"'{trunc}'"), fecha), Date)
+
+
+    @staticmethod
+    def _elegir_resumen(
+        filtros: RecaudacionFiltros,
+        por_coche: bool,
+        por_chofer: bool,
+    ) -> Optional[Type[ResumenDiarioBase]]:
+        """
+        Elige la tabla de resumen diario que puede responder el reporte.
+
+        Devuelve `None` si hace falta el detalle de `recaudaciones`:
+        filtros por turno, o coche y chofer en la misma consulta.
+        """
+        if filtros.turno is not None:
+            return None
+
+        usa_coche = por_coche or filtros.coche_id is not None
+        usa_chofer = por_chofer or filtros.chofer_id is not None
+
+        if usa_coche and usa_chofer:
+            return None
+
+        return ResumenDiarioChofer if usa_chofer else ResumenDiarioCoche
+
+
+    async def totales(
+        self,
+        filtros: RecaudacionFiltros,
+        periodo: Periodo | None = None,
+        por_coche: bool = False,
+        por_chofer: bool = False,
+    ) -> List[ReporteTotales]:
+        """
+        Suma las recaudaciones agrupando por período, coche y/o chofer.
+
+        Siempre que se pueda lee los resúmenes diarios (una fila por día y
+        coche o chofer) en lugar del historial completo de recaudaciones.
+
+        Args:
+            filtros: Mismos filtros que el listado de recaudaciones.
+            periodo: Agrupa por día, semana o mes. Si es `None` no agrupa por fecha.
+            por_coche: Agrupa por `coche_id`.
+            por_chofer: Agrupa por `chofer_id`.
+
+        Returns:
+            List[ReporteTotales]: Una fila por grupo, ordenadas por sus claves.
+        """
+
+        resumen = self._elegir_resumen(filtros, por_coche, por_chofer)
+
+        if resumen is None:
+            origen = Recaudacion
+            fecha = col(Recaudacion.fecha_turno)
+            cantidad_turnos = func.count()
+            condiciones = filtros.condiciones()
+        else:
+            origen = resumen
+            fecha = col(resumen.fecha)
+            cantidad_turnos = func.sum(resumen.cantidad_turnos)
+            condiciones = []
+
+            if filtros.coche_id is not None:
+                condiciones.append(col(ResumenDiarioCoche.coche_id) == filtros.coche_id)
+            if filtros.chofer_id is not None:
+                condiciones.append(col(ResumenDiarioChofer.chofer_id) == filtros.chofer_id)
+            if filtros.desde is not None:
+                condiciones.append(fecha >= filtros.desde)
+            if filtros.hasta is not None:
+                condiciones.append(fecha <= filtros.hasta)
+
+        claves = []
+        if periodo:
+            claves.append(self._expresion_periodo(periodo, fecha).label("periodo"))
+        if por_coche:
+            claves.append(col(origen.coche_id).label("coche_id")) # type: ignore
+        if por_chofer:
+            claves.append(col(origen.chofer_id).label("chofer_id")) # type: ignore
+
+        query = (
+            select(
+                *claves,
+                cantidad_turnos.label("cantidad_turnos"),
+                func.coalesce(func.sum(origen.total_recaudado), 0).label("total_recaudado"),
+                func.coalesce(func.sum(origen.liquido), 0).label("liquido"),
+                func.coalesce(func.sum(origen.aportes), 0).label("aportes"),
+                func.coalesce(func.sum(origen.total_entregar), 0).label("total_entregar"),
+                func.coalesce(func.sum(origen.km_totales), 0).label("km_totales"),
+            )
+            .select_from(origen)
+            .where(*condiciones)
+            .group_by(*claves)
+            .order_by(*claves)
+        )
+
+        if resumen is not None:
+            # Los días que quedaron en cero tras eliminar recaudaciones no se informan
+            query = query.having(cantidad_turnos > 0)
+
+        resultado = await self.session.exec(query)
+
+        return [ReporteTotales.model_validate(fila._mapping) for fila in resultado.all()]
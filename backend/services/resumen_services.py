@@ -0,0 +1,155 @@
+from decimal import Decimal
+from typing import Dict, List, Type
+from sqlalchemy import delete, func, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from models.recaudacion import Recaudacion
+from models.resumen import ResumenDiarioBase, ResumenDiarioCoche, ResumenDiarioChofer
+
+
+# Columnas acumuladas en los resúmenes, tomadas de cada `Recaudacion`
+CAMPOS_RESUMEN = ("total_recaudado", "liquido", "aportes", "total_entregar", "km_totales")
+
+# Tabla de resumen -> columna de `Recaudacion` que usa como clave
+RESUMENES: Dict[Type[ResumenDiarioBase], str] = {
+    ResumenDiarioCoche: "coche_id",
+    ResumenDiarioChofer: "chofer_id",
+}
+
+
+class ResumenService:
+    """
+    Mantenimiento de los resúmenes diarios por coche y por chofer.
+
+    No hace commit: los cambios quedan en la transacción de la sesión,
+    junto con la alta, edición o baja de la recaudación que los origina.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+
+    @staticmethod
+    def foto(recaudacion: Recaudacion) -> dict:
+        """
+        Copia de los valores de una recaudación que afectan a los resúmenes.
+        Se toma antes de editarla para poder descontar los valores anteriores.
+        """
+        return {
+            "fecha": recaudacion.fecha_turno,
+            "coche_id": recaudacion.coche_id,
+            "chofer_id": recaudacion.chofer_id,
+            **{campo: getattr(recaudacion, campo) for campo in CAMPOS_RESUMEN},
+        }
+
+
+    async def sumar(self, recaudacion: Recaudacion | dict, signo: int = 1) -> None:
+        """
+        Suma (`signo=1`) o descuenta (`signo=-1`) una recaudación en los resúmenes
+        de su día, con un upsert por tabla.
+
+        Args:
+            recaudacion: La recaudación o una `foto` de sus valores.
+            signo: 1 al crearla, -1 al eliminarla.
+        """
+        valores = recaudacion if isinstance(recaudacion, dict) else self.foto(recaudacion)
+
+        await self.sumar_lote([valores], signo)
+
+
+    async def sumar_lote(self, fotos: List[dict], signo: int = 1) -> None:
+        """
+        Suma un lote de recaudaciones (sus `foto`) en los resúmenes.
+
+        Agrupa primero en memoria por día y coche/chofer, y después ejecuta
+        un único upsert por tabla con todas las filas (executemany).
+        """
+        for modelo, clave in RESUMENES.items():
+            filas: Dict[tuple, dict] = {}
+
+            for valores in fotos:
+                if valores[clave] is None:
+                    continue
+
+                fila = filas.setdefault(
+                    (valores["fecha"], valores[clave]),
+                    {
+                        "fecha": valores["fecha"],
+                        clave: valores[clave],
+                        "cantidad_turnos": 0,
+                        **{campo: Decimal(0) for campo in CAMPOS_RESUMEN},
+                    },
+                )
+                fila["cantidad_turnos"] += signo
+                for campo in CAMPOS_RESUMEN:
+                    fila[campo] += Decimal(valores[campo] or 0) * signo
+
+            if not filas:
+                continue
+
+            for fila in filas.values():
+                fila["km_totales"] = int(fila["km_totales"])
+
+            await self.session.exec(self._upsert(modelo, clave), params=list(filas.values()))
+
+
+    def _upsert(self, modelo: Type[ResumenDiarioBase], clave: str):
+        """
+        `INSERT ... ON CONFLICT (fecha, clave) DO UPDATE` sumando cada columna.
+        Los valores se pasan como parámetros al ejecutarlo.
+        """
+        dialecto = postgresql if self.session.bind.dialect.name == "postgresql" else sqlite
+
+        query = dialecto.insert(modelo)
+        acumulados = ("cantidad_turnos", *CAMPOS_RESUMEN)
+
+        return query.on_conflict_do_update(
+            index_elements=["fecha", clave],
+            set_={
+                campo: getattr(modelo, campo) + getattr(query.excluded, campo)
+                for campo in acumulados
+            },
+        )
+
+
+    async def reconstruir(self) -> None:
+        """
+        Vuelve a calcular todos los resúmenes desde `recaudaciones`.
+
+        Repara cualquier diferencia con el historial (ej: cargas directas a la
+        base de datos). Se ejecuta en una sola consulta `INSERT ... SELECT`
+        por tabla, sin traer filas a Python.
+        """
+        for modelo, clave in RESUMENES.items():
+            columna_clave = getattr(Recaudacion, clave)
+
+            await self.session.exec(delete(modelo))
+
+            origen = (
+                select(
+                    col(Recaudacion.fecha_turno),
+                    columna_clave,
+                    func.count(),
+                    *(func.sum(getattr(Recaudacion, campo)) for campo in CAMPOS_RESUMEN),
+                )
+                .where(col(columna_clave).is_not(None))
+                .group_by(col(Recaudacion.fecha_turno), columna_clave)
+            )
+
+            await self.session.exec(
+                insert(modelo).from_select(
+                    ["fecha", clave, "cantidad_turnos", *CAMPOS_RESUMEN], origen
+                )
+            )
+
+
+    async def esta_vacio(self) -> bool:
+        """
+        `True` si hay recaudaciones pero los resúmenes nunca se construyeron.
+        """
+        resumen = await self.session.exec(select(ResumenDiarioCoche.fecha).limit(1))
+        recaudacion = await self.session.exec(select(Recaudacion.id).limit(1))
+
+        return resumen.first() is None and recaudacion.first() is not None
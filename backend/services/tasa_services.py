@@ -0,0 +1,166 @@
+from bisect import bisect_right
+from datetime import date
+from decimal import Decimal
+from typing import List, Tuple
+from fastapi import HTTPException, status
+from sqlalchemy import func
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import select, col
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from core.db import ES_SQLITE
+from models.tasa import TasaComision, TasaComisionCreate
+from models.version import VersionTabla
+
+
+# Cache por proceso: fechas de vigencia ordenadas, (sueldo, aporte) de cada una
+# y la versión de `tasas_comision` con la que se cargaron
+_cache: dict = {"fechas": [], "tasas": [], "version": None}
+
+
+def invalidar_cache() -> None:
+    _cache["version"] = None
+
+
+class TasaService:
+    """
+    Tasas de sueldo y aportes con fecha de vigencia.
+
+    Resuelve la tasa de cada `fecha_turno` desde una copia en memoria,
+    sin consultar la base en cada liquidación.
+
+    Cada instancia compara una vez la versión de `tasas_comision` con la de la
+    copia: una tasa nueva cargada en otro worker se usa desde el siguiente request.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+        self._verificada = False
+
+
+    async def _version(self) -> tuple:
+        """
+        Versión actual de las tasas. En SQLite el contador de cambios de la tabla
+        (ver `models.version`); en otra base, cantidad e id máximo.
+        """
+        if ES_SQLITE:
+            resultado = await self.session.exec(
+                select(VersionTabla.version).where(VersionTabla.tabla == TasaComision.__tablename__)
+            )
+            return (resultado.first(),)
+
+        resultado = await self.session.exec(select(func.count(), func.max(TasaComision.id)))
+        return tuple(resultado.one())
+
+
+    async def _cargar(self) -> None:
+        """
+        Recarga la cache si está vacía o cambiaron las tasas en la base.
+        """
+        if self._verificada:
+            return
+
+        version = await self._version()
+        self._verificada = True
+        if _cache["version"] == version:
+            return
+
+        resultado = await self.session.exec(
+            select(TasaComision).order_by(col(TasaComision.vigente_desde))
+        )
+        tasas = resultado.all()
+
+        _cache["fechas"] = [tasa.vigente_desde for tasa in tasas]
+        _cache["tasas"] = [(tasa.sueldo, tasa.aporte) for tasa in tasas]
+        _cache["version"] = version
+
+
+    async def resolver(self, fecha_turno: date) -> Tuple[Decimal, Decimal]:
+        """
+        Devuelve (sueldo, aporte) vigentes para una fecha de turno.
+
+        Raises:
+            HTTPException (500): Si no hay ninguna tasa vigente para esa fecha.
+        """
+        await self._cargar()
+
+        posicion = bisect_right(_cache["fechas"], fecha_turno)
+        if posicion == 0:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"No hay tasas de comisión vigentes para el {fecha_turno}."
+            )
+
+        return _cache["tasas"][posicion - 1]
+
+
+    async def listar(self) -> List[TasaComision]:
+        resultado = await self.session.exec(
+            select(TasaComision).order_by(col(TasaComision.vigente_desde))
+        )
+        return list(resultado.all())
+
+
+    async def crear(self, datos_entrada: TasaComisionCreate) -> Tuple[TasaComision, date | None]:
+        """
+        Registra una nueva tasa.
+
+        Returns:
+            La tasa creada y el último día en que rige (el anterior a la
+            siguiente tasa), o `None` si es la más reciente.
+
+        Raises:
+            HTTPException (400): Si ya existe una tasa con esa fecha de vigencia.
+        """
+        query = select(TasaComision).where(TasaComision.vigente_desde == datos_entrada.vigente_desde)
+        existe = (await self.session.exec(query)).first()
+
+        if existe:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Ya existe una tasa con esa fecha de vigencia."
+            )
+
+        nueva_tasa = TasaComision.model_validate(datos_entrada)
+        self.session.add(nueva_tasa)
+        await self.session.commit()
+        await self.session.refresh(nueva_tasa)
+
+        invalidar_cache()
+        self._verificada = False
+
+        query = (
+            select(TasaComision.vigente_desde)
+            .where(col(TasaComision.vigente_desde) > nueva_tasa.vigente_desde)
+            .order_by(col(TasaComision.vigente_desde))
+            .limit(1)
+        )
+        siguiente = (await self.session.exec(query)).first()
+
+        hasta = date.fromordinal(siguiente.toordinal() - 1) if siguiente else None
+
+        return nueva_tasa, hasta
+
+
+    async def asegurar_tasa_inicial(self, sueldo: Decimal, aporte: Decimal) -> None:
+        """
+        Si no hay ninguna tasa, registra una vigente desde siempre
+        con los porcentajes históricos.
+
+        Con varios workers arrancando sobre una base nueva todos llegan al alta:
+        `ON CONFLICT DO NOTHING` deja la del primero y los demás siguen sin error.
+        """
+        existe = (await self.session.exec(select(TasaComision.id).limit(1))).first()
+        if existe:
+            return
+
+        dialecto = postgresql if self.session.bind.dialect.name == "postgresql" else sqlite
+        await self.session.exec(
+            dialecto.insert(TasaComision)
+            .values(vigente_desde=date.min, sueldo=sueldo, aporte=aporte)
+            .on_conflict_do_nothing(index_elements=["vigente_desde"])
+        )
+        await self.session.commit()
+
+        invalidar_cache()
+        self._verificada = False
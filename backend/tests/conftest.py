@@ -0,0 +1,160 @@
+import os
+import sqlite3
+import tempfile
+from decimal import Decimal
+from typing import AsyncGenerator, Callable
+
+# La configuración se lee al importar la app: la base y las carpetas de trabajo
+# de los tests se definen antes, en un directorio temporal
+_DIRECTORIO = tempfile.mkdtemp(prefix="adm_taxis_tests_")
+RUTA_BASE = os.path.join(_DIRECTORIO, "test.sqlite")
+
+os.environ["DATABASE_URL"] = f"sqlite+aiosqlite:///{RUTA_BASE}"
+os.environ["METRICAS_DIR"] = os.path.join(_DIRECTORIO, "metricas")
+os.environ["CACHE_DIR"] = os.path.join(_DIRECTORIO, "cache")
+os.environ["PERFILADO_DIR"] = os.path.join(_DIRECTORIO, "perfiles")
+
+import pytest
+import pytest_asyncio
+from httpx import AsyncClient, ASGITransport
+
+from main import app, lifespan
+from core import cache, claves, conteo
+from core.db import engine
+
+# Fixtures de antes de este conftest. Su nombre coincide con el patrón `*_test.py`
+# de pytest, pero no tiene tests e importa la app como `backend.main`
+collect_ignore = ["conf_test.py"]
+
+
+@pytest_asyncio.fixture
+async def cliente() -> AsyncGenerator[AsyncClient, None]:
+    """
+    Cliente de la app con una base nueva: corre el inicio completo (tablas,
+    índices, triggers y tasa inicial) y al terminar borra la base.
+    """
+    # El cache de respuestas, los totales y las claves viven en el proceso: con la base
+    # nueva los contadores de versión y los ids pueden repetir los del test anterior
+    cache.configurar_backend(cache.BackendMemoria())
+    conteo._totales.clear()
+    claves._ids.clear()
+
+    async with lifespan(app):
+        async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
+            yield ac
+
+    # Las conexiones del pool quedan atadas al event loop de este test
+    await engine.dispose()
+    for sufijo in ("", "-wal", "-shm"):
+        if os.path.exists(RUTA_BASE + sufijo):
+            os.remove(RUTA_BASE + sufijo)
+
+
+@pytest.fixture
+def sql_directo() -> Callable[..., list]:
+    """
+    Ejecuta SQL con una conexión propia, fuera de la app: como lo haría
+    otro worker o un script que escribe directo en la base. Devuelve las filas.
+    """
+    def ejecutar(sql: str, *parametros) -> list:
+        conexion = sqlite3.connect(RUTA_BASE)
+        try:
+            filas = conexion.execute(sql, parametros).fetchall()
+            conexion.commit()
+            return filas
+        finally:
+            conexion.close()
+    return ejecutar
+
+
+CAMPOS_RESUMEN = ("total_recaudado", "liquido", "aportes", "total_entregar", "km_totales")
+
+
+def _redondear(fila: tuple) -> tuple:
+    # SQLite suma los montos como REAL: se comparan redondeados al centavo
+    return tuple(
+        Decimal(str(valor)).quantize(Decimal("0.01")) if isinstance(valor, float) else valor
+        for valor in fila
+    )
+
+
+@pytest.fixture
+def verificar_resumenes(sql_directo) -> Callable[[], None]:
+    """
+    Verifica que cada resumen diario sea igual a agrupar `recaudaciones` por día
+    y coche/chofer. Los días que quedaron sin turnos pueden seguir, pero en cero.
+    """
+    def verificar() -> None:
+        sumas = ", ".join(f"sum({campo})" for campo in CAMPOS_RESUMEN)
+        columnas = ", ".join(CAMPOS_RESUMEN)
+
+        for tabla, clave in (("resumen_diario_coches", "coche_id"), ("resumen_diario_choferes", "chofer_id")):
+            esperado = sql_directo(
+                f"SELECT fecha_turno, {clave}, count(*), {sumas} FROM recaudaciones "
+                f"GROUP BY fecha_turno, {clave} ORDER BY 1, 2"
+            )
+            obtenido = sql_directo(
+                f"SELECT fecha, {clave}, cantidad_turnos, {columnas} FROM {tabla} "
+                f"WHERE cantidad_turnos != 0 ORDER BY 1, 2"
+            )
+            assert [_redondear(fila) for fila in obtenido] == [_redondear(fila) for fila in esperado], tabla
+
+            vacios = sql_directo(f"SELECT {columnas} FROM {tabla} WHERE cantidad_turnos = 0")
+            assert all(not valor for fila in vacios for valor in fila), tabla
+    return verificar
+
+
+class Datos:
+    """
+    Altas por la API para armar cada caso. Los códigos, cédulas, matrículas y
+    móviles salen de un contador, así no chocan con los índices únicos.
+    """
+
+    def __init__(self, cliente: AsyncClient):
+        self.cliente = cliente
+        self._numero = 0
+
+    def _siguiente(self) -> int:
+        self._numero += 1
+        return self._numero
+
+    async def _crear(self, ruta: str, cuerpo: dict) -> dict:
+        r = await self.cliente.post(ruta, json=cuerpo)
+        assert r.status_code == 201, r.text
+        return r.json()
+
+    async def chofer(self, **campos) -> dict:
+        numero = self._siguiente()
+        return await self._crear("/api/choferes/", {
+            "codigo_chofer": str(100 + numero),
+            "cedula_identidad": str(40000000 + numero),
+            "nombre": "Juan",
+            "apellido": "Pérez",
+            **campos,
+        })
+
+    async def coche(self, **campos) -> dict:
+        numero = self._siguiente()
+        return await self._crear("/api/coches/", {
+            "matricula": str(1000 + numero),
+            "movil": str(numero),
+            **campos,
+        })
+
+    async def recaudacion(self, chofer_id: int, coche_id: int, **campos) -> dict:
+        return await self._crear("/api/recaudaciones/", {
+            "chofer_id": chofer_id,
+            "coche_id": coche_id,
+            "turno": "Mañana",
+            "fecha_turno": "2026-01-10",
+            "km_entrada": 0,
+            "km_salida": 100,
+            "total_recaudado": "1000.50",
+            "combustible": "200",
+            **campos,
+        })
+
+
+@pytest.fixture
+def datos(cliente: AsyncClient) -> Datos:
+    return Datos(cliente)
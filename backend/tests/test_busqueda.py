@@ -0,0 +1,86 @@
+import pytest
+
+
+async def _buscar(cliente, q: str, **parametros) -> list:
+    r = await cliente.get("/api/choferes/buscar", params={"q": q, **parametros})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+@pytest.mark.asyncio
+async def test_sin_importar_acentos_ni_mayusculas(cliente, datos):
+    chofer = await datos.chofer(nombre="José", apellido="Ibáñez")
+    await datos.chofer(nombre="Ana", apellido="Gómez")
+
+    for q in ("ibanez", "IBÁÑEZ", "jose iba", "Ibañ"):
+        assert [c["id"] for c in await _buscar(cliente, q)] == [chofer["id"]], q
+
+
+@pytest.mark.asyncio
+async def test_todos_los_terminos_como_comienzo_de_palabra(cliente, datos):
+    jose_perez = await datos.chofer(nombre="José", apellido="Pérez")
+    await datos.chofer(nombre="José", apellido="Gómez")
+
+    assert [c["id"] for c in await _buscar(cliente, "jos per")] == [jose_perez["id"]]
+    # "erez" no es comienzo de ninguna palabra
+    assert await _buscar(cliente, "erez") == []
+
+
+@pytest.mark.asyncio
+async def test_codigo_y_cedula_exactos_primero(cliente, datos):
+    # Muchos con el mismo prefijo y mejor apellido para el ranking
+    for numero in range(5):
+        await datos.chofer(codigo_chofer=f"77{numero}", nombre="Carlos", apellido="Rodríguez")
+    exacto = await datos.chofer(codigo_chofer="77", nombre="Luis", apellido="Sosa")
+    por_cedula = await datos.chofer(cedula_identidad="77000000", nombre="Pedro", apellido="Díaz")
+
+    assert [c["id"] for c in await _buscar(cliente, "77", limit=1)] == [exacto["id"]]
+    assert (await _buscar(cliente, "77"))[0]["id"] == exacto["id"]
+    assert [c["id"] for c in await _buscar(cliente, "77000000", limit=1)] == [por_cedula["id"]]
+
+
+@pytest.mark.asyncio
+async def test_relevancia_pesa_mas_el_apellido(cliente, datos):
+    por_nombre = await datos.chofer(nombre="Silva", apellido="Pérez")
+    por_apellido = await datos.chofer(nombre="Juan", apellido="Silva")
+
+    assert [c["id"] for c in await _buscar(cliente, "silva")] == [por_apellido["id"], por_nombre["id"]]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("q", ['"', 'ibá"ñez', "o'brien", "AND OR NOT", "per*", "(jose", "nombre:jose", "-", "   "])
+async def test_comillas_y_operadores_no_rompen_la_consulta(cliente, datos, q):
+    await datos.chofer(nombre="José", apellido="De León")
+
+    # Se buscan como texto: los operadores de FTS5 no se interpretan
+    await _buscar(cliente, q)
+
+
+@pytest.mark.asyncio
+async def test_palabras_separadas_por_simbolos(cliente, datos):
+    chofer = await datos.chofer(nombre="José", apellido="De León")
+
+    assert [c["id"] for c in await _buscar(cliente, "de-leon")] == [chofer["id"]]
+    assert [c["id"] for c in await _buscar(cliente, '"león"')] == [chofer["id"]]
+
+
+@pytest.mark.asyncio
+async def test_el_indice_sigue_las_ediciones(cliente, datos):
+    chofer = await datos.chofer(apellido="Pérez")
+
+    await cliente.patch(f"/api/choferes/{chofer['id']}", json={"apellido": "Martínez"})
+
+    assert await _buscar(cliente, "perez") == []
+    assert [c["id"] for c in await _buscar(cliente, "martinez")] == [chofer["id"]]
+
+
+@pytest.mark.asyncio
+async def test_limit(cliente, datos):
+    for _ in range(3):
+        await datos.chofer()
+
+    assert len(await _buscar(cliente, "juan", limit=2)) == 2
+
+    for limit in (0, 101):
+        r = await cliente.get("/api/choferes/buscar", params={"q": "juan", "limit": limit})
+        assert r.status_code == 422, limit
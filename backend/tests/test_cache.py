@@ -0,0 +1,100 @@
+import asyncio
+
+import pytest
+
+from core import cache
+from core.cache import HEADER_CACHE, BackendMemoria, Entrada
+
+
+def _hit(r) -> bool:
+    return r.headers.get(HEADER_CACHE) == "HIT"
+
+
+@pytest.mark.asyncio
+async def test_segundo_pedido_sale_del_cache(cliente, datos):
+    await datos.chofer()
+
+    primero = await cliente.get("/api/choferes/")
+    segundo = await cliente.get("/api/choferes/")
+
+    assert not _hit(primero)
+    assert _hit(segundo)
+    assert segundo.json() == primero.json()
+    assert segundo.headers["etag"] == primero.headers["etag"]
+
+    # Con el ETag del cliente, el acierto es un 304
+    r = await cliente.get("/api/choferes/", headers={"If-None-Match": primero.headers["etag"]})
+    assert r.status_code == 304
+    assert _hit(r)
+
+
+@pytest.mark.asyncio
+async def test_la_clave_incluye_el_query_string(cliente, datos):
+    await datos.coche()
+    await cliente.get("/api/coches/?limit=1")
+
+    assert not _hit(await cliente.get("/api/coches/?limit=2"))
+    assert _hit(await cliente.get("/api/coches/?limit=1"))
+
+
+@pytest.mark.asyncio
+async def test_alta_por_la_api_invalida(cliente, datos):
+    await datos.chofer()
+    await cliente.get("/api/choferes/")
+
+    await datos.chofer()
+    r = await cliente.get("/api/choferes/")
+
+    assert not _hit(r)
+    assert len(r.json()) == 2
+
+
+@pytest.mark.asyncio
+async def test_escritura_directa_invalida(cliente, datos, sql_directo):
+    await datos.chofer()
+    etag = (await cliente.get("/api/choferes/")).headers["etag"]
+
+    # Otro worker o un script: no pasa por `cache.invalidar`
+    sql_directo("UPDATE choferes SET nombre = 'Ana'")
+
+    r = await cliente.get("/api/choferes/", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert not _hit(r)
+    assert r.json()[0]["nombre"] == "Ana"
+
+
+@pytest.mark.asyncio
+async def test_enums_solo_vencen_por_ttl(cliente, monkeypatch):
+    await cliente.get("/api/coches/enums/estados")
+    assert _hit(await cliente.get("/api/coches/enums/estados"))
+
+    monkeypatch.setattr(cache, "CACHE_TTL", 0.05)
+    await cliente.get("/api/choferes/enums/estados")
+    await asyncio.sleep(0.1)
+
+    assert not _hit(await cliente.get("/api/choferes/enums/estados"))
+
+
+@pytest.mark.asyncio
+async def test_no_se_guarda_una_respuesta_armada_antes_de_invalidar():
+    backend = BackendMemoria()
+    entrada = Entrada("choferes", "/api/choferes/", 200, [], b"[]", expira=float("inf"))
+
+    version = await backend.version()
+    await backend.invalidar("choferes")
+    await backend.guardar("/api/choferes/?", entrada, version)
+
+    assert await backend.leer("/api/choferes/?") is None
+
+
+@pytest.mark.asyncio
+async def test_lru_descarta_la_menos_usada():
+    backend = BackendMemoria(maximo=2)
+    for clave in ("a", "b"):
+        await backend.guardar(clave, Entrada("g", "/", 200, [], b"", expira=float("inf")), 0)
+
+    await backend.leer("a")
+    await backend.guardar("c", Entrada("g", "/", 200, [], b"", expira=float("inf")), 0)
+
+    assert await backend.leer("b") is None
+    assert await backend.leer("a") is not None
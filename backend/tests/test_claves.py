@@ -0,0 +1,102 @@
+import pytest
+
+from core import claves
+
+
+@pytest.mark.asyncio
+async def test_coche_por_movil_y_matricula(cliente, datos):
+    coche = await datos.coche(movil="45", matricula="1234")
+
+    assert (await cliente.get("/api/coches/movil/45")).json()["id"] == coche["id"]
+    for matricula in ("1234", "STX-1234", "stx-1234", " STX-1234 "):
+        r = await cliente.get(f"/api/coches/matricula/{matricula}")
+        assert r.status_code == 200, matricula
+        assert r.json()["id"] == coche["id"]
+
+    assert (await cliente.get("/api/coches/movil/99")).status_code == 404
+    assert (await cliente.get("/api/coches/matricula/STX-9999")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_chofer_por_codigo_y_cedula(cliente, datos):
+    chofer = await datos.chofer(codigo_chofer="104", cedula_identidad="51234567")
+
+    assert (await cliente.get("/api/choferes/codigo/104")).json()["id"] == chofer["id"]
+    assert (await cliente.get("/api/choferes/cedula/51234567")).json()["id"] == chofer["id"]
+    assert (await cliente.get("/api/choferes/codigo/999")).status_code == 404
+    assert (await cliente.get("/api/choferes/cedula/49999999")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_lote(cliente, datos):
+    primero = await datos.coche(movil="12", matricula="1111")
+    segundo = await datos.coche(movil="45", matricula="2222")
+
+    r = await cliente.get("/api/coches/movil", params={"valores": "45, 12,99,45"})
+    assert r.status_code == 200
+    # Sin repetir y en el orden pedido; los que no existen en null
+    assert list(r.json()) == ["45", "12", "99"]
+    assert r.json()["45"]["id"] == segundo["id"]
+    assert r.json()["12"]["id"] == primero["id"]
+    assert r.json()["99"] is None
+
+    # Las matrículas se devuelven sin el prefijo
+    r = await cliente.get("/api/coches/matricula", params={"valores": "STX-1111,2222"})
+    assert {matricula: coche["id"] for matricula, coche in r.json().items()} == {
+        "1111": primero["id"], "2222": segundo["id"],
+    }
+
+    chofer = await datos.chofer(codigo_chofer="104", cedula_identidad="51234567")
+    r = await cliente.get("/api/choferes/codigo", params={"valores": "104,105"})
+    assert r.json() == {"104": chofer, "105": None}
+    r = await cliente.get("/api/choferes/cedula", params={"valores": "51234567"})
+    assert r.json()["51234567"]["id"] == chofer["id"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("valores", ["", " , ", ",".join(str(n) for n in range(claves.MAX_CLAVES + 1))])
+async def test_cantidad_de_claves(cliente, valores):
+    r = await cliente.get("/api/coches/movil", params={"valores": valores})
+
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_maximo_de_claves(cliente):
+    valores = ",".join(str(numero) for numero in range(claves.MAX_CLAVES))
+
+    r = await cliente.get("/api/choferes/codigo", params={"valores": valores})
+
+    assert r.status_code == 200
+    assert len(r.json()) == claves.MAX_CLAVES
+
+
+@pytest.mark.asyncio
+async def test_clave_cambiada_por_otro_worker(cliente, datos, sql_directo):
+    primero = await datos.coche(movil="12")
+    segundo = await datos.coche(movil="45")
+    await cliente.get("/api/coches/movil", params={"valores": "12,45"})
+
+    # Intercambian móviles sin pasar por esta app: el mapa en memoria queda viejo
+    sql_directo("UPDATE coches SET movil = 'x' WHERE id = ?", primero["id"])
+    sql_directo("UPDATE coches SET movil = '12' WHERE id = ?", segundo["id"])
+    sql_directo("UPDATE coches SET movil = '45' WHERE id = ?", primero["id"])
+
+    r = await cliente.get("/api/coches/movil", params={"valores": "12,45"})
+    assert r.json()["12"]["id"] == segundo["id"]
+    assert r.json()["45"]["id"] == primero["id"]
+
+    # Un coche borrado deja de encontrarse
+    sql_directo("DELETE FROM coches WHERE id = ?", primero["id"])
+    assert (await cliente.get("/api/coches/movil/45")).status_code == 404
+
+
+@pytest.mark.asyncio
+async def test_cambio_de_clave_por_la_api(cliente, datos):
+    coche = await datos.coche(movil="12")
+    await cliente.get("/api/coches/movil/12")
+
+    await cliente.patch(f"/api/coches/{coche['id']}", json={"movil": "13"})
+
+    assert (await cliente.get("/api/coches/movil/12")).status_code == 404
+    assert (await cliente.get("/api/coches/movil/13")).json()["id"] == coche["id"]
@@ -0,0 +1,106 @@
+import gzip
+
+import pytest
+import pytest_asyncio
+
+from core import compresion
+from core.compresion import CompresionMiddleware, elegir_codificacion
+from services import exportacion_services
+
+
+GZIP = {"Accept-Encoding": "gzip"}
+
+
+@pytest_asyncio.fixture
+async def recaudaciones(datos) -> None:
+    chofer = await datos.chofer()
+    coche = await datos.coche()
+    for dia in range(1, 6):
+        await datos.recaudacion(
+            chofer["id"], coche["id"], fecha_turno=f"2026-01-0{dia}", km_entrada=dia * 100, km_salida=dia * 100 + 100,
+        )
+
+
+@pytest.mark.asyncio
+async def test_comprime_respuestas_grandes(cliente, recaudaciones):
+    sin_comprimir = await cliente.get("/api/recaudaciones/", headers={"Accept-Encoding": "identity"})
+    assert len(sin_comprimir.content) >= compresion.COMPRESION_MINIMO
+
+    r = await cliente.get("/api/recaudaciones/", headers=GZIP)
+
+    assert r.headers["content-encoding"] == "gzip"
+    assert r.headers["vary"] == "Accept-Encoding"
+    assert int(r.headers["content-length"]) < len(sin_comprimir.content)
+    # httpx descomprime el cuerpo
+    assert r.content == sin_comprimir.content
+
+
+@pytest.mark.asyncio
+async def test_respuestas_chicas_o_sin_accept_encoding(cliente, recaudaciones):
+    chica = await cliente.get("/api/coches/enums/estados", headers=GZIP)
+    assert len(chica.content) < compresion.COMPRESION_MINIMO
+    assert "content-encoding" not in chica.headers
+
+    sin_aceptar = await cliente.get("/api/recaudaciones/", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in sin_aceptar.headers
+
+    # Igual varían según lo que acepta el cliente, para los caches intermedios
+    assert chica.headers["vary"] == sin_aceptar.headers["vary"] == "Accept-Encoding"
+
+
+@pytest.mark.asyncio
+async def test_304_sin_cuerpo(cliente, recaudaciones):
+    etag = (await cliente.get("/api/recaudaciones/", headers=GZIP)).headers["etag"]
+
+    r = await cliente.get("/api/recaudaciones/", headers={**GZIP, "If-None-Match": etag})
+
+    assert r.status_code == 304
+    assert "content-encoding" not in r.headers
+
+
+@pytest.mark.asyncio
+async def test_exportacion_se_comprime_por_bloques(cliente, recaudaciones, monkeypatch):
+    monkeypatch.setattr(exportacion_services, "FILAS_POR_BLOQUE", 2)
+    sin_comprimir = await cliente.get("/api/recaudaciones/exportar", headers={"Accept-Encoding": "identity"})
+
+    r = await cliente.get("/api/recaudaciones/exportar", headers=GZIP)
+
+    assert r.headers["content-encoding"] == "gzip"
+    # Por partes: el largo total no se conoce al empezar
+    assert "content-length" not in r.headers
+    assert r.content == sin_comprimir.content
+
+
+@pytest.mark.asyncio
+async def test_streaming_manda_cada_bloque_sin_juntarlos():
+    bloques = [b"a" * 2000, b"b" * 2000, b"c" * 2000]
+
+    async def app(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": [(b"content-type", b"text/csv")]})
+        for indice, bloque in enumerate(bloques):
+            await send({"type": "http.response.body", "body": bloque, "more_body": indice < len(bloques) - 1})
+
+    enviados = []
+
+    async def send(mensaje):
+        enviados.append(mensaje)
+
+    scope = {"type": "http", "headers": [(b"accept-encoding", b"gzip")]}
+    await CompresionMiddleware(app)(scope, None, send)
+
+    inicio, *cuerpos = enviados
+    assert (b"content-encoding", b"gzip") in inicio["headers"]
+    assert len(cuerpos) > 1
+    assert cuerpos[-1]["more_body"] is False
+    assert gzip.decompress(b"".join(m["body"] for m in cuerpos)) == b"".join(bloques)
+
+
+@pytest.mark.parametrize("accept_encoding, esperada", [
+    ("gzip, deflate", "gzip"),
+    ("gzip;q=0", None),
+    ("*", compresion.CODIFICACIONES[0]),
+    ("identity", None),
+    ("", None),
+])
+def test_elegir_codificacion(accept_encoding, esperada):
+    assert elegir_codificacion(accept_encoding) == esperada
@@ -0,0 +1,106 @@
+import pytest
+import pytest_asyncio
+
+from core import conteo
+from core.conteo import HEADER_TOTAL
+from core.paginacion import HEADER_NEXT_CURSOR
+
+
+async def _total(cliente, url: str) -> int:
+    r = await cliente.get(url)
+    assert r.status_code == 200, r.text
+    return int(r.headers[HEADER_TOTAL])
+
+
+@pytest_asyncio.fixture
+async def ids(datos) -> dict:
+    chofer = await datos.chofer()
+    coches = [await datos.coche(), await datos.coche()]
+    for dia in range(1, 5):
+        await datos.recaudacion(
+            chofer["id"], coches[dia % 2]["id"],
+            fecha_turno=f"2026-01-0{dia}", km_entrada=dia * 100, km_salida=dia * 100 + 100,
+        )
+    return {"chofer_id": chofer["id"], "coches": [coche["id"] for coche in coches]}
+
+
+@pytest.mark.asyncio
+async def test_total_de_cada_listado(cliente, ids):
+    assert await _total(cliente, "/api/recaudaciones/") == 4
+    assert await _total(cliente, "/api/choferes/") == 1
+    assert await _total(cliente, "/api/coches/") == 2
+
+
+@pytest.mark.asyncio
+async def test_total_no_depende_de_la_pagina(cliente, ids):
+    r = await cliente.get("/api/recaudaciones/?limit=1")
+    cursor = r.headers[HEADER_NEXT_CURSOR]
+
+    siguiente = await cliente.get(f"/api/recaudaciones/?limit=1&cursor={cursor}")
+
+    assert r.headers[HEADER_TOTAL] == siguiente.headers[HEADER_TOTAL] == "4"
+    assert await _total(cliente, "/api/recaudaciones/?limit=1&offset=3") == 4
+
+
+@pytest.mark.asyncio
+async def test_total_con_filtros(cliente, ids):
+    coche_id = ids["coches"][0]
+
+    assert await _total(cliente, f"/api/recaudaciones/?coche_id={coche_id}") == 2
+    assert await _total(cliente, f"/api/recaudaciones/?coche_id={coche_id}&desde=2026-01-03") == 1
+    assert await _total(cliente, "/api/recaudaciones/?hasta=2026-01-02") == 2
+
+
+@pytest.mark.asyncio
+async def test_altas_y_bajas_por_la_api(cliente, datos, ids):
+    coche_id = ids["coches"][0]
+    url = f"/api/recaudaciones/?coche_id={coche_id}"
+    assert await _total(cliente, url) == 2
+
+    await datos.recaudacion(ids["chofer_id"], coche_id, fecha_turno="2026-01-09", km_entrada=900, km_salida=950)
+    assert await _total(cliente, url) == 3
+    assert await _total(cliente, "/api/recaudaciones/") == 5
+
+    ultima = (await cliente.get(f"{url}&limit=1")).json()[0]
+    await cliente.delete(f"/api/recaudaciones/{ultima['id']}")
+    assert await _total(cliente, url) == 2
+    assert await _total(cliente, "/api/recaudaciones/") == 4
+
+
+@pytest.mark.asyncio
+async def test_escrituras_directas(cliente, ids, sql_directo):
+    coche_id = ids["coches"][0]
+    url = f"/api/recaudaciones/?coche_id={coche_id}"
+    assert await _total(cliente, url) == 2
+
+    # Otro worker o un script: los triggers llevan la cantidad de filas y la versión
+    sql_directo("DELETE FROM recaudaciones WHERE id = (SELECT min(id) FROM recaudaciones WHERE coche_id = ?)", coche_id)
+    assert await _total(cliente, url) == 1
+    assert await _total(cliente, "/api/recaudaciones/") == 3
+
+    sql_directo(
+        "INSERT INTO choferes (codigo_chofer, cedula_identidad, nombre, apellido, estado) "
+        "VALUES ('999', '49999999', 'Ana', 'Gómez', 'ACTIVO')"
+    )
+    assert await _total(cliente, "/api/choferes/") == 2
+
+
+@pytest.mark.asyncio
+async def test_total_con_filtros_se_guarda_con_la_version(cliente, ids, sql_directo):
+    url = f"/api/recaudaciones/?coche_id={ids['coches'][0]}"
+    await _total(cliente, url)
+
+    (guardado, version), = conteo._totales.values()
+    assert guardado == 2
+    assert sql_directo("SELECT version FROM versiones_tablas WHERE tabla = 'recaudaciones'") == [(version,)]
+
+    # Sin filtros no se guarda: sale de `versiones_tablas.filas`
+    await _total(cliente, "/api/recaudaciones/")
+    assert len(conteo._totales) == 1
+
+
+@pytest.mark.asyncio
+async def test_filas_de_versiones_tablas(cliente, ids, sql_directo):
+    for tabla in ("recaudaciones", "choferes", "coches"):
+        assert sql_directo(f"SELECT filas FROM versiones_tablas WHERE tabla = '{tabla}'") == \
+            sql_directo(f"SELECT count(*) FROM {tabla}"), tabla
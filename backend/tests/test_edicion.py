@@ -0,0 +1,88 @@
+import pytest
+import pytest_asyncio
+
+
+@pytest_asyncio.fixture
+async def ids(datos) -> dict:
+    return {
+        "chofer_id": (await datos.chofer())["id"],
+        "coche_id": (await datos.coche())["id"],
+    }
+
+
+@pytest.mark.asyncio
+async def test_cambio_de_monto_recalcula(cliente, datos, ids):
+    creada = await datos.recaudacion(**ids, total_recaudado="1000")
+
+    r = await cliente.patch(f"/api/recaudaciones/{creada['id']}", json={"total_recaudado": "2000"})
+
+    assert r.status_code == 200, r.text
+    assert r.json()["salario"] == "580.00"
+    assert r.json()["liquido"] == "1220.00"
+    assert r.json()["km_totales"] == creada["km_totales"]
+
+
+@pytest.mark.asyncio
+async def test_cambio_sin_entradas_no_recalcula(cliente, datos, ids, sql_directo):
+    creada = await datos.recaudacion(**ids)
+
+    # Un salario cargado a mano queda como está si no cambia ninguna entrada
+    sql_directo("UPDATE recaudaciones SET salario = 1 WHERE id = ?", creada["id"])
+    r = await cliente.patch(f"/api/recaudaciones/{creada['id']}", json={"fecha_recibida": "2026-02-01"})
+
+    assert r.status_code == 200
+    assert r.json()["fecha_recibida"] == "2026-02-01"
+    assert r.json()["salario"] == "1.00"
+
+
+@pytest.mark.asyncio
+async def test_cambio_de_fecha_usa_la_tasa_de_la_nueva_fecha(cliente, datos, ids):
+    await cliente.post("/api/tasas/", json={"vigente_desde": "2026-02-01", "sueldo": "0.30", "aporte": "0.20"})
+    creada = await datos.recaudacion(**ids, total_recaudado="1000", fecha_turno="2026-01-10")
+    assert creada["salario"] == "290.00"
+
+    r = await cliente.patch(f"/api/recaudaciones/{creada['id']}", json={"fecha_turno": "2026-02-10"})
+
+    assert r.json()["salario"] == "300.00"
+    assert r.json()["aportes"] == "60.00"
+
+
+@pytest.mark.asyncio
+async def test_campos_calculados_no_se_pueden_escribir(cliente, datos, ids):
+    creada = await datos.recaudacion(**ids)
+
+    r = await cliente.patch(f"/api/recaudaciones/{creada['id']}", json={"salario": "1"})
+
+    assert r.status_code == 422
+    assert [(error["type"], error["loc"]) for error in r.json()["detail"]] == [("extra_forbidden", ["body", "salario"])]
+
+
+@pytest.mark.asyncio
+async def test_edicion_que_retrocede_el_odometro(cliente, datos, ids):
+    await datos.recaudacion(**ids, fecha_turno="2026-01-10", km_entrada=0, km_salida=500)
+    siguiente = await datos.recaudacion(**ids, fecha_turno="2026-01-11", km_entrada=500, km_salida=600)
+
+    r = await cliente.patch(f"/api/recaudaciones/{siguiente['id']}", json={"km_entrada": 400})
+    assert r.status_code == 400
+
+    # Tampoco moviéndola a una fecha sin turno anterior y volviendo con km menores
+    r = await cliente.patch(f"/api/recaudaciones/{siguiente['id']}", json={"fecha_turno": "2026-01-09", "km_entrada": 0})
+    assert r.status_code == 200
+    r = await cliente.patch(f"/api/recaudaciones/{siguiente['id']}", json={"fecha_turno": "2026-01-12"})
+    assert r.status_code == 400
+
+    # Ningún rechazo quedó guardado a medias
+    guardada = (await cliente.get(f"/api/recaudaciones/{siguiente['id']}")).json()
+    assert (guardada["fecha_turno"], guardada["km_entrada"]) == ("2026-01-09", 0)
+
+
+@pytest.mark.asyncio
+async def test_edicion_sube_el_kilometraje_del_coche(cliente, datos, ids):
+    creada = await datos.recaudacion(**ids, km_entrada=0, km_salida=100)
+
+    await cliente.patch(f"/api/recaudaciones/{creada['id']}", json={"km_salida": 900})
+    assert (await cliente.get(f"/api/coches/{ids['coche_id']}")).json()["kilometros"] == 900
+
+    # Bajarlo no retrocede el odómetro del coche
+    await cliente.patch(f"/api/recaudaciones/{creada['id']}", json={"km_salida": 300})
+    assert (await cliente.get(f"/api/coches/{ids['coche_id']}")).json()["kilometros"] == 900
@@ -0,0 +1,91 @@
+import pytest
+import pytest_asyncio
+
+from core import etag as modulo_etag
+
+
+# Sin cache de respuestas: los 304 los arma `verificar_etag` en el endpoint
+URL = "/api/recaudaciones/"
+
+
+@pytest_asyncio.fixture
+async def recaudacion(datos) -> dict:
+    chofer = await datos.chofer()
+    coche = await datos.coche()
+    return await datos.recaudacion(chofer["id"], coche["id"])
+
+
+@pytest.mark.asyncio
+async def test_304_con_el_mismo_etag(cliente, recaudacion):
+    r = await cliente.get(URL)
+    etag = r.headers["etag"]
+    assert etag.startswith('W/"')
+    assert r.headers["cache-control"] == "no-cache"
+
+    r = await cliente.get(URL, headers={"If-None-Match": etag})
+
+    assert r.status_code == 304
+    assert r.content == b""
+    assert r.headers["etag"] == etag
+
+
+@pytest.mark.asyncio
+async def test_comparacion_debil_lista_y_comodin(cliente, recaudacion):
+    etag = (await cliente.get(URL)).headers["etag"]
+
+    for pedido in (etag.removeprefix("W/"), f'"otro", {etag}', "*"):
+        r = await cliente.get(URL, headers={"If-None-Match": pedido})
+        assert r.status_code == 304, pedido
+
+    r = await cliente.get(URL, headers={"If-None-Match": '"otro"'})
+    assert r.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_depende_de_la_url(cliente, recaudacion):
+    completo = (await cliente.get(URL)).headers["etag"]
+    pagina = (await cliente.get(f"{URL}?limit=1")).headers["etag"]
+
+    assert completo != pagina
+    assert (await cliente.get(f"{URL}?limit=1", headers={"If-None-Match": completo})).status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_cambia_con_las_tablas_que_lee_el_endpoint(cliente, recaudacion, datos):
+    etag = (await cliente.get(URL)).headers["etag"]
+
+    # El listado muestra el chofer: editarlo cambia el ETag de las recaudaciones
+    await cliente.patch(f"/api/choferes/{recaudacion['chofer_id']}", json={"nombre": "Ana"})
+
+    r = await cliente.get(URL, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()[0]["chofer"]["nombre"] == "Ana"
+
+    # Una tasa nueva no es una de sus tablas
+    etag = r.headers["etag"]
+    await cliente.post("/api/tasas/", json={"vigente_desde": "2030-01-01", "sueldo": "0.30", "aporte": "0.20"})
+    assert (await cliente.get(URL, headers={"If-None-Match": etag})).status_code == 304
+
+
+@pytest.mark.asyncio
+async def test_escritura_directa_cambia_el_etag(cliente, recaudacion, sql_directo):
+    detalle = f"{URL}{recaudacion['id']}"
+    etag = (await cliente.get(detalle)).headers["etag"]
+    assert (await cliente.get(detalle, headers={"If-None-Match": etag})).status_code == 304
+
+    # Los triggers suben el contador aunque la escritura no pase por la app
+    sql_directo("UPDATE recaudaciones SET otros_gastos = 5")
+
+    r = await cliente.get(detalle, headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert r.json()["otros_gastos"] == "5.00"
+
+
+@pytest.mark.asyncio
+async def test_desactivado(cliente, recaudacion, monkeypatch):
+    monkeypatch.setattr(modulo_etag, "ETAG_ACTIVO", False)
+
+    r = await cliente.get(URL, headers={"If-None-Match": "*"})
+
+    assert r.status_code == 200
+    assert "etag" not in r.headers
@@ -0,0 +1,102 @@
+import csv
+import io
+import json
+
+import pytest
+import pytest_asyncio
+
+from core.db import async_session
+from models.recaudacion import RecaudacionFiltros
+from services import exportacion_services
+from services.exportacion_services import ExportacionService, FormatoExportacion
+
+
+@pytest_asyncio.fixture
+async def recaudaciones(cliente, datos) -> list:
+    """
+    Cinco turnos de dos choferes, cargados en desorden de fecha.
+    Devuelve el detalle del listado, de la más antigua a la más nueva.
+    """
+    choferes = [await datos.chofer(), await datos.chofer()]
+    coche = await datos.coche()
+    for dia, chofer in ((3, 0), (1, 1), (5, 0), (2, 1), (4, 0)):
+        await datos.recaudacion(
+            choferes[chofer]["id"], coche["id"],
+            fecha_turno=f"2026-01-0{dia}", km_entrada=dia * 100, km_salida=dia * 100 + 100,
+        )
+    return list(reversed((await cliente.get("/api/recaudaciones/")).json()))
+
+
+@pytest.mark.asyncio
+async def test_csv(cliente, recaudaciones):
+    r = await cliente.get("/api/recaudaciones/exportar")
+
+    assert r.status_code == 200
+    assert r.headers["content-type"].startswith("text/csv")
+    assert r.headers["content-disposition"] == 'attachment; filename="recaudaciones.csv"'
+
+    filas = list(csv.DictReader(io.StringIO(r.text)))
+    assert [int(fila["id"]) for fila in filas] == [r["id"] for r in recaudaciones]
+    for fila, esperada in zip(filas, recaudaciones):
+        assert fila["fecha_turno"] == esperada["fecha_turno"]
+        assert fila["turno"] == esperada["turno"]
+        assert fila["codigo_chofer"] == esperada["chofer"]["codigo_chofer"]
+        assert fila["movil"] == esperada["coche"]["movil"]
+        assert float(fila["total_entregar"]) == float(esperada["total_entregar"])
+
+
+@pytest.mark.asyncio
+async def test_ndjson(cliente, recaudaciones):
+    r = await cliente.get("/api/recaudaciones/exportar?formato=ndjson")
+
+    assert r.headers["content-type"].startswith("application/x-ndjson")
+    objetos = [json.loads(linea) for linea in r.text.splitlines()]
+    assert [objeto["id"] for objeto in objetos] == [r["id"] for r in recaudaciones]
+    assert objetos[0]["movil"] == recaudaciones[0]["coche"]["movil"]
+
+
+@pytest.mark.asyncio
+async def test_filtros(cliente, recaudaciones):
+    chofer_id = recaudaciones[0]["chofer_id"]
+
+    r = await cliente.get(f"/api/recaudaciones/exportar?formato=ndjson&chofer_id={chofer_id}&hasta=2026-01-02")
+
+    objetos = [json.loads(linea) for linea in r.text.splitlines()]
+    esperadas = [r for r in recaudaciones if r["chofer_id"] == chofer_id and r["fecha_turno"] <= "2026-01-02"]
+    assert [objeto["id"] for objeto in objetos] == [r["id"] for r in esperadas]
+
+
+@pytest.mark.asyncio
+async def test_sin_filas(cliente):
+    csv_vacio = await cliente.get("/api/recaudaciones/exportar")
+    ndjson_vacio = await cliente.get("/api/recaudaciones/exportar?formato=ndjson")
+
+    # Solo el encabezado
+    assert len(csv_vacio.text.splitlines()) == 1
+    assert {"id", "fecha_turno", "codigo_chofer", "movil"} <= set(csv_vacio.text.strip().split(","))
+    assert ndjson_vacio.text == ""
+
+
+@pytest.mark.asyncio
+async def test_se_genera_por_bloques(recaudaciones, monkeypatch):
+    monkeypatch.setattr(exportacion_services, "FILAS_POR_BLOQUE", 2)
+
+    # El cliente de prueba junta el cuerpo: los bloques se leen del servicio
+    async with async_session() as session:
+        servicio = ExportacionService(session)
+        bloques = [bloque async for bloque in servicio.exportar(RecaudacionFiltros(), FormatoExportacion.NDJSON)]
+
+    assert [bloque.count(b"\n") for bloque in bloques] == [2, 2, 1]
+
+
+@pytest.mark.asyncio
+async def test_etag(cliente, datos, recaudaciones):
+    r = await cliente.get("/api/recaudaciones/exportar")
+    etag = r.headers["etag"]
+
+    r = await cliente.get("/api/recaudaciones/exportar", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+
+    await datos.chofer()
+    r = await cliente.get("/api/recaudaciones/exportar", headers={"If-None-Match": etag})
+    assert r.status_code == 200
@@ -0,0 +1,157 @@
+import pytest
+import pytest_asyncio
+
+from core.conteo import HEADER_TOTAL
+from routers import recaudacion as router_recaudacion
+
+
+@pytest_asyncio.fixture
+async def ids(datos) -> dict:
+    return {
+        "chofer_id": (await datos.chofer())["id"],
+        "coche_id": (await datos.coche())["id"],
+    }
+
+
+def _fila(ids: dict, dia: int, **campos) -> dict:
+    return {
+        **ids,
+        "turno": "Mañana",
+        "fecha_turno": f"2026-01-{dia:02d}",
+        "km_entrada": dia * 100,
+        "km_salida": dia * 100 + 100,
+        "total_recaudado": "1000.50",
+        "combustible": "200",
+        **campos,
+    }
+
+
+async def _total(cliente) -> int:
+    return int((await cliente.get("/api/recaudaciones/?limit=1")).headers[HEADER_TOTAL])
+
+
+@pytest.mark.asyncio
+async def test_lote_valido(cliente, ids):
+    r = await cliente.post("/api/recaudaciones/bulk", json=[_fila(ids, dia) for dia in range(1, 6)])
+
+    assert r.status_code == 200
+    assert r.json() == {"insertadas": 5, "errores": []}
+    assert await _total(cliente) == 5
+
+    # La liquidación del lote es la misma que la de un alta individual
+    individual = await cliente.post("/api/recaudaciones/", json=_fila(ids, 6))
+    listado = (await cliente.get("/api/recaudaciones/?limit=2")).json()
+    for campo in ("salario", "liquido", "aportes", "total_entregar", "rendimiento"):
+        assert listado[1][campo] == individual.json()[campo]
+
+
+@pytest.mark.asyncio
+async def test_lote_con_errores_se_rechaza_completo(cliente, ids):
+    filas = [_fila(ids, 1), _fila(ids, 2, km_entrada="x"), _fila(ids, 3)]
+
+    r = await cliente.post("/api/recaudaciones/bulk", json=filas)
+
+    assert r.status_code == 422
+    assert r.json() == {
+        "insertadas": 0,
+        "errores": [{
+            "indice": 1,
+            "errores": [{
+                "type": "int_parsing",
+                "loc": ["km_entrada"],
+                "msg": "El valor debe ser un número entero válido.",
+                "input": "x",
+            }],
+        }],
+    }
+    assert await _total(cliente) == 0
+
+
+@pytest.mark.asyncio
+async def test_parcial_inserta_las_filas_validas(cliente, ids):
+    filas = [_fila(ids, 1), _fila(ids, 2, turno="Tarde"), _fila(ids, 3)]
+
+    r = await cliente.post("/api/recaudaciones/bulk?parcial=true", json=filas)
+
+    assert r.status_code == 200
+    assert r.json()["insertadas"] == 2
+    assert [error["indice"] for error in r.json()["errores"]] == [1]
+    assert await _total(cliente) == 2
+
+
+@pytest.mark.asyncio
+async def test_errores_de_chofer_y_coche(cliente, datos, ids):
+    inactivo = await datos.chofer(estado="Inactivo")
+    filas = [
+        _fila(ids, 1, chofer_id=inactivo["id"]),
+        _fila(ids, 2, chofer_id=9999, coche_id=9999),
+        _fila(ids, 3),
+    ]
+
+    r = await cliente.post("/api/recaudaciones/bulk?parcial=true", json=filas)
+
+    errores = {error["indice"]: error["errores"] for error in r.json()["errores"]}
+    assert errores[0] == [
+        {"type": "chofer_no_valido", "loc": ["chofer_id"], "msg": "Chofer no válido", "input": inactivo["id"]},
+    ]
+    assert [(error["type"], error["input"]) for error in errores[1]] == [
+        ("chofer_no_valido", 9999), ("coche_no_valido", 9999),
+    ]
+    assert r.json()["insertadas"] == 1
+
+
+@pytest.mark.asyncio
+async def test_csv(cliente, ids):
+    contenido = (
+        "chofer_id,coche_id,turno,fecha_turno,km_entrada,km_salida,total_recaudado,combustible,h13\n"
+        f"{ids['chofer_id']},{ids['coche_id']},Mañana,2026-01-01,100,200,1000.50,200,\n"
+        f"{ids['chofer_id']},{ids['coche_id']},Noche,2026-01-02,200,300,800,,10\n"
+    )
+
+    r = await cliente.post(
+        "/api/recaudaciones/bulk/csv",
+        files={"archivo": ("planillas.csv", contenido.encode("utf-8-sig"), "text/csv")},
+    )
+
+    assert r.status_code == 200, r.text
+    assert r.json() == {"insertadas": 2, "errores": []}
+
+    # Las celdas vacías toman el valor por defecto
+    segunda = (await cliente.get("/api/recaudaciones/?limit=1")).json()[0]
+    assert segunda["combustible"] == "0.00"
+    assert segunda["h13"] == "10.00"
+
+
+@pytest.mark.asyncio
+async def test_csv_con_errores_indica_la_fila_de_datos(cliente, ids):
+    contenido = (
+        "chofer_id,coche_id,turno,fecha_turno,km_entrada,km_salida,total_recaudado\n"
+        f"{ids['chofer_id']},{ids['coche_id']},Mañana,2026-01-01,100,200,1000\n"
+        f"{ids['chofer_id']},{ids['coche_id']},Mañana,no-es-fecha,200,300,1000\n"
+    )
+
+    r = await cliente.post("/api/recaudaciones/bulk/csv", files={"archivo": ("p.csv", contenido.encode(), "text/csv")})
+
+    assert r.status_code == 422
+    assert [error["indice"] for error in r.json()["errores"]] == [1]
+    assert r.json()["errores"][0]["errores"][0]["loc"] == ["fecha_turno"]
+
+
+@pytest.mark.asyncio
+async def test_csv_que_no_es_utf8(cliente):
+    r = await cliente.post(
+        "/api/recaudaciones/bulk/csv",
+        files={"archivo": ("p.csv", "turno\nMañana\n".encode("latin-1"), "text/csv")},
+    )
+
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_csv_con_demasiadas_filas(cliente, ids, monkeypatch):
+    monkeypatch.setattr(router_recaudacion, "MAX_FILAS_IMPORTACION", 2)
+    contenido = "chofer_id,coche_id\n" + "1,1\n" * 3
+
+    r = await cliente.post("/api/recaudaciones/bulk/csv", files={"archivo": ("p.csv", contenido.encode(), "text/csv")})
+
+    assert r.status_code == 400
@@ -0,0 +1,99 @@
+import pytest
+import pytest_asyncio
+
+
+@pytest_asyncio.fixture
+async def ids(datos) -> dict:
+    return {
+        "chofer_id": (await datos.chofer())["id"],
+        "coche_id": (await datos.coche())["id"],
+    }
+
+
+def _fila(ids: dict, fecha: str, km_entrada: int, km_salida: int, **campos) -> dict:
+    return {
+        **ids,
+        "turno": "Mañana",
+        "fecha_turno": fecha,
+        "km_entrada": km_entrada,
+        "km_salida": km_salida,
+        "total_recaudado": "1000",
+        **campos,
+    }
+
+
+@pytest.mark.asyncio
+async def test_alta_continua_el_turno_anterior(cliente, datos, ids):
+    await datos.recaudacion(**ids, fecha_turno="2026-01-10", km_entrada=0, km_salida=500)
+
+    r = await cliente.post("/api/recaudaciones/", json=_fila(ids, "2026-01-11", 499, 600))
+    assert r.status_code == 400
+
+    r = await cliente.post("/api/recaudaciones/", json=_fila(ids, "2026-01-11", 500, 600))
+    assert r.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_alta_compara_con_el_ultimo_turno_anterior_a_su_fecha(cliente, datos, ids):
+    await datos.recaudacion(**ids, fecha_turno="2026-01-10", km_entrada=0, km_salida=500)
+    await datos.recaudacion(**ids, fecha_turno="2026-01-20", km_entrada=900, km_salida=1000)
+
+    # Un turno atrasado entre los dos solo se compara con el del día 10
+    r = await cliente.post("/api/recaudaciones/", json=_fila(ids, "2026-01-15", 500, 800))
+    assert r.status_code == 201
+
+    # Los del mismo día no se comparan entre sí
+    r = await cliente.post("/api/recaudaciones/", json=_fila(ids, "2026-01-10", 0, 300, turno="Noche"))
+    assert r.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_cada_coche_tiene_su_odometro(cliente, datos, ids):
+    otro_coche = (await datos.coche())["id"]
+    await datos.recaudacion(**ids, fecha_turno="2026-01-10", km_entrada=0, km_salida=500)
+
+    r = await cliente.post(
+        "/api/recaudaciones/", json=_fila({**ids, "coche_id": otro_coche}, "2026-01-11", 0, 100),
+    )
+
+    assert r.status_code == 201
+
+
+@pytest.mark.asyncio
+async def test_lote_contra_la_base(cliente, datos, ids):
+    await datos.recaudacion(**ids, fecha_turno="2026-01-10", km_entrada=0, km_salida=500)
+    filas = [_fila(ids, "2026-01-11", 500, 600), _fila(ids, "2026-01-12", 100, 200)]
+
+    r = await cliente.post("/api/recaudaciones/bulk?parcial=true", json=filas)
+
+    assert r.json()["insertadas"] == 1
+    assert [error["indice"] for error in r.json()["errores"]] == [1]
+    assert r.json()["errores"][0]["errores"][0]["loc"] == ["km_entrada"]
+
+
+@pytest.mark.asyncio
+async def test_lote_entre_sus_propias_filas(cliente, ids):
+    # Desordenadas: la del 12 se compara con la del 11 aunque venga antes en el lote
+    filas = [
+        _fila(ids, "2026-01-12", 150, 300),
+        _fila(ids, "2026-01-11", 0, 200),
+        _fila(ids, "2026-01-13", 300, 400),
+        _fila(ids, "2026-01-11", 0, 100, turno="Noche"),
+    ]
+
+    r = await cliente.post("/api/recaudaciones/bulk?parcial=true", json=filas)
+
+    assert [error["indice"] for error in r.json()["errores"]] == [0]
+    assert r.json()["insertadas"] == 3
+
+
+@pytest.mark.asyncio
+async def test_el_coche_queda_con_el_mayor_km_salida(cliente, datos, ids):
+    await datos.recaudacion(**ids, fecha_turno="2026-01-10", km_entrada=0, km_salida=500)
+    filas = [_fila(ids, "2026-01-12", 700, 900), _fila(ids, "2026-01-11", 500, 700)]
+
+    await cliente.post("/api/recaudaciones/bulk", json=filas)
+
+    # Un turno atrasado no baja el odómetro del coche
+    await datos.recaudacion(**ids, fecha_turno="2026-01-05", km_entrada=0, km_salida=50)
+    assert (await cliente.get(f"/api/coches/{ids['coche_id']}")).json()["kilometros"] == 900
@@ -0,0 +1,100 @@
+import random
+from decimal import Decimal
+
+import pytest
+
+from services.liquidacion import CAMPOS_LIQUIDACION, calcular_liquidacion_lote, liquidar_centavos
+from services.recaudacion_services import RecaudacionService
+
+
+SUELDO = RecaudacionService.Porcentaje.SUELDO.value
+APORTE = RecaudacionService.Porcentaje.APORTE.value
+
+
+def _fila(total, combustible="0", otros="0", km_entrada=0, km_salida=0, h13="0", credito="0") -> dict:
+    return {
+        "total_recaudado": Decimal(total),
+        "combustible": Decimal(combustible),
+        "otros_gastos": Decimal(otros),
+        "km_entrada": km_entrada,
+        "km_salida": km_salida,
+        "h13": Decimal(h13),
+        "credito": Decimal(credito),
+    }
+
+
+# Valores de borde: ceros, un centavo, empates al redondear, resultados
+# negativos que redondean a -0.00, sin km recorridos y montos máximos (10 dígitos)
+FILAS_BORDE = [
+    _fila("0"),
+    _fila("0.01"),
+    _fila("0.05"),
+    _fila("0.50"),
+    _fila("0.99"),
+    _fila("1.72"),
+    _fila("0.01", combustible="0.01"),
+    _fila("0", h13="0.01"),
+    _fila("0.01", credito="0.01"),
+    _fila("1000.50", combustible="200", km_entrada=100, km_salida=100),
+    _fila("1000.50", combustible="200", km_entrada=100, km_salida=101),
+    _fila("2500", combustible="350.75", otros="120", km_entrada=245699, km_salida=245849, h13="10", credito="5.55"),
+    _fila("99999999.99", combustible="99999999.99", otros="99999999.99", km_salida=3, h13="99999999.99", credito="99999999.99"),
+    _fila("0", combustible="99999999.99", km_entrada=7, km_salida=7),
+]
+
+
+def _filas_al_azar(cantidad: int) -> list:
+    aleatorio = random.Random(1234)
+
+    def monto() -> str:
+        centavos = aleatorio.choice([0, 1, 5, 50, 99, aleatorio.randint(0, 3_000_000)])
+        return str(Decimal(centavos).scaleb(-2))
+
+    filas = []
+    for _ in range(cantidad):
+        km_entrada = aleatorio.randint(0, 900_000)
+        km_salida = km_entrada + aleatorio.choice([0, 1, 3, 7, aleatorio.randint(0, 900)])
+        filas.append(_fila(monto(), monto(), monto(), km_entrada, km_salida, monto(), monto()))
+    return filas
+
+
+@pytest.mark.parametrize("sueldo, aporte", [
+    (SUELDO, APORTE),
+    (Decimal("0.3"), Decimal("0.2")),
+    (Decimal("0.275"), Decimal("0.1925")),
+])
+@pytest.mark.parametrize("filas", [FILAS_BORDE, _filas_al_azar(2000)], ids=["borde", "azar"])
+def test_lote_igual_a_fila_a_fila(filas, sueldo, aporte):
+    """
+    `calcular_liquidacion_lote` y `liquidar_centavos` dan lo mismo que
+    `calcular_liquidacion`: valor, exponente y signo del cero.
+    """
+    esperado = [RecaudacionService.calcular_liquidacion(**fila, sueldo=sueldo, aporte=aporte) for fila in filas]
+
+    columnas = {campo: [fila[campo] for fila in filas] for campo in filas[0]}
+    lote = calcular_liquidacion_lote(**columnas, sueldo=sueldo, aporte=aporte)
+
+    centavos = {
+        campo: [int(valor.scaleb(2)) if isinstance(valor, Decimal) else valor for valor in columna]
+        for campo, columna in columnas.items()
+    }
+    lote_centavos, _ = liquidar_centavos(**centavos, sueldo=sueldo, aporte=aporte)
+
+    for indice, fila in enumerate(esperado):
+        for campo in CAMPOS_LIQUIDACION:
+            assert lote[campo][indice].as_tuple() == fila[campo].as_tuple(), (indice, campo)
+
+            escala = 0 if campo == "km_totales" else 2
+            assert lote_centavos[campo][indice] == int(fila[campo].scaleb(escala)), (indice, campo)
+
+
+def test_lote_rechaza_columnas_de_distinto_largo():
+    with pytest.raises(ValueError):
+        liquidar_centavos([100], [0, 0], [0], [0], [0], [0], [0], sueldo=SUELDO, aporte=APORTE)
+
+
+def test_lote_rechaza_mas_de_dos_decimales():
+    fila = _fila("10.005")
+    columnas = {campo: [valor] for campo, valor in fila.items()}
+    with pytest.raises(ValueError):
+        calcular_liquidacion_lote(**columnas, sueldo=SUELDO, aporte=APORTE)
@@ -0,0 +1,81 @@
+from datetime import date, timedelta
+
+import pytest
+from httpx import AsyncClient
+
+from core.paginacion import HEADER_NEXT_CURSOR
+
+
+async def _recorrer(cliente: AsyncClient, url: str) -> list:
+    """
+    Todas las páginas de un listado siguiendo `X-Next-Cursor`.
+    """
+    paginas = []
+    r = await cliente.get(url)
+    while True:
+        assert r.status_code == 200, r.text
+        paginas.append(r.json())
+        cursor = r.headers.get(HEADER_NEXT_CURSOR)
+        if not cursor:
+            return paginas
+        r = await cliente.get(f"{url}&cursor={cursor}")
+
+
+@pytest.mark.asyncio
+async def test_cursor_recorre_todos_los_choferes_sin_repetir(cliente, datos):
+    ids = [(await datos.chofer())["id"] for _ in range(7)]
+
+    paginas = await _recorrer(cliente, "/api/choferes/?limit=3")
+
+    assert [len(pagina) for pagina in paginas] == [3, 3, 1]
+    assert [chofer["id"] for pagina in paginas for chofer in pagina] == ids
+
+
+@pytest.mark.asyncio
+async def test_cursor_de_recaudaciones_ordena_por_fecha_e_id(cliente, datos):
+    chofer = await datos.chofer()
+    coche = await datos.coche()
+    inicio = date(2026, 1, 1)
+    for numero in range(9):
+        # Dos turnos por fecha: el cursor desempata por id
+        await datos.recaudacion(
+            chofer["id"], coche["id"],
+            fecha_turno=(inicio + timedelta(days=numero // 2)).isoformat(),
+            km_entrada=numero * 100, km_salida=numero * 100 + 100,
+        )
+
+    completo = (await cliente.get("/api/recaudaciones/")).json()
+    paginas = await _recorrer(cliente, "/api/recaudaciones/?limit=2")
+
+    assert len(completo) == 9
+    assert [r["id"] for pagina in paginas for r in pagina] == [r["id"] for r in completo]
+    assert [(r["fecha_turno"], r["id"]) for r in completo] == sorted(
+        ((r["fecha_turno"], r["id"]) for r in completo), reverse=True
+    )
+
+
+@pytest.mark.asyncio
+async def test_ultima_pagina_sin_cursor(cliente, datos):
+    for _ in range(2):
+        await datos.coche()
+
+    r = await cliente.get("/api/coches/?limit=2")
+
+    assert len(r.json()) == 2
+    assert HEADER_NEXT_CURSOR not in r.headers
+
+
+@pytest.mark.asyncio
+async def test_cursor_invalido(cliente):
+    r = await cliente.get("/api/recaudaciones/?cursor=no-es-un-cursor")
+
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ruta", ["/api/choferes/", "/api/coches/", "/api/recaudaciones/"])
+@pytest.mark.parametrize("parametros", ["limit=0", "limit=-1", "limit=1001", "offset=-1"])
+async def test_limit_y_offset_fuera_de_rango(cliente, ruta, parametros):
+    r = await cliente.get(f"{ruta}?{parametros}")
+
+    assert r.status_code == 422
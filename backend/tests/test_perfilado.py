@@ -0,0 +1,21 @@
+import os
+
+from core import perfilado
+
+
+def test_listado_ignora_perfiles_borrados_durante_la_lectura(tmp_path, monkeypatch):
+    monkeypatch.setattr(perfilado, "PERFILADO_DIR", str(tmp_path))
+    for nombre in ("viejo.folded", "nuevo.folded", "notas.txt"):
+        (tmp_path / nombre).write_text("main;handler 1\n")
+
+    stat = os.stat
+
+    def stat_con_rotacion(ruta, *args, **kwargs):
+        # Otro worker borra el perfil viejo entre el listdir y el stat
+        if ruta.endswith("viejo.folded"):
+            os.remove(ruta)
+        return stat(ruta, *args, **kwargs)
+
+    monkeypatch.setattr(perfilado.os, "stat", stat_con_rotacion)
+
+    assert [perfil["nombre"] for perfil in perfilado.listar_perfiles()] == ["nuevo.folded"]
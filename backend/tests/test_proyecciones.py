@@ -0,0 +1,79 @@
+import pytest
+
+from core.paginacion import HEADER_NEXT_CURSOR
+
+
+async def _recorrer(cliente, url: str) -> list:
+    """
+    Todos los elementos de un listado siguiendo `X-Next-Cursor`.
+    """
+    elementos = []
+    r = await cliente.get(url)
+    while True:
+        assert r.status_code == 200, r.text
+        elementos.extend(r.json())
+        cursor = r.headers.get(HEADER_NEXT_CURSOR)
+        if not cursor:
+            return elementos
+        r = await cliente.get(f"{url}&cursor={cursor}")
+
+
+@pytest.mark.asyncio
+async def test_fields_devuelve_solo_los_campos_pedidos(cliente, datos):
+    moviles = [(await datos.coche())["movil"] for _ in range(3)]
+
+    r = await cliente.get("/api/coches/?fields=movil,matricula")
+
+    assert r.status_code == 200
+    assert [set(coche) for coche in r.json()] == [{"movil", "matricula"}] * 3
+    assert [coche["movil"] for coche in r.json()] == moviles
+
+
+@pytest.mark.asyncio
+async def test_cursor_sin_pedir_las_claves(cliente, datos):
+    for _ in range(3):
+        await datos.coche()
+
+    completo = (await cliente.get("/api/coches/?fields=movil")).json()
+
+    # El cursor se arma con el id aunque no esté en `fields`
+    assert await _recorrer(cliente, "/api/coches/?fields=movil&limit=2") == completo
+
+
+@pytest.mark.asyncio
+async def test_fields_de_una_sola_columna(cliente, datos):
+    ids = [(await datos.chofer())["id"] for _ in range(2)]
+
+    r = await cliente.get("/api/choferes/?fields=id")
+
+    assert r.json() == [{"id": id} for id in ids]
+
+
+@pytest.mark.asyncio
+async def test_fields_y_expand_de_relaciones(cliente, datos):
+    chofer = await datos.chofer()
+    coche = await datos.coche()
+    for dia in range(1, 4):
+        await datos.recaudacion(
+            chofer["id"], coche["id"], fecha_turno=f"2026-01-0{dia}", km_entrada=dia * 100, km_salida=dia * 100 + 100,
+        )
+
+    r = await cliente.get("/api/recaudaciones/?fields=total_recaudado,chofer.nombre&limit=2")
+    assert r.status_code == 200
+    assert r.json() == [{"total_recaudado": "1000.50", "chofer": {"nombre": "Juan"}}] * 2
+
+    completo = (await cliente.get("/api/recaudaciones/?limit=1")).json()[0]
+    r = await cliente.get("/api/recaudaciones/?fields=id&expand=coche&limit=1")
+    assert r.json() == [{"id": completo["id"], "coche": completo["coche"]}]
+
+    # Con cursor, el orden por fecha e id se mantiene
+    fechas = [r["fecha_turno"] for r in await _recorrer(cliente, "/api/recaudaciones/?fields=fecha_turno&limit=2")]
+    assert fechas == ["2026-01-03", "2026-01-02", "2026-01-01"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("parametros", ["fields=no_existe", "fields=chofer.no_existe", "expand=tasa"])
+async def test_campos_inexistentes(cliente, parametros):
+    r = await cliente.get(f"/api/recaudaciones/?{parametros}")
+
+    assert r.status_code == 400
@@ -0,0 +1,122 @@
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+import pytest
+import pytest_asyncio
+
+
+CAMPOS_SUMADOS = ("total_recaudado", "liquido", "aportes", "total_entregar", "km_totales")
+
+
+@pytest_asyncio.fixture
+async def recaudaciones(cliente, datos) -> list:
+    """
+    Turnos de dos choferes en dos coches, en semanas y meses distintos.
+    Devuelve el detalle tal como lo lista la API.
+    """
+    choferes = [(await datos.chofer())["id"] for _ in range(2)]
+    coches = [(await datos.coche())["id"] for _ in range(2)]
+
+    km = dict.fromkeys(coches, 0)
+    turnos = [
+        ("2026-01-05", 0, 0, "Mañana", "1000.00"),
+        ("2026-01-05", 1, 1, "Noche", "1500.50"),
+        ("2026-01-07", 0, 1, "Mañana", "800.25"),
+        ("2026-01-12", 1, 0, "Noche", "1200.00"),
+        ("2026-02-03", 0, 0, "Solo", "2000.00"),
+        ("2026-02-03", 1, 1, "Mañana", "300.75"),
+    ]
+    for fecha, chofer, coche, turno, total in turnos:
+        coche_id = coches[coche]
+        await datos.recaudacion(
+            choferes[chofer], coche_id,
+            fecha_turno=fecha, turno=turno, total_recaudado=total,
+            km_entrada=km[coche_id], km_salida=km[coche_id] + 150,
+        )
+        km[coche_id] += 150
+
+    return (await cliente.get("/api/recaudaciones/")).json()
+
+
+def _esperado(detalle: list, clave) -> dict:
+    totales = defaultdict(lambda: defaultdict(Decimal))
+    for fila in detalle:
+        grupo = totales[clave(fila)]
+        grupo["cantidad_turnos"] += 1
+        for campo in CAMPOS_SUMADOS:
+            grupo[campo] += Decimal(str(fila[campo]))
+    return totales
+
+
+def _obtenido(reporte: list, clave) -> dict:
+    return {
+        clave(fila): {
+            "cantidad_turnos": fila["cantidad_turnos"],
+            **{campo: Decimal(str(fila[campo])) for campo in CAMPOS_SUMADOS},
+        }
+        for fila in reporte
+    }
+
+
+def _mes(fila) -> str:
+    return fila["fecha_turno"][:8] + "01"
+
+
+def _lunes(fila) -> str:
+    fecha = date.fromisoformat(fila["fecha_turno"])
+    return (fecha - timedelta(days=fecha.weekday())).isoformat()
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("periodo, agrupar", [("dia", lambda f: f["fecha_turno"]), ("semana", _lunes), ("mes", _mes)])
+async def test_totales_por_periodo(cliente, recaudaciones, periodo, agrupar):
+    r = await cliente.get(f"/api/reportes/periodos?periodo={periodo}")
+
+    assert r.status_code == 200
+    assert _obtenido(r.json(), lambda f: f["periodo"]) == _esperado(recaudaciones, agrupar)
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("ruta, clave", [
+    ("coches", lambda f: f["coche_id"]),
+    ("choferes", lambda f: f["chofer_id"]),
+    ("coches-choferes", lambda f: (f["coche_id"], f["chofer_id"])),
+])
+async def test_totales_por_coche_y_chofer(cliente, recaudaciones, ruta, clave):
+    r = await cliente.get(f"/api/reportes/{ruta}")
+
+    assert _obtenido(r.json(), clave) == _esperado(recaudaciones, clave)
+
+
+@pytest.mark.asyncio
+async def test_totales_por_coche_y_mes(cliente, recaudaciones):
+    r = await cliente.get("/api/reportes/coches?periodo=mes")
+
+    clave = lambda f: (f["coche_id"], f["periodo"])
+    assert _obtenido(r.json(), clave) == _esperado(recaudaciones, lambda f: (f["coche_id"], _mes(f)))
+
+
+@pytest.mark.asyncio
+async def test_filtros_por_turno_y_fechas(cliente, recaudaciones):
+    # Con turno no alcanzan los resúmenes diarios: se agrega sobre el detalle
+    r = await cliente.get("/api/reportes/choferes?turno=Mañana&desde=2026-01-01&hasta=2026-01-31")
+
+    filtradas = [f for f in recaudaciones if f["turno"] == "Mañana" and f["fecha_turno"] <= "2026-01-31"]
+    clave = lambda f: f["chofer_id"]
+    assert _obtenido(r.json(), clave) == _esperado(filtradas, clave)
+
+
+@pytest.mark.asyncio
+async def test_sin_recaudaciones(cliente):
+    r = await cliente.get("/api/reportes/periodos")
+
+    assert r.status_code == 200
+    assert r.json() == []
+
+
+@pytest.mark.asyncio
+async def test_periodo_invalido(cliente):
+    r = await cliente.get("/api/reportes/periodos?periodo=anio")
+
+    assert r.status_code == 422
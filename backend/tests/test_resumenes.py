@@ -0,0 +1,66 @@
+import pytest
+
+from core.db import async_session
+from services.resumen_services import ResumenService
+
+
+@pytest.mark.asyncio
+async def test_resumenes_siguen_altas_ediciones_y_bajas(cliente, datos, verificar_resumenes):
+    choferes = [(await datos.chofer())["id"] for _ in range(2)]
+    coches = [(await datos.coche())["id"] for _ in range(2)]
+
+    primera = await datos.recaudacion(choferes[0], coches[0], fecha_turno="2026-01-05")
+    segunda = await datos.recaudacion(
+        choferes[1], coches[0], fecha_turno="2026-01-05", turno="Noche",
+        km_entrada=100, km_salida=250, total_recaudado="1500.75",
+    )
+    tercera = await datos.recaudacion(
+        choferes[0], coches[1], fecha_turno="2026-01-06", total_recaudado="700",
+    )
+    verificar_resumenes()
+
+    # Cambio de monto: se descuenta el valor anterior y se suma el nuevo
+    r = await cliente.patch(f"/api/recaudaciones/{primera['id']}", json={"total_recaudado": "1234.56"})
+    assert r.status_code == 200, r.text
+    verificar_resumenes()
+
+    # Cambio de día y de chofer: el turno pasa a otra fila de cada resumen
+    r = await cliente.patch(
+        f"/api/recaudaciones/{tercera['id']}",
+        json={"fecha_turno": "2026-01-07", "chofer_id": choferes[1]},
+    )
+    assert r.status_code == 200, r.text
+    verificar_resumenes()
+
+    r = await cliente.delete(f"/api/recaudaciones/{segunda['id']}")
+    assert r.status_code == 204
+    verificar_resumenes()
+
+    r = await cliente.post("/api/recaudaciones/bulk", json=[
+        {
+            "chofer_id": choferes[1], "coche_id": coches[1], "turno": "Mañana", "fecha_turno": fecha,
+            "km_entrada": km, "km_salida": km + 100, "total_recaudado": "900", "combustible": "100",
+        }
+        for fecha, km in (("2026-01-08", 100), ("2026-01-09", 200))
+    ])
+    assert r.json()["insertadas"] == 2
+    verificar_resumenes()
+
+
+@pytest.mark.asyncio
+async def test_reconstruir_repara_cargas_directas(cliente, datos, sql_directo, verificar_resumenes):
+    chofer = await datos.chofer()
+    coche = await datos.coche()
+    creada = await datos.recaudacion(chofer["id"], coche["id"])
+
+    # Un cambio fuera de la app deja los resúmenes desfasados...
+    sql_directo("UPDATE recaudaciones SET total_recaudado = 5000 WHERE id = ?", creada["id"])
+    with pytest.raises(AssertionError):
+        verificar_resumenes()
+
+    # ...y reconstruirlos los vuelve a calcular desde el detalle
+    async with async_session() as session:
+        await ResumenService(session).reconstruir()
+        await session.commit()
+
+    verificar_resumenes()
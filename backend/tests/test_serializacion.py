@@ -0,0 +1,45 @@
+import pytest
+import pytest_asyncio
+
+from core import cache, serializacion
+from core.conteo import HEADER_TOTAL
+from core.paginacion import HEADER_NEXT_CURSOR
+
+
+@pytest_asyncio.fixture
+async def flota(datos) -> None:
+    """
+    Datos con nulos, enums, decimales y fechas: todo lo que serializa distinto cada camino.
+    """
+    # El segundo sin teléfono (null); el inactivo, sin turnos
+    choferes = [await datos.chofer(telefono="099123456"), await datos.chofer()]
+    await datos.chofer(estado="Inactivo")
+    coches = [await datos.coche(), await datos.coche()]
+    for dia in range(1, 5):
+        await datos.recaudacion(
+            choferes[dia % 2]["id"], coches[dia % 2]["id"],
+            fecha_turno=f"2026-01-0{dia}", km_entrada=dia * 100, km_salida=dia * 100 + 100,
+            total_recaudado=f"{dia}000.75", turno="Noche" if dia % 2 else "Mañana",
+        )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("url", [
+    "/api/recaudaciones/?limit=3",
+    "/api/recaudaciones/?chofer_id=1",
+    "/api/choferes/?limit=2",
+    "/api/coches/",
+])
+async def test_json_rapido_igual_a_la_respuesta_normal(cliente, flota, url, monkeypatch):
+    # Sin cache: los dos pedidos tienen que pasar por el endpoint
+    monkeypatch.setattr(cache, "CACHE_ACTIVO", False)
+
+    normal = await cliente.get(url)
+    monkeypatch.setattr(serializacion, "JSON_RAPIDO", True)
+    rapido = await cliente.get(url)
+
+    assert rapido.status_code == normal.status_code == 200
+    assert rapido.json() == normal.json()
+    assert rapido.headers["content-type"] == normal.headers["content-type"]
+    for header in ("etag", HEADER_TOTAL, HEADER_NEXT_CURSOR):
+        assert rapido.headers.get(header) == normal.headers.get(header), header
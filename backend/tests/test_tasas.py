@@ -0,0 +1,186 @@
+import asyncio
+
+import pytest
+import pytest_asyncio
+
+from core.db import async_session
+from models.recaudacion import RecaudacionUpdate
+from services import reliquidacion_services
+from services.recaudacion_services import RecaudacionService
+from services.reliquidacion_services import ReliquidacionService
+from services.tasa_services import TasaService
+
+
+@pytest_asyncio.fixture
+async def turnos(datos) -> list:
+    """
+    Un turno por día del 1 al 6 de enero, todos de 1000 recaudados.
+    """
+    chofer = await datos.chofer()
+    coche = await datos.coche()
+    return [
+        await datos.recaudacion(
+            chofer["id"], coche["id"],
+            fecha_turno=f"2026-01-0{dia}", km_entrada=dia * 100, km_salida=dia * 100 + 100,
+            total_recaudado="1000",
+        )
+        for dia in range(1, 7)
+    ]
+
+
+async def _salarios(cliente) -> dict:
+    listado = (await cliente.get("/api/recaudaciones/")).json()
+    return {r["fecha_turno"]: r["salario"] for r in listado}
+
+
+@pytest.mark.asyncio
+async def test_cada_turno_usa_la_tasa_de_su_fecha(cliente, datos):
+    r = await cliente.post("/api/tasas/", json={"vigente_desde": "2026-01-05", "sueldo": "0.30", "aporte": "0.20"})
+    assert r.status_code == 201, r.text
+
+    chofer = await datos.chofer()
+    coche = await datos.coche()
+    antes = await datos.recaudacion(chofer["id"], coche["id"], fecha_turno="2026-01-04", total_recaudado="1000")
+    desde = await datos.recaudacion(
+        chofer["id"], coche["id"], fecha_turno="2026-01-05", total_recaudado="1000", km_entrada=100, km_salida=200,
+    )
+
+    assert antes["salario"] == "290.00"
+    assert desde["salario"] == "300.00"
+
+
+@pytest.mark.asyncio
+async def test_tasa_repetida(cliente):
+    cuerpo = {"vigente_desde": "2026-01-05", "sueldo": "0.30", "aporte": "0.20"}
+    await cliente.post("/api/tasas/", json=cuerpo)
+
+    r = await cliente.post("/api/tasas/", json=cuerpo)
+
+    assert r.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_tasa_nueva_reliquida_su_rango_por_lotes(cliente, turnos, verificar_resumenes, monkeypatch):
+    monkeypatch.setattr(reliquidacion_services, "FILAS_POR_LOTE", 2)
+    await cliente.post("/api/tasas/", json={"vigente_desde": "2026-01-05", "sueldo": "0.35", "aporte": "0.20"})
+
+    # Rige del 3 al 4: la del 5 en adelante la corta
+    r = await cliente.post("/api/tasas/", json={"vigente_desde": "2026-01-03", "sueldo": "0.30", "aporte": "0.20"})
+    assert r.json()["reliquidacion_id"] is not None
+
+    # El cliente de prueba espera a que terminen las tareas en segundo plano
+    trabajo = (await cliente.get(f"/api/tasas/reliquidaciones/{r.json()['reliquidacion_id']}")).json()
+    assert trabajo["estado"] == "Finalizada"
+    assert trabajo["total"] == trabajo["procesadas"] == 2
+
+    assert await _salarios(cliente) == {
+        "2026-01-01": "290.00", "2026-01-02": "290.00",
+        "2026-01-03": "300.00", "2026-01-04": "300.00",
+        "2026-01-05": "350.00", "2026-01-06": "350.00",
+    }
+    verificar_resumenes()
+
+
+@pytest.mark.asyncio
+async def test_reliquidacion_por_rango(cliente, turnos, sql_directo, verificar_resumenes, monkeypatch):
+    monkeypatch.setattr(reliquidacion_services, "FILAS_POR_LOTE", 4)
+
+    # Una carga directa deja salarios viejos; el rango pedido los corrige
+    sql_directo("UPDATE tasas_comision SET sueldo = 0.40")
+
+    r = await cliente.post("/api/tasas/reliquidaciones?desde=2026-01-02&hasta=2026-01-06")
+    assert r.status_code == 202
+
+    trabajo = (await cliente.get(f"/api/tasas/reliquidaciones/{r.json()['id']}")).json()
+    assert trabajo["procesadas"] == 5
+
+    salarios = await _salarios(cliente)
+    assert salarios.pop("2026-01-01") == "290.00"
+    assert set(salarios.values()) == {"400.00"}
+    verificar_resumenes()
+
+
+@pytest.mark.asyncio
+async def test_edicion_durante_la_reliquidacion(cliente, turnos, verificar_resumenes, monkeypatch):
+    monkeypatch.setattr(reliquidacion_services, "FILAS_POR_LOTE", 4)
+    leer_lote = ReliquidacionService._leer_lote
+    editadas = []
+
+    async def leer_y_editar(self, *args):
+        filas = await leer_lote(self, *args)
+
+        # Otro request edita una fila entre la lectura del lote y su UPDATE
+        if not editadas:
+            async with async_session() as session:
+                await RecaudacionService(session).actualizar_recaudacion(
+                    filas[0]["id"], RecaudacionUpdate(total_recaudado="2000"),
+                )
+            editadas.append(filas[0]["id"])
+
+        return filas
+
+    monkeypatch.setattr(ReliquidacionService, "_leer_lote", leer_y_editar)
+
+    r = await cliente.post("/api/tasas/", json={"vigente_desde": "2026-01-01", "sueldo": "0.30", "aporte": "0.20"})
+
+    trabajo = (await cliente.get(f"/api/tasas/reliquidaciones/{r.json()['reliquidacion_id']}")).json()
+    assert trabajo["estado"] == "Finalizada"
+    assert trabajo["procesadas"] == 6
+
+    # La edición no se pisa y el lote se recalcula con el monto nuevo
+    editada = (await cliente.get(f"/api/recaudaciones/{editadas[0]}")).json()
+    assert editada["total_recaudado"] == "2000.00"
+    assert editada["salario"] == "600.00"
+    verificar_resumenes()
+
+
+@pytest.mark.asyncio
+async def test_baja_durante_la_reliquidacion(cliente, turnos, verificar_resumenes, monkeypatch):
+    leer_lote = ReliquidacionService._leer_lote
+    borradas = []
+
+    async def leer_y_borrar(self, *args):
+        filas = await leer_lote(self, *args)
+        if not borradas:
+            async with async_session() as session:
+                await RecaudacionService(session).eliminar_recaudacion(filas[-1]["id"])
+            borradas.append(filas[-1]["id"])
+        return filas
+
+    monkeypatch.setattr(ReliquidacionService, "_leer_lote", leer_y_borrar)
+
+    r = await cliente.post("/api/tasas/", json={"vigente_desde": "2026-01-01", "sueldo": "0.30", "aporte": "0.20"})
+
+    trabajo = (await cliente.get(f"/api/tasas/reliquidaciones/{r.json()['reliquidacion_id']}")).json()
+    assert trabajo["estado"] == "Finalizada"
+    assert trabajo["procesadas"] == 5
+    assert set((await _salarios(cliente)).values()) == {"300.00"}
+    verificar_resumenes()
+
+
+@pytest.mark.asyncio
+async def test_tasa_inicial_con_workers_simultaneos(cliente, sql_directo):
+    sql_directo("DELETE FROM tasas_comision")
+    workers = 4
+    barrera = asyncio.Barrier(workers)
+
+    async def arrancar_worker():
+        async with async_session() as session:
+            exec_original = session.exec
+
+            # Todos ven la tabla vacía antes de que alguno inserte
+            async def exec_con_barrera(*args, **kwargs):
+                session.exec = exec_original
+                resultado = await exec_original(*args, **kwargs)
+                await barrera.wait()
+                return resultado
+
+            session.exec = exec_con_barrera
+            await TasaService(session).asegurar_tasa_inicial(
+                RecaudacionService.Porcentaje.SUELDO.value,
+                RecaudacionService.Porcentaje.APORTE.value,
+            )
+
+    await asyncio.gather(*(arrancar_worker() for _ in range(workers)))
+
+    assert sql_directo("SELECT count(*) FROM tasas_comision") == [(1,)]